@@ -8,47 +8,35 @@
 주요 기능:
 1. 환경 변수(.env)에서 DB 접속 정보를 로드하고, MariaDB에 연결.
 2. 데이터베이스에서 app_id 목록을 조회.
-3. 각 app_id에 대해 Steam 리뷰 API를 호출하여 최대 지정 개수만큼 리뷰(추천 여부, 추천 받은 횟수 등 포함)를 수집.
+3. 여러 app_id에 대해 동시에(asyncio) Steam 리뷰 API를 호출하여 최대 지정 개수만큼 리뷰(추천 여부, 추천 받은 횟수 등 포함)를 수집.
 4. 수집한 리뷰 텍스트에서 이모지, HTML 태그, BBCode, 특수문자 및 불필요한 공백을 제거하는 전처리 수행.
 5. 리뷰 데이터의 playtime을 시간 단위로 변환하고, Unix 타임스탬프를 datetime 형식으로 변경.
-6. 최종적으로 정제된 데이터를 GAME_REVIEW 테이블에 적재.
+6. 정제된 데이터를 페이지 단위로 GAME_REVIEW 테이블에 upsert (review_id 기준, 테이블을 덮어쓰지 않음).
+7. app별 워터마크(GAME_REVIEW_WATERMARK)로 다음 실행부터는 새 리뷰만 수집.
 
 """
 
 
 
 
-import requests
 import re
 import html  # HTML 엔티티 변환용
 import pandas as pd
-import time
 import logging
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
 import os
+import sys
 
-# 로깅 설정: INFO 레벨
-logging.basicConfig(level=logging.INFO)
-
-# .env 파일에 저장된 DB 접속 정보 로드 (예: dbuser, password, host, port, name)
-load_dotenv()
+from review_loader import load_reviews_incremental
 
-# 사용자 Agent 설정
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-}
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.db import get_engine
 
-# MariaDB 접속 정보
-dbuser = os.getenv("dbuser")
-password = os.getenv("password")
-host = os.getenv("host")
-port = os.getenv("port")
-name = os.getenv("name")
+# 로깅 설정: INFO 레벨
+logging.basicConfig(level=logging.INFO)
 
-# 데이터베이스 연결 문자열
-db_connection_str = f"mysql+pymysql://{dbuser}:{password}@{host}:{port}/{name}"
-engine = create_engine(db_connection_str)
+# DB 접속 정보(.env: dbuser, password, host, port, name)는 common.db에서 한 번만 읽음
+engine = get_engine()
 
 # SQL 쿼리 실행하여 app_id 가져오기
 query = "SELECT app_id FROM LIST_OF_MODA_INDI"
@@ -58,62 +46,8 @@ logging.info(f"DB에서 가져온 APP ID 개수: {len(app_ids)}")
 
 
 # 1. Steam 리뷰 API에서 데이터 수집 (votes_up 포함)
-def fetch_reviews_for_app(appid, max_reviews=60000):
-    """
-    Steam API에서 특정 게임(appid)의 최대 max_reviews 개수의 리뷰를 가져온다.
-    여기서는 review_id, review_text, timestamp, steam_purchase,
-    playtime_forever, voted_up, votes_up 등의 필드를 포함한다.
-    """
-    reviews = []
-    cursor = "*"
-    seen_cursors = set()
-    
-    url = f"https://store.steampowered.com/appreviews/{appid}"
-    params = {
-        "json": 1,
-        "language": "english",
-        "filter": "recent",
-        "review_type": "all",
-        "purchase_type": "all",
-        "num_per_page": 100,
-        "cursor": cursor
-    }
-    
-    while len(reviews) < max_reviews:
-        params["cursor"] = cursor
-        try:
-            response = requests.get(url, params=params, headers=headers)
-            response.raise_for_status()
-        except Exception as e:
-            logging.error(f"APP ID {appid}의 리뷰 가져오기 실패: {e}")
-            break
-        
-        data = response.json()
-        new_reviews = data.get("reviews", [])
-        if not new_reviews:
-            break
-        
-        for review in new_reviews:
-            reviews.append({
-                "app_id": appid,
-                "review_id": review.get("recommendationid"),
-                "review_text": review.get("review", ""),
-                "timestamp": review.get("timestamp_created"),
-                "steam_purchase": review.get("steam_purchase"),
-                "playtime_forever": review.get("author", {}).get("playtime_forever"),
-                "voted_up": review.get("voted_up"),  # 추천 여부 (True / False)
-                "votes_up": review.get("votes_up"),   # 추천 받은 총 횟수
-                "weighted_vote_score": review.get("weighted_vote_score"),
-        })
-            if len(reviews) >= max_reviews:
-                break
-        
-        cursor = data.get("cursor")
-        if not cursor or cursor in seen_cursors:
-            break
-        seen_cursors.add(cursor)
-        time.sleep(0.5)  # 요청 간 간격 조정
-    return reviews
+#    여러 app_id의 커서 체인을 asyncio로 동시에 수집한다. (review_harvester.py 참고)
+#    keep-alive 커넥션 풀 + 호스트별 동시 요청 상한 + seen_cursors 루프 방지
 
 
 # 2. 데이터 정제 (이모지, HTML 태그, 불필요한 공백 제거)
@@ -141,27 +75,9 @@ def clean_review_text(text):
     return text
 
 
-# 3. 감성 분석 제거 후, 리뷰 데이터 수집 및 전처리
-reviews_data = []  # 각 앱의 리뷰 데이터를 담을 리스트
-
-for appid in app_ids:
-    logging.info(f"APP ID {appid}의 리뷰 수집 중...")
-    reviews = fetch_reviews_for_app(appid, max_reviews=60000)
-    for review in reviews:
-        review["review_text"] = clean_review_text(review["review_text"])
-        reviews_data.append(review)
-
-logging.info(f"총 {len(reviews_data)}개의 리뷰 데이터를 수집했습니다.")
-
-# 리뷰 데이터 DataFrame 생성
-df_reviews = pd.DataFrame(reviews_data)
-
-# playtime_forever를 분 단위에서 시간 단위로 변환 (소수점 1자리)
-df_reviews["playtime_forever"] = (pd.to_numeric(df_reviews["playtime_forever"], errors='coerce') / 60).round(1)
-
-# timestamp 변환: Unix 타임스탬프(초)를 datetime 형식으로 변환 (예: YYYY-MM-DD HH:MM:SS)
-df_reviews["timestamp"] = pd.to_datetime(df_reviews["timestamp"], unit='s')
-
-# 4. DB 적재: GAME_REVIEW 테이블에 저장 (기존 테이블 있으면 덮어쓰기)
-df_reviews.to_sql("GAME_REVIEW", engine, if_exists="replace", index=False)
-logging.info("DB 적재 완료: GAME_REVIEW 테이블에 저장됨.")
+# 3. 리뷰 수집 + 전처리 + 적재 (스트리밍 증분, review_loader.py 참고)
+#    페이지가 도착할 때마다 정제해서 chunk 단위로 GAME_REVIEW에 upsert (review_id 기준)
+#    app별 워터마크(최근 timestamp_created / 마지막 커서)로 다음 실행부터는 새 리뷰만 수집
+#    playtime_forever 분 -> 시간(소수점 1자리), timestamp Unix 초 -> datetime 변환도 적재 시 처리
+stats = load_reviews_incremental(app_ids, max_reviews=60000, clean_text=clean_review_text, max_per_host=8)
+logging.info(f"DB 적재 완료: GAME_REVIEW 테이블에 {stats['written']}건 upsert.")
@@ -1,12 +1,14 @@
 
 """
 이 스크립트는 MariaDB(MySQL) 데이터베이스의 LIST_OF_MOBA_INDI 테이블에 저장된 Steam 게임의 app_id를 기반으로,
-각 게임의 Steam 추천 페이지에서 추천된 게임 최대 9개의 app_id와 제목을 수집하여 데이터베이스의 SEE_ALL 테이블에 저장합니다.
+각 게임의 Steam 추천 페이지에서 추천된 게임 최대 9개의 app_id를 수집하고,
+제목은 크롤링이 끝난 뒤 한 번에 조회(DB -> 로컬 캐시 -> HTTP 일괄 조회)하여 데이터베이스의 SEE_ALL 테이블에 저장합니다.
 
 주요 단계:
 1. 환경변수에서 데이터베이스 연결 정보를 불러옴
 2. 데이터베이스에서 모든 app_id를 조회
-3. Selenium을 이용해 Steam 웹페이지에서 추천 게임 데이터를 수집
+3. Selenium을 이용해 Steam 웹페이지에서 추천 게임 app_id(data-ds-appid)만 수집
+4. 모든 추천 app_id를 중복 제거 후 제목을 일괄 조회 (추천 게임 페이지로 이동하지 않음)
  (see_all -> SIMILAR_GAMES 으로 변경)
 """
 
@@ -20,31 +22,24 @@
 
 
 import os
-import pymysql
+import sys
 import time
-from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 
-# .env 파일 로드 및 DB 연결 정보 불러오기
-load_dotenv()
-DB_HOST = os.getenv("host")
-DB_USER = os.getenv("dbuser")
-DB_PASSWORD = os.getenv("password")
-DB_NAME = os.getenv("name")
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.title_resolver import resolve_titles
+from common.db import get_connection
+
+# DB 연결 정보(.env)는 common.db 커넥션 풀에서 한 번만 읽음
 
 # DB에서 LIST_OF_MOBA_INDI 테이블의 app_id 가져오기 (모든 app_id 사용)
 try:
-    conn = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        db=DB_NAME,
-        charset='utf8mb4'
-    )
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT app_id FROM LIST_OF_MOBA_INDI")
     base_app_ids = cursor.fetchall()  # [(app_id,), (app_id,), ...]
@@ -68,8 +63,9 @@ service = Service(log_path=os.devnull)
 driver = webdriver.Chrome(service=service, options=options)
 
 output_data = []  # 최종 결과 저장 리스트 (컬럼: base_app_id, recommended_app_id, recommended_title)
+collected = []    # (base_app_id, [recommended_app_id, ...])
 
-# 각 DB의 app_id마다 Steam 추천 페이지에서 추천 게임 9종 정보 추출
+# 각 DB의 app_id마다 Steam 추천 페이지에서 추천 게임 9종 app_id 추출
 for base_app_id_tuple in base_app_ids:
     base_app_id = base_app_id_tuple[0]
     url = f"https://store.steampowered.com/recommended/morelike/app/{base_app_id}/"
@@ -97,8 +93,14 @@ for base_app_id_tuple in base_app_ids:
         except Exception as e:
             print(f"[{base_app_id}] 새로고침 후 페이지 로딩 실패:", e)
         game_elements = driver.find_elements(By.XPATH, '//*[@id="released"]/div/a[@data-ds-appid]')
-        game_data = [(game.get_attribute("data-ds-appid"), game.get_attribute("href"))
-                     for game in game_elements[:9]]
+        game_data = []
+        for game in game_elements:
+            raw_appid = game.get_attribute("data-ds-appid") or ""
+            valid = [x for x in raw_appid.split() if x.isdigit()]
+            if valid and int(valid[0]) not in game_data:
+                game_data.append(int(valid[0]))
+            if len(game_data) >= 9:
+                break
         if len(game_data) < 9:
             print(f"[{base_app_id}] 시도 {attempt+1}회: 9개 미만의 게임 데이터 발견, 재시도 중...")
             time.sleep(2)
@@ -108,34 +110,26 @@ for base_app_id_tuple in base_app_ids:
         print(f"[{base_app_id}] 추천 게임 데이터 수집에 실패했습니다. 다음 APP_ID로 넘어갑니다.")
         continue
     
-    # 각 추천 게임에 대해 게임 제목 추출 (실패 시 "Unknown Title" 처리)
-    final_game_data = []
-    for rec_app_id, game_url in game_data:
-        driver.get(game_url)
-        try:
-            game_title = WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="appHubAppName"]'))
-            ).text.strip()
-        except Exception as e:
-            print(f"게임 제목 로딩 실패 for app_id {rec_app_id}: {e}")
-            game_title = "Unknown Title"
-        final_game_data.append((rec_app_id, game_title))
-        driver.get(url)  # 추천 페이지로 돌아가기
-    
-    for rec_app_id, game_title in final_game_data:
-        output_data.append((base_app_id, rec_app_id, game_title))
+    collected.append((base_app_id, game_data))
 
 driver.quit()
 
+# 추천 게임 제목 일괄 조회 (TITLELIST/SIMILAR_GAMES -> 로컬 캐시 -> HTTP), 전체 base app에 걸쳐 중복 제거
+try:
+    conn = get_connection()
+    titles = resolve_titles({rec_id for _, rec_ids in collected for rec_id in rec_ids}, conn=conn)
+    conn.close()
+except Exception as e:
+    print("제목 일괄 조회 중 DB 오류, 캐시/HTTP만 사용:", e)
+    titles = resolve_titles({rec_id for _, rec_ids in collected for rec_id in rec_ids})
+
+for base_app_id, rec_ids in collected:
+    for rec_app_id in rec_ids:
+        output_data.append((base_app_id, rec_app_id, titles.get(rec_app_id, "Unknown Title")))
+
 # DB에 데이터 적재 (테이블 SEE_ALL 생성 후 데이터 삽입)
 try:
-    conn = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        db=DB_NAME,
-        charset='utf8mb4'
-    )
+    conn = get_connection()
     cursor = conn.cursor()
     create_table_query = """
     CREATE TABLE IF NOT EXISTS SEE_ALL (
@@ -0,0 +1,70 @@
+"""
+top-k 코사인 유사도 벤치마크 (합성 태그 데이터, DB 불필요).
+
+N = 1k / 10k / 100k app에 대해 common.similarity.compute_topk를 워커 수별로 실행해서
+소요 시간과 rows/sec를 비교한다.
+- 태그 인기도는 Zipf 비슷하게 (앞쪽 태그일수록 많이 붙음, Steam의 "Indie" / "Action"처럼 흔한 태그 포함)
+- app당 태그 5~20개, 태그 종류 BENCH_TAGS개 (기본 450)
+- 워커 수별 결과가 같은지, 작은 N에서는 전체 행렬 한 번에 계산한 정답과 같은지도 확인
+
+사용 예:
+    python bench_similarity.py
+    BENCH_SIZES=1000,10000 BENCH_WORKERS=1,4 SIM_MAX_RAM_MB=1024 SIM_EXECUTOR=process python bench_similarity.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.similarity import TOP_K, SIM_MAX_RAM_MB, SIM_EXECUTOR, SCORE_DECIMALS, build_tag_matrix, compute_topk
+
+SIZES = [int(x) for x in os.getenv("BENCH_SIZES", "1000,10000,100000").split(",")]
+WORKERS = [int(x) for x in os.getenv("BENCH_WORKERS", f"1,{os.cpu_count() or 1}").split(",")]
+N_TAGS = int(os.getenv("BENCH_TAGS", 450))
+EXACT_CHECK_MAX = 2000   # 이 크기 이하면 전체 행렬로 정답 비교
+
+
+def make_tag_lists(n_apps, n_tags=N_TAGS, seed=42):
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n_tags + 1)
+    weights /= weights.sum()
+    return [list(rng.choice(n_tags, rng.integers(5, 21), replace=False, p=weights)) for _ in range(n_apps)]
+
+
+def exact_topk(matrix, k=TOP_K):
+    """전체 N x N 행렬로 계산한 정답 (점수 내림차순 / 동점은 열 오름차순)"""
+    n = matrix.shape[0]
+    full = np.round((matrix.astype(np.float64) @ matrix.astype(np.float64).T).toarray(), SCORE_DECIMALS)
+    np.fill_diagonal(full, 0.0)
+    neighbors = np.full((n, k), -1, dtype=np.int64)
+    for i in range(n):
+        order = [j for j in np.lexsort((np.arange(n), -full[i]))[:k] if full[i, j] > 0]
+        neighbors[i, :len(order)] = order
+    return neighbors
+
+
+def main():
+    print(f"[BENCH] top-{TOP_K}, 태그 {N_TAGS}종, 메모리 상한 {SIM_MAX_RAM_MB:.0f}MB, executor={SIM_EXECUTOR}")
+    print(f"{'N':>8}{'workers':>9}{'sec':>10}{'rows/sec':>12}  check")
+    for n in SIZES:
+        matrix, _ = build_tag_matrix(make_tag_lists(n))
+        expected = exact_topk(matrix) if n <= EXACT_CHECK_MAX else None
+        for workers in WORKERS:
+            t0 = time.perf_counter()
+            neighbors, _ = compute_topk(matrix, workers=workers, max_ram_mb=SIM_MAX_RAM_MB,
+                                        executor=SIM_EXECUTOR, verbose=False)
+            elapsed = time.perf_counter() - t0
+            if expected is None:
+                expected, check = neighbors, "기준"
+            else:
+                mismatch = int((neighbors != expected).any(axis=1).sum())
+                check = "일치" if mismatch == 0 else f"불일치 {mismatch}행"
+            print(f"{n:>8}{workers:>9}{elapsed:>10.2f}{n / elapsed:>12.0f}  {check}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+카탈로그 태그 벡터(IDF x 순위 가중, L2 정규화 CSR)를 만들어 TAG_VECTORS_DIR에 .npy로 저장한다.
+
+- 입력: TITLELIST_CURRENT.user_tags ('+' 팝업 순서 그대로 저장된 TAGS id 배열)
+- 출력: data / indices / indptr / app_ids / tag_ids / idf .npy + meta.json (common/tag_vectors.py 참고)
+- Streamlit 등 다른 프로세스는 TagVectors.load()로 메모리 매핑해서 바로 사용 (JSON 파싱 / 재계산 없음)
+"""
+
+import os
+import sys
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.similarity import load_current_tags
+from common.tag_vectors import TAG_VECTORS_DIR, build_tag_vectors
+
+app_ids, titles, tag_lists = load_current_tags()
+print(f"TITLELIST_CURRENT -> app {len(app_ids)}개")
+
+vectors = build_tag_vectors(app_ids, tag_lists, meta={"source": "TITLELIST_CURRENT"})
+vectors.save(TAG_VECTORS_DIR)
@@ -1,66 +1,67 @@
 import os
-import pandas as pd
-from sqlalchemy import create_engine, text
-from sklearn.preprocessing import MultiLabelBinarizer
-from sklearn.metrics.pairwise import cosine_similarity
-import ast
+import sys
 
-# 환경 변수나 설정 파일에서 민감 정보를 주입받는 것이 이상적이나, 여기서는 예시를 위해 하드 코딩합니다.
-db_host = "bootcampproject2t1steam.cdi60g8ggh0i.ap-southeast-2.rds.amazonaws.com"
-db_port = 3306
-db_user = "minsung"
-db_password = "password"
-db_name = "steam_lit_project"
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.similarity import (TOP_K, NEIGHBOR_TABLE, MATRIX_TABLE, SIM_WORKERS, SIM_MAX_RAM_MB,
+                               load_app_tags, build_tag_matrix, compute_topk, neighbor_rows,
+                               load_recommendations, base_vectors, recommendation_matrix_rows,
+                               write_neighbors, write_matrix)
+from common.tag_vectors import build_tag_vectors, weighted_matrix
+from common.similarity_incremental import SIM_STATE_DIR, save_state
+from common.similarity_changelog import create_changelog_table, read_changelog, clear_changelog
 
-connection_string = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-engine = create_engine(connection_string, pool_pre_ping=True)
+# 태그 가중치: "idf_rank"(IDF x '+' 팝업 순위 감쇠, 기본) 또는 "binary"(태그 있으면 1)
+SIM_WEIGHTING = os.getenv("SIM_WEIGHTING", "idf_rank")
 
-def fetch_all_similar_games(engine):
-    """
-    SIMILAR_GAMES 테이블의 전체 데이터를 조회하는 함수.
-    """
-    query = text("""
-        SELECT game_app_id, recommended_app_id, recommended_title, user_tags
-        FROM SIMILAR_GAMES
-    """)
-    with engine.connect() as connection:
-        df = pd.read_sql(query, connection)
-    return df
+# DB 접속 정보(.env)는 common.db 커넥션 풀에서 한 번만 읽음
+# (기존: 접속 정보 하드 코딩 + N x N dense 행렬을 제목별 컬럼으로 to_sql('similarity_matrix', replace))
+# 병렬도 / 메모리 상한: SIM_WORKERS (기본 CPU 수), SIM_MAX_RAM_MB (기본 2048), SIM_EXECUTOR (thread / process)
 
-# SIMILAR_GAMES 테이블의 전체 데이터를 불러옵니다.
-data_df = fetch_all_similar_games(engine)
+# 지금까지 쌓인 태그 변경 기록은 이번 전체 계산에 포함됨 => 끝나면 여기까지 지움
+create_changelog_table()
+changelog_max_id, _ = read_changelog()
 
-def parse_tags(tag_field):
-    """
-    user_tags 컬럼이 문자열인 경우 안전하게 리스트로 변환합니다.
-    """
-    if isinstance(tag_field, str):
-        try:
-            return ast.literal_eval(tag_field)
-        except Exception:
-            return []
-    elif isinstance(tag_field, list):
-        return tag_field
-    else:
-        return []
+# SIMILAR_GAMES에서 추천 app을 app_id 기준으로 중복 제거해서 불러옵니다. (app_id당 태그 벡터 1개)
+app_ids, titles, tag_lists = load_app_tags()
+print(f"SIMILAR_GAMES -> 고유 app {len(app_ids)}개")
 
-# user_tags 컬럼 파싱
-data_df['user_tags'] = data_df['user_tags'].apply(parse_tags)
+# 태그 벡터화: CSR 희소 행렬 (행 L2 정규화 => 내적이 코사인 유사도)
+# 흔한 태그("Indie")보다 드문 태그("MOBA"), 팝업 앞쪽 태그에 더 큰 가중치 (common/tag_vectors.py)
+vectors = None
+if SIM_WEIGHTING == "binary":
+    tag_matrix, vocab = build_tag_matrix(tag_lists)
+    vectorize = lambda lists: build_tag_matrix(lists, vocab)[0]
+else:
+    # app_ids가 이미 오름차순이라 벡터 행 순서 = app_ids 순서
+    vectors = build_tag_vectors(app_ids, tag_lists)
+    tag_matrix = vectors.matrix
+    vectorize = lambda lists: weighted_matrix(lists, vectors.tag_ids, vectors.idf)
+print(f"태그 행렬({SIM_WEIGHTING}): {tag_matrix.shape[0]} x {tag_matrix.shape[1]} (nnz {tag_matrix.nnz})")
 
-# 태그 벡터화: MultiLabelBinarizer를 사용해 전체 데이터의 태그를 이진 벡터화합니다.
-mlb = MultiLabelBinarizer()
-tag_matrix = mlb.fit_transform(data_df['user_tags'])
+# 코사인 유사도: 블록 단위 행렬곱을 워커 풀에서 나눠 계산 + app별 top-k 이웃만 유지
+topk = compute_topk(tag_matrix, k=TOP_K, workers=SIM_WORKERS, max_ram_mb=SIM_MAX_RAM_MB)
 
-# 코사인 유사도 계산 (각 추천 항목 간의 유사도를 계산)
-cos_sim = cosine_similarity(tag_matrix)
+# 예시 출력 (앞쪽 app 몇 개)
+neighbors, scores = topk
+for i in range(min(3, len(app_ids))):
+    pairs = [(j, score) for j, score in zip(neighbors[i], scores[i]) if j >= 0]
+    print(f"{titles.get(int(app_ids[i]))} -> "
+          + ", ".join(f"{titles.get(int(app_ids[j]))}({score:.3f})" for j, score in pairs))
 
-# 추천 제목(recommended_title)을 인덱스 및 컬럼으로 사용하여 유사도 DataFrame 생성
-similarity_df = pd.DataFrame(cos_sim,
-                             index=data_df['recommended_title'],
-                             columns=data_df['recommended_title'])
-print(similarity_df)
+# long 테이블 (app_id, neighbor_id, rank, score) + 대시보드용 MATRIX (_1 ~ _9 컬럼)
+# MATRIX는 base game(game_app_id)당 1행: 그 game의 SIMILAR_GAMES 추천 app들과의 코사인 (같은 벡터 공간)
+# => 대시보드가 선택한 게임으로 찾아서 추천 목록에 recommended_app_id로 붙임
+# 둘 다 새 테이블을 채운 뒤 RENAME으로 교체
+write_neighbors(neighbor_rows(app_ids, topk))
+recos = load_recommendations()
+base_ids, base_matrix, names = base_vectors(recos, app_ids, tag_matrix, vectorize)
+write_matrix(recommendation_matrix_rows(recos, base_ids, base_matrix, names, app_ids, tag_matrix, titles))
+print(f"유사도 데이터가 '{NEIGHBOR_TABLE}' / '{MATRIX_TABLE}' 테이블로 DB에 적재되었습니다.")
 
-# CSV 파일 대신, similarity_df를 새로운 DB 테이블(예: 'similarity_matrix')에 적재합니다.
-# if_exists='replace'는 테이블이 이미 있으면 덮어쓰기를 의미합니다.
-similarity_df.to_sql('similarity_matrix', engine, if_exists='replace', index=True)
-print("유사도 데이터가 'similarity_matrix' 테이블로 DB에 적재되었습니다.")
+# 증분 갱신(incremental_similarity.py)의 기준 상태: 벡터(IDF 포함) + top-k
+# binary 가중치는 증분 갱신을 지원하지 않음 (IDF x 순위 가중 벡터 기준)
+if vectors is not None:
+    save_state(app_ids, tag_matrix, vectors.tag_ids, vectors.idf, topk, path=SIM_STATE_DIR)
+    if changelog_max_id:
+        clear_changelog(changelog_max_id)
@@ -0,0 +1,140 @@
+"""
+오프라인 벤치마크용 가짜 Steam appreviews 서버.
+
+- GET /appreviews/{appid}?cursor=...&num_per_page=100 형태를 흉내낸다.
+- app마다 정해진 개수(reviews_per_app)의 리뷰를 커서 페이지로 돌려준다.
+- latency로 실제 네트워크 지연(RTT)을 흉내낸다.
+
+사용 예:
+    python fake_appreviews_server.py --apps 50 --reviews 2000 --latency 0.05
+        -> 순차(requests, 기존 방식) vs asyncio 수집기(review_harvester) 처리량 비교
+"""
+
+import argparse
+import asyncio
+import base64
+import logging
+import threading
+import time
+
+import requests
+from aiohttp import web
+
+from review_harvester import harvest_reviews
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def make_cursor(offset):
+    return base64.b64encode(f"offset:{offset}".encode()).decode()
+
+
+def parse_cursor(cursor):
+    if not cursor or cursor == "*":
+        return 0
+    try:
+        return int(base64.b64decode(cursor.encode()).decode().split(":")[1])
+    except Exception:
+        return 0
+
+
+def create_app(reviews_per_app=1000, latency=0.0):
+    async def appreviews(request):
+        appid = int(request.match_info["appid"])
+        offset = parse_cursor(request.query.get("cursor", "*"))
+        per_page = int(request.query.get("num_per_page", 100))
+        if latency:
+            await asyncio.sleep(latency)
+
+        end = min(offset + per_page, reviews_per_app)
+        reviews = [
+            {
+                "recommendationid": str(appid * 10_000_000 + i),
+                "review": f"fake review {i} for app {appid}",
+                "timestamp_created": 1700000000 - i,
+                "steam_purchase": True,
+                "author": {"playtime_forever": 60 * (i % 50)},
+                "voted_up": i % 3 != 0,
+                "votes_up": i % 7,
+                "weighted_vote_score": "0.5",
+            }
+            for i in range(offset, end)
+        ]
+        # 마지막 페이지 이후에는 Steam처럼 같은 커서를 다시 돌려준다 (seen_cursors 검증용)
+        next_cursor = make_cursor(end)
+        return web.json_response({"success": 1, "reviews": reviews, "cursor": next_cursor})
+
+    app = web.Application()
+    app.router.add_get("/appreviews/{appid}", appreviews)
+    return app
+
+
+def start_server_in_thread(port, reviews_per_app, latency):
+    """별도 스레드의 이벤트 루프에서 가짜 서버를 띄운다."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(create_app(reviews_per_app, latency))
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", port)
+        loop.run_until_complete(site.start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return loop
+
+
+def sequential_baseline(app_ids, base_url, max_reviews):
+    """기존 MOBA_INDI.py 방식: app 하나씩, 페이지 하나씩 (sleep만 제외)."""
+    total = 0
+    for appid in app_ids:
+        cursor, seen_cursors, count = "*", set(), 0
+        while count < max_reviews:
+            resp = requests.get(base_url.format(appid=appid),
+                                params={"json": 1, "num_per_page": 100, "cursor": cursor})
+            data = resp.json()
+            if not data.get("reviews"):
+                break
+            count += len(data["reviews"])
+            cursor = data.get("cursor")
+            if not cursor or cursor in seen_cursors:
+                break
+            seen_cursors.add(cursor)
+        total += count
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--apps", type=int, default=50)
+    parser.add_argument("--reviews", type=int, default=2000, help="app당 리뷰 수")
+    parser.add_argument("--latency", type=float, default=0.05, help="요청당 지연(초)")
+    parser.add_argument("--max-per-host", type=int, default=16)
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    start_server_in_thread(args.port, args.reviews, args.latency)
+    base_url = f"http://127.0.0.1:{args.port}/appreviews/{{appid}}"
+    app_ids = list(range(1, args.apps + 1))
+
+    if not args.skip_sequential:
+        t0 = time.perf_counter()
+        total = sequential_baseline(app_ids, base_url, args.reviews)
+        elapsed = time.perf_counter() - t0
+        print(f"[SEQUENTIAL] reviews={total}, {elapsed:.2f}s, {total / elapsed:.0f} reviews/sec")
+
+    t0 = time.perf_counter()
+    results = asyncio.run(harvest_reviews(app_ids, max_reviews=args.reviews, base_url=base_url,
+                                          max_per_host=args.max_per_host, use_rate_limiter=False))
+    elapsed = time.perf_counter() - t0
+    total = sum(len(v) for v in results.values())
+    print(f"[ASYNC x{args.max_per_host}] reviews={total}, {elapsed:.2f}s, {total / elapsed:.0f} reviews/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+태그가 바뀐 app만 다시 계산해서 SIMILARITY_TOPK / MATRIX를 부분 갱신한다. (common/similarity_incremental.py 참고)
+
+cosine_similarity.py(전체 all-pairs 계산)가 SIM_STATE_DIR에 남긴 상태(벡터 + top-k)를 기준으로
+1. 바뀐 app_id: SIMILARITY_CHANGELOG (speed_up_tag_tb_similar.py가 user_tags를 쓸 때 같이 기록) + 명령행 인자
+2. 그 app들의 태그만 SIMILAR_GAMES에서 다시 읽어 벡터 교체 (IDF는 마지막 전체 계산 값 고정, 벡터가 같으면 제외)
+3. 바뀐 app 자신의 top-k + 그 app을 이웃으로 둔 app의 목록만 고침
+4. 바뀐 행만 DB에 DELETE + INSERT, 상태 저장, 처리한 변경 기록 삭제
+   MATRIX(base game x 크롤된 추천 목록)는 바뀐 app을 추천 목록에 가진 base game 행만 다시 계산
+5. (--verify) 갱신된 벡터로 처음부터 다시 계산한 결과와 비교 (full = 전체, sample = 임의 행)
+
+사용 예:
+    python incremental_similarity.py                    # 변경 기록만
+    python incremental_similarity.py 570 730 --verify full
+    python incremental_similarity.py --dry-run --verify sample --sample 2000
+"""
+
+import os
+import sys
+import argparse
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.similarity import (load_app_tags, load_recommendations, games_recommending, base_vectors,
+                               recommendation_matrix_rows)
+from common.tag_vectors import weighted_matrix
+from common.similarity_changelog import create_changelog_table, read_changelog, clear_changelog
+from common.similarity_incremental import (SIM_STATE_DIR, load_state, save_state, apply_tag_changes,
+                                           incremental_topk, verify_topk, patch_tables, patch_matrix)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("app_ids", nargs="*", type=int, help="변경 기록 외에 다시 계산할 app_id")
+    parser.add_argument("--verify", choices=("off", "sample", "full"), default="sample")
+    parser.add_argument("--sample", type=int, default=500, help="--verify sample일 때 비교할 행 수")
+    parser.add_argument("--dry-run", action="store_true", help="DB / 상태 저장 없이 계산 + 검증만")
+    args = parser.parse_args()
+
+    state = load_state(SIM_STATE_DIR)
+    if state is None:
+        print(f"[INFO] {SIM_STATE_DIR}에 상태가 없습니다. cosine_similarity.py로 전체 계산부터 하세요.")
+        return
+    k = int(state.meta.get("k", state.extras["neighbors"].shape[1]))
+
+    # 1) 바뀐 app_id
+    create_changelog_table()
+    max_id, logged = read_changelog()
+    changed_ids = sorted(set(logged) | set(args.app_ids))
+    print(f"[INFO] 변경 기록 {len(logged)}개 + 인자 {len(args.app_ids)}개 => app {len(changed_ids)}개")
+    if not changed_ids:
+        print("[INFO] 바뀐 app이 없습니다. 종료.")
+        return
+
+    # 2) 바뀐 app의 새 태그 -> 벡터 교체
+    found_ids, _, tag_lists = load_app_tags(app_ids=changed_ids)
+    change = apply_tag_changes(state, changed_ids, found_ids, tag_lists)
+    print(f"[INFO] 벡터 변경 {len(change['changed'])}개 / 삭제 {len(change['removed'])}개 "
+          f"(같은 벡터라 제외 {len(found_ids) - len(change['changed'])}개)")
+
+    # 3) 영향받는 행만 다시 top-k
+    app_ids = change["app_ids"]
+    neighbors, scores, touched, _ = incremental_topk(change["matrix"], change["neighbors"], change["scores"],
+                                                     change["changed"], change["stale"], k=k)
+    topk = (neighbors, scores)
+
+    # 5) 검증
+    if args.verify != "off":
+        verify_topk(change["matrix"], topk, k=k, sample=args.sample if args.verify == "sample" else 0)
+    if args.dry_run:
+        return
+
+    # 4) 적재: top-k는 바뀐 행만, MATRIX는 바뀐 app이 걸린 base game 행만
+    if len(touched) or len(change["removed"]):
+        patch_tables(app_ids, topk, touched, removed_ids=change["removed"])
+    moved = {int(a) for a in app_ids[change["changed"]]} | {int(a) for a in change["removed"]}
+    if moved:
+        games = games_recommending(moved) | moved
+        recos = load_recommendations(game_app_ids=games)
+        _, titles, _ = load_app_tags(app_ids={a for ids in recos.values() for a in ids})
+        vectorize = lambda lists: weighted_matrix(lists, state.tag_ids, state.idf)
+        base_ids, base_matrix, names = base_vectors(recos, app_ids, change["matrix"], vectorize)
+        patch_matrix(games, recommendation_matrix_rows(recos, base_ids, base_matrix, names,
+                                                       app_ids, change["matrix"], titles))
+    save_state(app_ids, change["matrix"], state.tag_ids, state.idf, topk,
+               source=state.meta.get("source", "SIMILAR_GAMES"), path=SIM_STATE_DIR)
+    if max_id:
+        clear_changelog(max_id)
+    print(f"[DONE] 목록이 바뀐 app {len(touched)}개 반영")
+
+
+if __name__ == "__main__":
+    main()
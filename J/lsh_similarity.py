@@ -0,0 +1,69 @@
+"""
+카탈로그 전체(TITLELIST_CURRENT, GetAppList 기준 15만 app 규모) 태그 유사도 top-k.
+
+cosine_similarity.py(all-pairs 정확 계산)는 Indie/MOBA 부분집합용이고,
+여기서는 MinHash-LSH로 후보 쌍만 뽑아서 정확히 재채점한다. (common/minhash_lsh.py 참고)
+
+주요 단계:
+1. TITLELIST_CURRENT에서 app별 태그 조회
+2. IDF x 순위 가중 태그 벡터 (TAG_VECTORS_DIR에 .npy로 저장, common/tag_vectors.py)
+3. MinHash 시그니처 저장소(MINHASH_DIR)를 열어 가중 토큰이 바뀐 app만 시그니처 갱신 후 저장
+4. 밴드 LSH로 가중 Jaccard 후보 쌍 생성 -> 가중 코사인 재채점 + 이웃의 이웃 보충 -> app별 top-k
+5. 샘플 app에 대해 exact 엔진과 비교한 recall
+   이웃 recall이 LSH_MIN_RECALL 미만이면 테이블을 교체하지 않고 종료 (LSH_ALLOW_LOW_RECALL=1이면 경고만)
+6. SIMILARITY_TOPK_CATALOG (app_id, neighbor_id, rank, score) 교체
+
+설정: MINHASH_DIR, MINHASH_PERM(192), LSH_BANDS(64), MINHASH_WEIGHT_LEVELS(8), LSH_MAX_BUCKET(200),
+      LSH_REFINE(2), LSH_RECALL_SAMPLE(500), LSH_MIN_RECALL(0.9), LSH_ALLOW_LOW_RECALL(0)
+"""
+
+import os
+import sys
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.similarity import TOP_K, load_current_tags, neighbor_rows, write_neighbors
+from common.minhash_lsh import MinHashStore, LshIndex, lsh_topk, recall_report, weighted_tag_tokens
+from common.tag_vectors import TAG_VECTORS_DIR, build_tag_vectors
+
+CATALOG_TABLE = "SIMILARITY_TOPK_CATALOG"
+RECALL_SAMPLE = int(os.getenv("LSH_RECALL_SAMPLE", 500))
+MIN_RECALL = float(os.getenv("LSH_MIN_RECALL", 0.9))          # 샘플 이웃 recall 하한
+ALLOW_LOW_RECALL = os.getenv("LSH_ALLOW_LOW_RECALL", "0") == "1"
+
+# 1) 카탈로그 태그
+app_ids, titles, tag_lists = load_current_tags()
+print(f"TITLELIST_CURRENT -> app {len(app_ids)}개")
+
+# 2) IDF x 순위 가중 벡터 (TAG_VECTORS_DIR에도 저장 => Streamlit이 메모리 매핑으로 사용)
+#    app_ids가 오름차순이라 벡터 행 순서 = 시그니처 행 순서
+vectors = build_tag_vectors(app_ids, tag_lists, meta={"source": "TITLELIST_CURRENT"})
+vectors.save(TAG_VECTORS_DIR)
+tag_matrix = vectors.matrix
+
+# 3) 시그니처 증분 갱신 (같은 가중치로 늘린 토큰이 바뀐 app만 다시 계산)
+store = MinHashStore.open()
+store.update(app_ids, weighted_tag_tokens(tag_lists, vectors.tag_ids, vectors.idf))
+store.save()
+
+# 4) LSH 후보(가중 Jaccard) -> 가중 코사인으로 재채점 top-k
+pairs = LshIndex(store.signatures).candidate_pairs()
+topk = lsh_topk(tag_matrix, pairs, k=TOP_K)
+
+# 5) exact 엔진 대비 recall (샘플) => 하한 미만이면 기존 테이블 유지
+if RECALL_SAMPLE > 0:
+    report = recall_report(tag_matrix, topk, sample=RECALL_SAMPLE, k=TOP_K)
+    if report["neighbor_recall"] < MIN_RECALL:
+        print("!" * 72)
+        print(f"[WARN] LSH 이웃 recall {report['neighbor_recall']:.1%} < 하한 {MIN_RECALL:.0%} "
+              f"(LSH_BANDS / MINHASH_PERM / MINHASH_WEIGHT_LEVELS 조정 필요)")
+        print("!" * 72)
+        if not ALLOW_LOW_RECALL:
+            print(f"[STOP] '{CATALOG_TABLE}'을 교체하지 않고 종료 (강제로 적재하려면 LSH_ALLOW_LOW_RECALL=1)")
+            sys.exit(1)
+else:
+    print(f"[WARN] LSH_RECALL_SAMPLE=0 => recall 확인 없이 '{CATALOG_TABLE}' 교체")
+
+# 6) 적재
+write_neighbors(neighbor_rows(app_ids, topk), table=CATALOG_TABLE)
+print(f"카탈로그 유사도 데이터가 '{CATALOG_TABLE}' 테이블로 DB에 적재되었습니다.")
@@ -0,0 +1,207 @@
+"""
+Steam appreviews 커서 체인을 asyncio로 동시에 따라가는 리뷰 수집기.
+
+MOBA_INDI.py의 fetch_reviews_for_app은 requests.get을 한 번에 하나씩 호출하고(세션 없음),
+매 페이지마다 time.sleep(0.5)를 하며, app_id도 하나씩 순서대로 처리한다.
+여기서는 여러 app_id의 커서 체인을 동시에 진행한다.
+
+주요 기능:
+1. aiohttp.ClientSession 하나로 keep-alive 커넥션을 재사용 (TCP/TLS 핸드셰이크 절약).
+2. 호스트별 동시 요청 수 상한 (TCPConnector limit_per_host + 호스트별 세마포어).
+3. 동시에 열어 둘 app 커서 체인 수 상한 (max_apps_in_flight).
+4. 기존과 동일한 seen_cursors 루프 방지 / max_reviews 상한 / 리뷰 필드 구성.
+5. base_url을 바꿔서 로컬 가짜 서버(fake_appreviews_server.py)로 오프라인 벤치마크 가능.
+6. 공용 rate_limiter("appreviews" 계열)로 429 시 Retry-After 준수 + AIMD 속도 조절.
+7. collect=False + on_page로 페이지 단위 스트리밍, should_stop으로 증분 수집 중단 (review_loader.py).
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.rate_limiter import get_limiter, parse_retry_after, print_rate_stats
+
+APPREVIEWS_URL = "https://store.steampowered.com/appreviews/{appid}"
+
+# 사용자 Agent 설정 (MOBA_INDI.py와 동일)
+headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+}
+
+
+def build_review_row(appid, review):
+    """Steam API 리뷰 1건을 GAME_REVIEW 행(dict)으로 변환한다. (MOBA_INDI.py와 같은 필드)"""
+    return {
+        "app_id": appid,
+        "review_id": review.get("recommendationid"),
+        "review_text": review.get("review", ""),
+        "timestamp": review.get("timestamp_created"),
+        "steam_purchase": review.get("steam_purchase"),
+        "playtime_forever": review.get("author", {}).get("playtime_forever"),
+        "voted_up": review.get("voted_up"),  # 추천 여부 (True / False)
+        "votes_up": review.get("votes_up"),   # 추천 받은 총 횟수
+        "weighted_vote_score": review.get("weighted_vote_score"),
+    }
+
+
+async def fetch_reviews_for_app_async(session, appid, host_semaphore,
+                                      max_reviews=60000, base_url=APPREVIEWS_URL,
+                                      delay=0.0, start_cursor="*", on_page=None, limiter=None,
+                                      max_throttle_retries=5, collect=True, should_stop=None,
+                                      on_finish=None):
+    """
+    한 app_id의 커서 체인을 끝까지 따라가며 리뷰를 모은다.
+    - host_semaphore: 같은 호스트로 동시에 나가는 요청 수 제한
+    - limiter: 공용 AdaptiveRateLimiter (None이면 속도 제한 없음, 벤치마크용)
+    - on_page(appid, rows, cursor): 페이지가 도착할 때마다 호출되는 콜백 (선택)
+    - collect: False면 리뷰를 모아 두지 않음 (on_page로 바로 흘려보내는 스트리밍 적재용, 빈 리스트 반환)
+    - should_stop(appid, rows): 페이지 처리 후 True를 돌려주면 체인 중단 (증분 수집의 high-water mark)
+    - on_finish(appid, reason, cursor): 체인이 끝난 이유 "end" / "cap" / "stop" / "error"와 마지막 커서
+    """
+    reviews = []
+    n_fetched = 0
+    cursor = start_cursor
+    seen_cursors = set()
+    reason = "cap"
+
+    url = base_url.format(appid=appid)
+    params = {
+        "json": 1,
+        "language": "english",
+        "filter": "recent",
+        "review_type": "all",
+        "purchase_type": "all",
+        "num_per_page": 100,
+        "cursor": cursor
+    }
+
+    throttle_retries = 0
+    while n_fetched < max_reviews:
+        params["cursor"] = cursor
+        try:
+            if limiter:
+                await limiter.acquire_async()
+            async with host_semaphore:
+                async with session.get(url, params=params) as response:
+                    if response.status == 429 and limiter and throttle_retries < max_throttle_retries:
+                        # 같은 커서로 재시도 (limiter가 Retry-After 동안 계열 전체를 멈춤)
+                        limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+                        throttle_retries += 1
+                        continue
+                    if response.status >= 500 and limiter:
+                        # 5xx: limited_request와 같이 공유 버킷 rate를 줄인 뒤 실패 처리
+                        limiter.on_server_error()
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+            if limiter:
+                limiter.on_success()
+            throttle_retries = 0
+        except Exception as e:
+            logging.error(f"APP ID {appid}의 리뷰 가져오기 실패: {e}")
+            reason = "error"
+            break
+
+        new_reviews = data.get("reviews", [])
+        if not new_reviews:
+            reason = "end"
+            break
+
+        page_rows = []
+        for review in new_reviews:
+            page_rows.append(build_review_row(appid, review))
+            if n_fetched + len(page_rows) >= max_reviews:
+                break
+        n_fetched += len(page_rows)
+        if collect:
+            reviews.extend(page_rows)
+
+        cursor = data.get("cursor")
+        if on_page:
+            on_page(appid, page_rows, cursor)
+
+        if should_stop and should_stop(appid, page_rows):
+            reason = "stop"
+            break
+        if not cursor or cursor in seen_cursors:
+            reason = "end"
+            break
+        seen_cursors.add(cursor)
+        if delay:
+            await asyncio.sleep(delay)  # 앱 단위 요청 간격 (기본 0, 호스트 상한으로 조절)
+    if on_finish:
+        on_finish(appid, reason, cursor)
+    return reviews
+
+
+async def harvest_reviews(app_ids, max_reviews=60000, base_url=APPREVIEWS_URL,
+                          max_per_host=8, max_apps_in_flight=32, delay=0.0,
+                          start_cursors=None, on_page=None, on_app_done=None, use_rate_limiter=True,
+                          collect=True, should_stop=None, on_finish=None):
+    """
+    여러 app_id의 리뷰를 동시에 수집한다.
+    반환: {appid: [review_row, ...]} (collect=False면 빈 리스트, 행은 on_page로만 전달)
+    - max_per_host: 호스트별 동시 요청(커넥션) 상한
+    - max_apps_in_flight: 동시에 진행 중인 커서 체인 수 상한
+    - start_cursors: {appid: cursor} 이어받기용 시작 커서 (없으면 "*")
+    - on_app_done(appid, rows): app 하나가 끝날 때 호출 (선택)
+    - use_rate_limiter: 공용 "appreviews" limiter 사용 여부 (로컬 벤치마크 시 False)
+    """
+    start_cursors = start_cursors or {}
+    host = urlsplit(base_url.format(appid=0)).netloc
+    host_semaphores = {host: asyncio.Semaphore(max_per_host)}
+    app_semaphore = asyncio.Semaphore(max_apps_in_flight)
+    limiter = get_limiter("appreviews") if use_rate_limiter else None
+
+    connector = aiohttp.TCPConnector(
+        limit=max_per_host * len(host_semaphores),
+        limit_per_host=max_per_host,
+        keepalive_timeout=30,
+        ttl_dns_cache=300
+    )
+    timeout = aiohttp.ClientTimeout(total=30)
+    results = {}
+
+    async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
+        async def run_one(appid):
+            async with app_semaphore:
+                logging.info(f"APP ID {appid}의 리뷰 수집 중...")
+                rows = await fetch_reviews_for_app_async(
+                    session, appid, host_semaphores[host],
+                    max_reviews=max_reviews, base_url=base_url, delay=delay,
+                    start_cursor=start_cursors.get(appid, "*"), on_page=on_page, limiter=limiter,
+                    collect=collect, should_stop=should_stop, on_finish=on_finish
+                )
+                results[appid] = rows
+                if on_app_done:
+                    on_app_done(appid, rows)
+
+        await asyncio.gather(*(run_one(appid) for appid in app_ids))
+    return results
+
+
+def harvest_all_reviews(app_ids, **kwargs):
+    """동기 코드(MOBA_INDI.py 등)에서 호출하기 위한 래퍼. 소요 시간/처리량도 로그로 남긴다."""
+    # collect=False(스트리밍)면 results가 비어 있으므로 개수는 on_page에서 셈
+    fetched = [0]
+    user_on_page = kwargs.pop("on_page", None)
+
+    def counting_on_page(appid, rows, cursor):
+        fetched[0] += len(rows)
+        if user_on_page:
+            user_on_page(appid, rows, cursor)
+
+    t0 = time.perf_counter()
+    results = asyncio.run(harvest_reviews(app_ids, on_page=counting_on_page, **kwargs))
+    elapsed = time.perf_counter() - t0
+    total = fetched[0]
+    logging.info(f"[HARVEST] {len(results)}개 앱, 리뷰 {total}개, {elapsed:.1f}초 "
+                 f"({total / elapsed if elapsed else 0:.0f} reviews/sec)")
+    print_rate_stats()
+    return results
@@ -0,0 +1,322 @@
+"""
+GAME_REVIEW 스트리밍 증분 적재기 (review_harvester.py의 on_page 콜백으로 페이지 단위 적재).
+
+기존 MOBA_INDI.py: 모든 app의 리뷰를 reviews_data 리스트 하나에 모은 뒤 DataFrame으로 만들어
+to_sql("GAME_REVIEW", if_exists="replace") => 매 실행마다 테이블 전체를 지우고 다시 쓰며,
+전체 리뷰(수백만 건)를 한꺼번에 RAM에 들고 있었다.
+
+변경:
+1. GAME_REVIEW는 PRIMARY KEY(review_id) + KEY(app_id, timestamp) 고정 스키마.
+   페이지가 도착할 때마다 버퍼에 넣고 chunk_size마다 INSERT ... ON DUPLICATE KEY UPDATE (executemany)
+   => 같은 리뷰를 다시 받아도 중복 없이 추천 수 / 플레이 시간 등만 갱신, 메모리는 chunk_size 수준.
+2. GAME_REVIEW_WATERMARK(app별 high-water mark)
+   - newest_created: 적재된 가장 최근 timestamp_created (unix 초)
+   - last_cursor / backfill_done: 과거 방향 체인을 어디까지 따라갔는지 (중단되면 다음 실행에서 이어받음)
+   워터마크는 해당 행들과 같은 트랜잭션에서 commit => 워터마크가 실제 적재보다 앞서 나가지 않음.
+3. 실행 순서 (filter=recent는 최신순)
+   - head: "*"부터 받다가 newest_created보다 오래된 리뷰가 나오면 그 app은 중단 (새 리뷰만 받음)
+           처음 보는 app은 끝까지 받으며 newest_created / last_cursor를 페이지마다 기록
+   - tail: 이전 실행이 중간에 끊긴 app(backfill_done=0)은 last_cursor부터 과거 방향 이어받기
+   head 체인이 끝까지(중단 조건 또는 체인 끝) 가야만 newest_created를 올림
+   => 중간에 실패해도 다음 실행에서 같은 구간을 다시 받을 뿐 (review_id upsert라 중복 없음)
+4. 기존 GAME_REVIEW(to_sql로 만든 PK 없는 테이블)가 있으면 GAME_REVIEW_LEGACY로 이름을 바꾸고
+   review_id 기준으로 옮겨 담은 뒤 app별 워터마크를 채움 (LEGACY 테이블은 확인 후 직접 DROP).
+
+사용 예:
+    load_reviews_incremental(app_ids, max_reviews=60000, clean_text=clean_review_text)
+"""
+
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from review_harvester import harvest_all_reviews
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.db import get_connection
+
+REVIEW_TABLE = "GAME_REVIEW"
+WATERMARK_TABLE = "GAME_REVIEW_WATERMARK"
+REVIEW_CHUNK_SIZE = int(os.getenv("REVIEW_CHUNK_SIZE", 2000))
+
+REVIEW_COLUMNS = ("review_id", "app_id", "review_text", "timestamp", "steam_purchase",
+                  "playtime_forever", "voted_up", "votes_up", "weighted_vote_score")
+# 다시 받았을 때 바뀔 수 있는 값 (리뷰 수정 / 추천 수 / 플레이 시간)
+REVIEW_UPDATE_COLUMNS = ("review_text", "playtime_forever", "voted_up", "votes_up", "weighted_vote_score")
+
+
+########################################
+# 테이블
+########################################
+def review_table_sql(table=REVIEW_TABLE):
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+      review_id           BIGINT     NOT NULL,
+      app_id              BIGINT     NOT NULL,
+      review_text         MEDIUMTEXT,
+      `timestamp`         DATETIME,
+      steam_purchase      TINYINT(1),
+      playtime_forever    FLOAT,
+      voted_up            TINYINT(1),
+      votes_up            INT,
+      weighted_vote_score DOUBLE,
+      PRIMARY KEY (review_id),
+      KEY idx_app_time (app_id, `timestamp`)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """
+
+
+def watermark_table_sql(table=WATERMARK_TABLE):
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+      app_id         BIGINT       NOT NULL,
+      newest_created BIGINT       NOT NULL DEFAULT 0,
+      last_cursor    VARCHAR(512),
+      backfill_done  TINYINT(1)   NOT NULL DEFAULT 0,
+      updated_at     DATETIME     NOT NULL,
+      PRIMARY KEY (app_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """
+
+
+def _has_primary_key(cur, table):
+    cur.execute("""
+    SELECT COUNT(*) FROM information_schema.STATISTICS
+     WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = 'PRIMARY'
+    """, (table,))
+    return cur.fetchone()[0] > 0
+
+
+def _table_exists(cur, table):
+    cur.execute("""
+    SELECT COUNT(*) FROM information_schema.TABLES
+     WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return cur.fetchone()[0] > 0
+
+
+def ensure_review_tables(table=REVIEW_TABLE, watermark_table=WATERMARK_TABLE):
+    """GAME_REVIEW / 워터마크 테이블 보장. to_sql로 만든 예전 테이블은 LEGACY로 옮겨서 이관"""
+    legacy = f"{table}_LEGACY"
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            migrate = _table_exists(cur, table) and not _has_primary_key(cur, table)
+            if migrate:
+                cur.execute(f"RENAME TABLE {table} TO {legacy}")
+            cur.execute(review_table_sql(table))
+            cur.execute(watermark_table_sql(watermark_table))
+            if migrate:
+                cols = ", ".join(f"`{c}`" for c in REVIEW_COLUMNS[1:])
+                cur.execute(f"""
+                INSERT IGNORE INTO {table} (review_id, {cols})
+                SELECT CAST(review_id AS UNSIGNED), {cols}
+                  FROM {legacy}
+                 WHERE review_id IS NOT NULL
+                """)
+                moved = cur.rowcount
+                # 예전 실행은 app마다 max_reviews까지 끝까지 받았으므로 과거 방향은 완료로 봄
+                cur.execute(f"""
+                INSERT IGNORE INTO {watermark_table} (app_id, newest_created, last_cursor, backfill_done, updated_at)
+                SELECT app_id, IFNULL(TIMESTAMPDIFF(SECOND, '1970-01-01', MAX(`timestamp`)), 0), NULL, 1, NOW()
+                  FROM {table}
+                 GROUP BY app_id
+                """)
+                print(f"[REVIEW] 기존 {table}(PK 없음) -> {legacy}로 이름 변경, {moved}건 이관 "
+                      f"(확인 후 {legacy} DROP)")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_watermarks(watermark_table=WATERMARK_TABLE):
+    """{app_id: {"newest": unix초, "cursor": str|None, "done": bool}} (쿼리 1번)"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT app_id, newest_created, last_cursor, backfill_done FROM {watermark_table}")
+            return {int(app_id): {"newest": int(newest or 0), "cursor": cursor, "done": bool(done)}
+                    for app_id, newest, cursor, done in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+########################################
+# 행 변환 (MOBA_INDI.py의 DataFrame 전처리와 같은 규칙)
+########################################
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value):
+    return None if value is None else int(bool(value))
+
+
+def to_db_row(row, clean_text=None):
+    """
+    harvester 행(dict) -> GAME_REVIEW 튜플 (REVIEW_COLUMNS 순서)
+    playtime_forever: 분 -> 시간 (소수 1자리) / timestamp: Unix 초 -> datetime (UTC, pd.to_datetime(unit='s')와 동일)
+    """
+    text = row.get("review_text") or ""
+    playtime = _to_float(row.get("playtime_forever"))
+    ts = row.get("timestamp")
+    created = datetime.fromtimestamp(int(ts), timezone.utc).replace(tzinfo=None) if ts else None
+    return (
+        int(row["review_id"]),
+        int(row["app_id"]),
+        clean_text(text) if clean_text else text,
+        created,
+        _to_bool(row.get("steam_purchase")),
+        round(playtime / 60, 1) if playtime is not None else None,
+        _to_bool(row.get("voted_up")),
+        row.get("votes_up"),
+        _to_float(row.get("weighted_vote_score")),
+    )
+
+
+########################################
+# 스트리밍 적재기
+########################################
+class ReviewStreamLoader:
+    def __init__(self, chunk_size=REVIEW_CHUNK_SIZE, clean_text=None, table=REVIEW_TABLE,
+                 watermark_table=WATERMARK_TABLE, conn_factory=get_connection):
+        self.chunk_size = chunk_size
+        self.clean_text = clean_text
+        self.table = table
+        self.watermark_table = watermark_table
+        self.conn_factory = conn_factory
+        self.marks = {}       # app_id -> {"newest", "cursor", "done"}
+        self.since = {}       # 실행 시작 시점의 newest_created (이미 받은 적 있는 app만)
+        self.head_newest = {}
+        self.buffer = []
+        self.dirty = set()    # 다음 flush 때 같이 기록할 워터마크 app_id
+        self.mode = "head"
+        self.stats = {"pages": 0, "fetched": 0, "written": 0, "flushes": 0, "write_sec": 0.0}
+
+        cols = ", ".join(f"`{c}`" for c in REVIEW_COLUMNS)
+        updates = ", ".join(f"{c} = VALUES({c})" for c in REVIEW_UPDATE_COLUMNS)
+        self.upsert_sql = (f"INSERT INTO {table} ({cols}) VALUES ({', '.join(['%s'] * len(REVIEW_COLUMNS))}) "
+                           f"ON DUPLICATE KEY UPDATE {updates}")
+        self.mark_sql = (f"INSERT INTO {watermark_table} "
+                         f"(app_id, newest_created, last_cursor, backfill_done, updated_at) "
+                         f"VALUES (%s, %s, %s, %s, %s) "
+                         f"ON DUPLICATE KEY UPDATE newest_created = VALUES(newest_created), "
+                         f"last_cursor = VALUES(last_cursor), backfill_done = VALUES(backfill_done), "
+                         f"updated_at = VALUES(updated_at)")
+
+    def _mark(self, appid):
+        return self.marks.setdefault(appid, {"newest": 0, "cursor": None, "done": False})
+
+    ########################################
+    # harvester 콜백
+    ########################################
+    def on_page(self, appid, rows, cursor):
+        self.stats["pages"] += 1
+        self.stats["fetched"] += len(rows)
+        since = self.since.get(appid) if self.mode == "head" else None
+        if since is not None:
+            # 새 리뷰만 (같은 초에 작성된 리뷰는 다시 받아도 upsert라 안전)
+            rows = [r for r in rows if (r.get("timestamp") or 0) >= since]
+            if rows:
+                newest = max(r.get("timestamp") or 0 for r in rows)
+                self.head_newest[appid] = max(self.head_newest.get(appid, 0), newest)
+        else:
+            # 처음 받는 app(head) / 이어받기(tail): 과거 방향 진행 위치를 페이지마다 기록
+            mark = self._mark(appid)
+            if rows:
+                mark["newest"] = max(mark["newest"], max(r.get("timestamp") or 0 for r in rows))
+            mark["cursor"] = cursor
+            self.dirty.add(appid)
+
+        self.buffer.extend(to_db_row(r, self.clean_text) for r in rows if r.get("review_id"))
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def should_stop(self, appid, rows):
+        """head에서 이미 받은 시점보다 오래된 리뷰가 나오면 그 app은 중단"""
+        since = self.since.get(appid) if self.mode == "head" else None
+        return since is not None and any((r.get("timestamp") or 0) < since for r in rows)
+
+    def on_finish(self, appid, reason, cursor):
+        if reason == "error":
+            return  # 워터마크를 올리지 않음 => 다음 실행에서 같은 구간부터 다시
+        mark = self._mark(appid)
+        if self.mode == "head" and appid in self.since:
+            if reason == "cap":
+                logging.warning(f"APP ID {appid}: 새 리뷰가 max_reviews를 넘음, newest_created 유지")
+                return
+            mark["newest"] = max(mark["newest"], self.head_newest.get(appid, 0))
+        else:
+            mark["done"] = True
+        self.dirty.add(appid)
+
+    ########################################
+    # 쓰기
+    ########################################
+    def flush(self):
+        """버퍼의 리뷰 + 바뀐 워터마크를 한 트랜잭션으로 기록"""
+        if not self.buffer and not self.dirty:
+            return
+        t0 = time.perf_counter()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        marks = [(appid, self.marks[appid]["newest"], self.marks[appid]["cursor"],
+                  int(self.marks[appid]["done"]), now) for appid in sorted(self.dirty)]
+        conn = self.conn_factory()
+        try:
+            with conn.cursor() as cur:
+                if self.buffer:
+                    cur.executemany(self.upsert_sql, self.buffer)
+                if marks:
+                    cur.executemany(self.mark_sql, marks)
+            conn.commit()
+        finally:
+            conn.close()
+        self.stats["written"] += len(self.buffer)
+        self.stats["flushes"] += 1
+        self.stats["write_sec"] += time.perf_counter() - t0
+        self.buffer = []
+        self.dirty = set()
+
+    ########################################
+    # 실행
+    ########################################
+    def run(self, app_ids, max_reviews=60000, **harvest_kwargs):
+        self.marks = load_watermarks(self.watermark_table)
+        self.since = {appid: self.marks[appid]["newest"] for appid in app_ids if appid in self.marks}
+        callbacks = {"collect": False, "on_page": self.on_page, "on_finish": self.on_finish}
+
+        # 1) head: 최신 리뷰부터 워터마크까지 (처음 보는 app은 끝까지)
+        self.mode = "head"
+        harvest_all_reviews(app_ids, max_reviews=max_reviews, should_stop=self.should_stop,
+                            **callbacks, **harvest_kwargs)
+        self.flush()
+
+        # 2) tail: 예전 실행에서 과거 방향이 중간에 끊긴 app은 last_cursor부터 이어받기
+        resume = {appid: self.marks[appid]["cursor"] for appid in self.since
+                  if not self.marks[appid]["done"] and self.marks[appid]["cursor"]}
+        if resume:
+            self.mode = "tail"
+            harvest_all_reviews(list(resume), max_reviews=max_reviews, start_cursors=resume,
+                                **callbacks, **harvest_kwargs)
+            self.flush()
+
+        s = self.stats
+        logging.info(f"[REVIEW] app {len(app_ids)}개 (신규 {len(app_ids) - len(self.since)} / "
+                     f"증분 {len(self.since)} / 이어받기 {len(resume)}): 페이지 {s['pages']}, "
+                     f"받은 리뷰 {s['fetched']}, 적재 {s['written']}건 "
+                     f"({s['flushes']}회 flush, 쓰기 {s['write_sec']:.1f}초)")
+        return s
+
+
+def load_reviews_incremental(app_ids, max_reviews=60000, chunk_size=REVIEW_CHUNK_SIZE, clean_text=None,
+                             **harvest_kwargs):
+    """GAME_REVIEW에 새 리뷰만 스트리밍 적재 (메모리는 chunk_size 수준)"""
+    ensure_review_tables()
+    loader = ReviewStreamLoader(chunk_size=chunk_size, clean_text=clean_text)
+    return loader.run(app_ids, max_reviews=max_reviews, **harvest_kwargs)
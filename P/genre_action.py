@@ -1,14 +1,19 @@
-import requests
-import time
 import os
+import sys
 import json
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.http_cache import cached_get, print_cache_stats
+from common.rate_limiter import limited_get, print_rate_stats
+from common.checkpoint_journal import CheckpointJournal
+
 # --------------------------------------------------------
 # 1) Steam 전체 앱 목록 가져오기 (GetAppList)
 # --------------------------------------------------------
 def get_all_steam_apps():
     url = "https://api.steampowered.com/ISteamApps/GetAppList/v2/"
-    resp = requests.get(url)
+    resp = limited_get(None, url)
     if resp.status_code != 200:
         print("GetAppList error:", resp.status_code)
         return []
@@ -20,10 +25,10 @@ def get_all_steam_apps():
 # --------------------------------------------------------
 # 2) 리뷰 점수 조회 함수 (appreviews)
 # --------------------------------------------------------
-def get_review_score_desc(appid, backoff=30):
+def get_review_score_desc(appid):
     """
     해당 appid의 리뷰 평점(review_score_desc)을 반환.
-    HTTP 429가 발생하면 backoff초 동안 대기 후 한 번 재시도함.
+    HTTP 429는 rate_limiter가 Retry-After/AIMD로 대기 후 재시도함.
     """
     url = f"https://store.steampowered.com/appreviews/{appid}"
     params = {
@@ -32,16 +37,11 @@ def get_review_score_desc(appid, backoff=30):
         "filter": "recent",
         "num_per_page": 0
     }
-    resp = requests.get(url, params=params)
+    resp = cached_get(url, params=params)
     
     if resp.status_code == 429:
-        print(f"[WARN] 429 Too Many Requests (appreviews) - appid={appid}, 대기 {backoff}초")
-        time.sleep(backoff)
-        # 재시도
-        resp = requests.get(url, params=params)
-        if resp.status_code == 429:
-            print("[ERROR] 재시도에도 429 발생. 더 길게 대기하거나 로직을 개선해야 함.")
-            return None
+        print(f"[ERROR] 재시도에도 429 발생 (appreviews) - appid={appid}")
+        return None
     
     if resp.status_code != 200:
         print(f"[ERROR] appreviews({appid}) HTTP {resp.status_code}")
@@ -54,20 +54,16 @@ def get_review_score_desc(appid, backoff=30):
 # --------------------------------------------------------
 # 3) appdetails 호출로 장르, type=game 여부 확인
 # --------------------------------------------------------
-def get_appdetails(appid, backoff=30):
+def get_appdetails(appid):
     """
     해당 appid의 appdetails 결과(장르, type 등)를 반환.
     """
     url = f"https://store.steampowered.com/api/appdetails?appids={appid}"
-    resp = requests.get(url)
+    resp = cached_get(url)
     
     if resp.status_code == 429:
-        print(f"[WARN] 429 Too Many Requests (appdetails) - appid={appid}, 대기 {backoff}초")
-        time.sleep(backoff)
-        resp = requests.get(url)
-        if resp.status_code == 429:
-            print("[ERROR] 재시도에도 429 발생. 더 길게 대기하거나 로직을 개선해야 함.")
-            return None
+        print(f"[ERROR] 재시도에도 429 발생 (appdetails) - appid={appid}")
+        return None
     
     if resp.status_code != 200:
         print(f"[ERROR] appdetails({appid}) HTTP {resp.status_code}")
@@ -82,21 +78,14 @@ def get_appdetails(appid, backoff=30):
 # --------------------------------------------------------
 # 4) 대량 처리 시 중간 저장/재개를 위한 함수
 # --------------------------------------------------------
-def load_partial_results(filename="partial_results.json"):
-    """
-    중간 저장된 결과를 로드하고, {appid: {...}} 형태로 반환
-    """
-    if not os.path.exists(filename):
-        return {}
-    with open(filename, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def save_partial_results(data, filename="partial_results.json"):
+def open_journal(journal_file="genre_scan_journal.sqlite", legacy_file="partial_results.json"):
     """
-    중간 결과 {appid: {...}} 를 JSON 파일로 저장
+    append-only 체크포인트 저널을 연다.
+    예전 실행에서 남은 partial_results.json이 있으면 처음 한 번만 저널로 옮긴다.
     """
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    journal = CheckpointJournal(journal_file, flush_every=100)
+    journal.import_legacy_json(legacy_file)
+    return journal
 
 # --------------------------------------------------------
 # 5) 메인 처리 로직
@@ -104,22 +93,24 @@ def save_partial_results(data, filename="partial_results.json"):
 def get_very_positive_games_by_genre(
     target_genre="Action", 
     chunk_size=5000,  # 한 번에 처리할 앱 개수
-    resume_file="partial_results.json"
+    resume_file="genre_scan_journal.sqlite"
 ):
     """
     1) 전체 앱 리스트를 chunk로 나눠 순회
     2) appdetails -> 장르 & type='game' 여부 확인
     3) appreviews -> 'Very Positive' 여부 확인
-    4) 중간 결과를 {appid: {...}} 형태로 partial_results.json 에 저장
+    4) 처리 결과를 appid마다 한 건씩 저널(resume_file, SQLite)에 추가
        - 나중에 재실행하면 이미 처리된 appid는 건너뛸 수 있음
+       - 재개 시에는 appid 인덱스와 'VP' 결과만 읽음
     """
     all_apps = get_all_steam_apps()
-    partial = load_partial_results(resume_file)  # 이전 실행 기록 로드
+    journal = open_journal(resume_file)
     
-    # 최종 결과(조건 만족)
-    final_results = {}
-    # 이미 partial에 저장된 (성공/실패) 앱 ID를 중복 처리하지 않기 위함
-    processed_ids = set(partial.keys())
+    # 이미 저널에 기록된 (성공/실패) 앱 ID를 중복 처리하지 않기 위함
+    processed_ids = journal.processed_keys()
+    # 최종 결과(조건 만족): 이전 실행에서 찾은 'VP'부터 채움
+    final_results = journal.records(result="VP")
+    print(f"[INFO] 저널에서 처리 완료 {len(processed_ids)}개 / VP {len(final_results)}개 로드")
     
     # apps를 chunk_size 단위로 자르기
     for start_idx in range(0, len(all_apps), chunk_size):
@@ -132,38 +123,32 @@ def get_very_positive_games_by_genre(
             appid = str(app["appid"])
             name = app["name"]
             
-            # 이미 처리된 appid면 스킵
+            # 이미 처리된 appid면 스킵 ('VP'는 위에서 final_results에 이미 들어 있음)
             if appid in processed_ids:
-                # partial에서 가져온 상태가 'skip'/'VP' 등일 수 있으므로,
-                # 만약 partial[appid]가 'VP'라면 final_results에 추가 가능
-                info = partial[appid]
-                if info.get("result") == "VP":
-                    final_results[appid] = info
                 continue
+            processed_ids.add(appid)
             
             # 1) appdetails 조회
-            detail_data = get_appdetails(appid)
-            time.sleep(0.3)  # 호출 간 딜레이
+            detail_data = get_appdetails(appid)  # 호출 간격은 rate_limiter가 조절 (캐시 hit이면 대기 없음)
             
             if not detail_data:
                 # 실패하거나 success=False
-                partial[appid] = {"result": "fail", "name": name}
+                journal.append(appid, {"result": "fail", "name": name})
                 continue
             
             if detail_data.get("type") != "game":
-                partial[appid] = {"result": "skip_not_game", "name": name}
+                journal.append(appid, {"result": "skip_not_game", "name": name})
                 continue
             
             # 장르 체크
             genres = detail_data.get("genres", [])
             genre_names = [g["description"].lower() for g in genres if "description" in g]
             if target_genre.lower() not in " ".join(genre_names):
-                partial[appid] = {"result": "skip_wrong_genre", "name": name}
+                journal.append(appid, {"result": "skip_wrong_genre", "name": name})
                 continue
             
             # 2) review_score_desc 조회
             score_desc = get_review_score_desc(appid)
-            time.sleep(0.3)  # 호출 간 딜레이
             
             if score_desc and score_desc.lower() == "very positive":
                 # 조건 만족
@@ -174,23 +159,24 @@ def get_very_positive_games_by_genre(
                     "review_score_desc": score_desc,
                     "result": "VP"
                 }
-                partial[appid] = final_results[appid]
+                journal.append(appid, final_results[appid])
             else:
-                partial[appid] = {
+                journal.append(appid, {
                     "result": "skip_review",
                     "name": name,
                     "review_score_desc": score_desc
-                }
-            
-            # 처리 후 partial 저장 (예: 100개 단위로)
-            if len(partial) % 100 == 0:
-                save_partial_results(partial, resume_file)
+                })
+            # 저널은 100건마다 자동 commit
         
-        # chunk 끝날 때 partial 저장
-        save_partial_results(partial, resume_file)
+        # chunk 끝날 때 남은 기록 commit
+        journal.flush()
     
+    journal.close()
+
     # 모든 chunk 끝나면 final_results 정리
     print(f"\n[INFO] '{target_genre}' & Very Positive 게임 수: {len(final_results)}")
+    print_cache_stats()
+    print_rate_stats()
     return final_results
 
 
@@ -215,7 +201,7 @@ if __name__ == "__main__":
     vp_games = get_very_positive_games_by_genre(
         target_genre=TARGET_GENRE,
         chunk_size=5000, 
-        resume_file="partial_results.json"  # 중간 결과 저장 파일
+        resume_file="genre_scan_journal.sqlite"  # 중간 결과 저널 (append-only)
     )
     
     # (2) 최종 결과 저장
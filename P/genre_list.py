@@ -2,6 +2,11 @@ import requests
 import json
 import time
 import os
+import sys
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.http_cache import cached_get
 
 # (필요하다면) 캐시나 API_KEY 설정
 STEAM_API_KEY = os.getenv("STEAM_API_KEY")  # .env 활용
@@ -21,6 +26,7 @@ RATING_SCORES = {
 def fetch_storesearch_by_term(term, page=1, page_size=50):
     """
     StoreSearch API를 term 검색어로 호출하여 page 단위 결과를 반환.
+    (디스크 캐시 사용: 재실행 시 TTL 내 응답은 로컬에서 읽음)
     실패 시 빈 list 반환.
     """
     url = "https://store.steampowered.com/api/storesearch"
@@ -33,7 +39,7 @@ def fetch_storesearch_by_term(term, page=1, page_size=50):
     }
 
     try:
-        resp = requests.get(url, params=params)
+        resp = cached_get(url, params=params)
         if resp.status_code == 200:
             data = resp.json()
             return data.get("items", [])
@@ -46,7 +52,8 @@ def fetch_storesearch_by_term(term, page=1, page_size=50):
 
 def fetch_app_details(app_id, max_retries=3):
     """
-    AppDetails API 호출 (간단 버전).
+    AppDetails API 호출 (간단 버전, 디스크 캐시 사용).
+    재시도는 캐시를 건너뛰고(force_refresh) 다시 요청, 간격은 rate_limiter가 조절.
     실패 시 None 반환.
     """
     url = "https://store.steampowered.com/api/appdetails"
@@ -58,22 +65,22 @@ def fetch_app_details(app_id, max_retries=3):
 
     for attempt in range(1, max_retries+1):
         try:
-            resp = requests.get(url, params=params)
+            resp = cached_get(url, params=params, force_refresh=attempt > 1)
             if resp.status_code == 200:
-                data = resp.json()
+                data = resp.json() or {}
                 if data.get(str(app_id), {}).get("success", False):
                     return data[str(app_id)]["data"]
             else:
                 print(f"[AppDetails] HTTP {resp.status_code} -> 재시도 {attempt}/{max_retries}")
         except Exception as e:
             print(f"[AppDetails] Exception: {e}")
-        time.sleep(1)
 
     return None
 
 def fetch_app_reviews(app_id, max_retries=3):
     """
-    AppReviews API 호출 (간단 버전).
+    AppReviews API 호출 (간단 버전, 디스크 캐시 사용).
+    재시도는 캐시를 건너뛰고(force_refresh) 다시 요청.
     실패 시 None 반환.
     """
     url = f"https://store.steampowered.com/appreviews/{app_id}"
@@ -85,14 +92,13 @@ def fetch_app_reviews(app_id, max_retries=3):
     }
     for attempt in range(1, max_retries+1):
         try:
-            resp = requests.get(url, params=params)
+            resp = cached_get(url, params=params, force_refresh=attempt > 1)
             if resp.status_code == 200:
                 return resp.json()
             else:
                 print(f"[AppReviews] HTTP {resp.status_code} -> 재시도 {attempt}/{max_retries}")
         except Exception as e:
             print(f"[AppReviews] Exception: {e}")
-        time.sleep(1)
 
     return None
 
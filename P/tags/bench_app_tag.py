@@ -0,0 +1,135 @@
+# bench_app_tag.py (태그 필터 벤치마크: JSON_CONTAINS 풀스캔 vs APP_TAG 인덱스 교집합)
+#
+# 합성 카탈로그(기본 10만 app)를 BENCH_TITLELIST / BENCH_APP_TAG에 만들고
+# 대시보드 fetch_titles_by_tags와 같은 모양의 쿼리를 두 방식으로 실행해서 시간 비교
+#   - 태그 인기도는 Zipf 비슷하게 (앞쪽 태그일수록 많이 붙음) => 흔한 태그 / 드문 태그 조합 모두 측정
+#   - 두 방식의 결과 app_id 집합이 같은지도 확인
+#
+# 실행: python bench_app_tag.py
+#   BENCH_APPS=100000 BENCH_TAGS=400 BENCH_REPEAT=5 BENCH_KEEP=1(테이블 남겨두기)
+
+import os
+import sys
+import json
+import time
+import random
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.db import get_connection
+from common.app_tag import create_app_tag_table, rebuild_app_tag, tag_filter_sql
+
+N_APPS = int(os.getenv("BENCH_APPS", 100000))
+N_TAGS = int(os.getenv("BENCH_TAGS", 400))
+REPEAT = int(os.getenv("BENCH_REPEAT", 5))
+KEEP_TABLES = os.getenv("BENCH_KEEP", "0") == "1"
+TITLE_TABLE = "BENCH_TITLELIST"
+TAG_TABLE = "BENCH_APP_TAG"
+
+########################################
+# 1) 합성 카탈로그
+########################################
+def make_catalog(n_apps, n_tags, seed=42):
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(n_tags)]
+    tag_ids = list(range(1, n_tags + 1))
+    rows = []
+    for app_id in range(1, n_apps + 1):
+        k = rng.randint(5, 20)
+        tags = list(dict.fromkeys(rng.choices(tag_ids, weights=weights, k=k)))
+        rows.append((app_id, f"bench app {app_id}", json.dumps(tags),
+                     round(rng.uniform(0, 60), 2), str(rng.randint(2005, 2025)),
+                     round(rng.uniform(20, 100), 1)))
+    return rows
+
+def load_catalog(rows, chunk_size=5000):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {TITLE_TABLE}")
+            cur.execute(f"""
+            CREATE TABLE {TITLE_TABLE} (
+              app_id      BIGINT      NOT NULL,
+              name        VARCHAR(255),
+              user_tags   TEXT,
+              price_us    FLOAT,
+              releaseYear VARCHAR(10),
+              userScore   FLOAT,
+              start_date  DATETIME    NOT NULL,
+              end_date    DATETIME    NOT NULL DEFAULT '9999-12-31',
+              PRIMARY KEY (app_id, start_date)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            """)
+            for i in range(0, len(rows), chunk_size):
+                cur.executemany(f"""
+                INSERT INTO {TITLE_TABLE}
+                 (app_id, name, user_tags, price_us, releaseYear, userScore, start_date, end_date)
+                VALUES (%s, %s, %s, %s, %s, %s, NOW(), '9999-12-31')
+                """, rows[i:i + chunk_size])
+            cur.execute(f"DROP TABLE IF EXISTS {TAG_TABLE}")
+        conn.commit()
+    finally:
+        conn.close()
+    create_app_tag_table(TAG_TABLE)
+    rebuild_app_tag(TITLE_TABLE, TAG_TABLE)
+
+########################################
+# 2) 두 방식의 쿼리
+########################################
+def json_contains_query(tag_ids):
+    conditions = " AND ".join(["JSON_CONTAINS(user_tags, %s)" for _ in tag_ids])
+    sql = f"SELECT app_id, name, user_tags, userScore FROM {TITLE_TABLE} WHERE {conditions}"
+    return sql, [str(t) for t in tag_ids]
+
+def app_tag_query(tag_ids):
+    tag_match, params = tag_filter_sql(tag_ids, TAG_TABLE)
+    sql = f"""
+    SELECT t.app_id, t.name, t.user_tags, t.userScore
+      FROM {TITLE_TABLE} t
+      JOIN ({tag_match}) m ON m.app_id = t.app_id
+    """
+    return sql, params
+
+def time_query(cur, sql, params, repeat=REPEAT):
+    best = None
+    app_ids = set()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        app_ids = {row[0] for row in cur.fetchall()}
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, app_ids
+
+########################################
+# 3) MAIN
+########################################
+def main():
+    t0 = time.perf_counter()
+    rows = make_catalog(N_APPS, N_TAGS)
+    load_catalog(rows)
+    print(f"[BENCH] 합성 카탈로그 {N_APPS} app / 태그 {N_TAGS}개 적재 ({time.perf_counter() - t0:.1f}초)")
+
+    # 흔한 태그(앞쪽) ~ 드문 태그(뒤쪽) 조합
+    cases = [[1], [N_TAGS // 2], [1, 2], [1, 50], [3, 7, 20], [1, 2, 3, 4], [10, N_TAGS - 1]]
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            print(f"{'tags':<22}{'결과':>8}{'JSON_CONTAINS':>16}{'APP_TAG':>12}{'배수':>8}")
+            for tag_ids in cases:
+                old_sec, old_ids = time_query(cur, *json_contains_query(tag_ids))
+                new_sec, new_ids = time_query(cur, *app_tag_query(tag_ids))
+                same = "" if old_ids == new_ids else "  [결과 불일치!]"
+                ratio = old_sec / new_sec if new_sec > 0 else float("inf")
+                print(f"{str(tag_ids):<22}{len(new_ids):>8}{old_sec * 1000:>14.1f}ms{new_sec * 1000:>10.1f}ms"
+                      f"{ratio:>7.1f}x{same}")
+            if not KEEP_TABLES:
+                cur.execute(f"DROP TABLE IF EXISTS {TAG_TABLE}")
+                cur.execute(f"DROP TABLE IF EXISTS {TITLE_TABLE}")
+        conn.commit()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
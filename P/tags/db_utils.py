@@ -5,26 +5,12 @@
 >>>>>>> bb5fe532052a65568f5396c5279c58effc69f8cc
 
 import os
+import sys
 import pymysql
-from dotenv import load_dotenv
 
-def get_connection():
-    load_dotenv()
-    dbuser = os.getenv('dbuser')
-    password = os.getenv('password')
-    host = os.getenv('host')
-    port = int(os.getenv('port', 3306))
-    dbname = os.getenv('name')
-
-    conn = pymysql.connect(
-        host=host,
-        user=dbuser,
-        password=password,
-        db=dbname,
-        port=port,
-        charset="utf8mb4"
-    )
-    return conn
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.db import get_connection
 
 <<<<<<< HEAD
 =======
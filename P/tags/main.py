@@ -2,24 +2,35 @@
 
 import json
 import os
+import sys
 
 from db_utils import fetch_app_ids, update_app_tags
 from tags_crawler import fetch_tags_via_plus_button
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.tag_http_extractor import fetch_tags_bulk
+
 def stage1_save_to_json(json_path="tags_stage1.json"):
     """
     1) DB에서 app_id 목록
-    2) 각각 태그 크롤링
+    2) 태그 크롤링 (HTTP로 동시 수집, 실패분만 셀레니움 +버튼)
     3) 결과를 로컬 JSON에 저장
     """
     app_ids = fetch_app_ids()
     print(f"[INFO] {len(app_ids)}개 app_id: {app_ids}")
 
+    tag_results = fetch_tags_bulk(
+        app_ids,
+        max_workers=8,
+        selenium_fallback=lambda app_id: fetch_tags_via_plus_button(app_id)["user_tags"]
+    )
+
     results = []
     for i, app_id in enumerate(app_ids, start=1):
-        print(f"\n[{i}/{len(app_ids)}] app_id={app_id}: 태그 수집")
-        data = fetch_tags_via_plus_button(app_id)
-        results.append(data)
+        data = tag_results[app_id]
+        print(f"[{i}/{len(app_ids)}] app_id={app_id}: 태그 {len(data['user_tags'])}개 ({data['source']})")
+        results.append({"app_id": app_id, "name": data["name"], "user_tags": data["user_tags"]})
 
     # 로컬 JSON 저장
     with open(json_path, "w", encoding="utf-8") as f:
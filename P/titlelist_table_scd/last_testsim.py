@@ -1,6 +1,6 @@
 import os
+import sys
 import time
-import pymysql
 from dotenv import load_dotenv
 
 from selenium import webdriver
@@ -10,23 +10,10 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.db import get_connection
 
-def get_connection():
-    """
-    .env에서 로드한 DB_HOST, DB_USER, DB_PW, DB_NAME을 이용해 pymysql 연결
-    """
-    DB_HOST = os.getenv("host")
-    DB_USER = os.getenv("dbuser")
-    DB_PW = os.getenv("password")
-    DB_NAME = os.getenv("name")
-
-    return pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PW,
-        database=DB_NAME,
-        charset="utf8mb4"
-    )
 
 def steam_manual_login(driver):
     """
@@ -1,23 +1,9 @@
 import os
-import pymysql
-from dotenv import load_dotenv
+import sys
 
-def get_connection():
-    load_dotenv()
-    dbuser = os.getenv("dbuser")
-    password = os.getenv("password")
-    host = os.getenv("host")
-    port = int(os.getenv("port", 3306))
-    dbname = os.getenv("name")
-    conn = pymysql.connect(
-        host=host,
-        user=dbuser,
-        password=password,
-        db=dbname,
-        port=port,
-        charset="utf8mb4"
-    )
-    return conn
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.db import get_connection
 
 def create_scd_table():
     """
@@ -25,6 +11,7 @@ def create_scd_table():
     - PK: (app_id, start_date)
     - user_tags 컬럼은 TEXT 형식으로 정의 (태그 ID 리스트를 JSON 문자열로 저장)
     - 모든 레코드에 대해 end_date는 날짜 형식으로 관리되며, 활성 레코드는 '9999-12-31'로 표시
+    - content_hash: 버전 내용의 64bit 해시 (common.content_hash)
     """
     create_sql = """
     CREATE TABLE IF NOT EXISTS TITLELIST (
@@ -36,7 +23,9 @@ def create_scd_table():
       userScore   FLOAT,
       start_date  DATETIME    NOT NULL,
       end_date    DATETIME    NOT NULL DEFAULT '9999-12-31',
-      PRIMARY KEY (app_id, start_date)
+      content_hash BIGINT,
+      PRIMARY KEY (app_id, start_date),
+      KEY idx_content_hash (app_id, end_date, content_hash)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
     """
     conn = get_connection()
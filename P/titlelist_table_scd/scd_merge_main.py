@@ -1,30 +1,23 @@
 import os
-import pymysql
-from dotenv import load_dotenv
+import sys
+import time
 from scd_create import create_scd_table
-from scd_upsert import upsert_scd_version
-
-def get_connection():
-    load_dotenv()
-    dbuser = os.getenv("dbuser")
-    password = os.getenv("password")
-    host = os.getenv("host")
-    port = int(os.getenv("port", 3306))
-    dbname = os.getenv("name")
-    conn = pymysql.connect(
-        host=host,
-        user=dbuser,
-        password=password,
-        db=dbname,
-        port=port,
-        charset="utf8mb4"
-    )
-    return conn
+from scd_upsert import upsert_scd_version, upsert_scd_snapshot
+
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.db import get_connection, print_db_stats
+from common.app_tag import create_app_tag_table, rebuild_app_tag
+from common.titlelist_current import create_titlelist_current_table, rebuild_titlelist_current
+from common.content_hash import migrate_content_hash, backfill_content_hash, load_current_hashes
+from common.scd_merge import OPEN_END, normalize_value, print_merge_stats
+
+BACKFILL_MODE = os.getenv("BACKFILL_MODE", "window")
 
 def merge_moba_indi_current():
     """
     1) LIST_OF_MOBA_INDI 테이블에서 현재 최신 데이터(각 app_id 1행) 읽기
-    2) TITLELIST 테이블에 upsert_scd_version() 호출
+    2) TITLELIST 테이블에 upsert_scd_snapshot()으로 한 번에 머지
     """
     conn = get_connection()
     try:
@@ -36,21 +29,18 @@ def merge_moba_indi_current():
             cur.execute(sql)
             rows = cur.fetchall()
             print(f"[INFO] current LIST_OF_MOBA_INDI rows = {len(rows)}")
-
-        for i, row in enumerate(rows, start=1):
-            app_id, name, price_us, releaseYear, userScore, user_tags = row
-            upsert_scd_version(
-                app_id,
-                name=name,
-                price_us=price_us,
-                releaseYear=releaseYear,
-                userScore=userScore,
-                user_tags=user_tags
-            )
-            print(f"[{i}/{len(rows)}] current merged app_id={app_id}")
     finally:
         conn.close()
 
+    snapshot = [
+        {"app_id": app_id, "name": name, "price_us": price_us,
+         "releaseYear": releaseYear, "userScore": userScore, "user_tags": user_tags}
+        for app_id, name, price_us, releaseYear, userScore, user_tags in rows
+    ]
+    # 현재 해시와 같은 app은 스테이징 전에 제외
+    stats = upsert_scd_snapshot(snapshot, known_hashes=load_current_hashes())
+    print_merge_stats(stats, label="LIST_OF_MOBA_INDI -> TITLELIST")
+
 def merge_LIST_OF_MOBA_INDI_HISTORY():
     """
     1) LIST_OF_MOBA_INDI_HISTORY 테이블(과거 이력)에서
@@ -96,16 +86,137 @@ def merge_LIST_OF_MOBA_INDI_HISTORY():
     finally:
         conn.close()
 
+def _state_key(name, user_tags, price_us, releaseYear, userScore):
+    """ScdMerger와 같은 비교 기준 (None -> '' / 0.0, FLOAT는 소수 4자리)"""
+    return (normalize_value("name", name), normalize_value("user_tags", user_tags),
+            round(normalize_value("price_us", price_us), 4), normalize_value("releaseYear", releaseYear),
+            round(normalize_value("userScore", userScore), 4))
+
+def fetch_history_versions():
+    """
+    LIST_OF_MOBA_INDI_HISTORY -> TITLELIST 버전 목록 (MySQL 8 윈도 함수)
+      - (app_id, changed_at) 순서로 정렬
+      - LAG()로 직전 상태와 같은 행(연속 중복)은 버림
+      - LEAD()로 다음 버전 시작 1초 전을 end_date로, 마지막 버전은 '9999-12-31'
+    반환: [(app_id, name, price_us, releaseYear, userScore, start_date, end_date), ...]
+    """
+    sql = f"""
+    WITH hist AS (
+        SELECT app_id, name, price_us, releaseYear, userScore, changed_at,
+               SHA1(CONCAT_WS(CHAR(31), IFNULL(name, ''),
+                              CAST(ROUND(IFNULL(price_us, 0), 4) AS CHAR),
+                              IFNULL(releaseYear, ''),
+                              CAST(ROUND(IFNULL(userScore, 0), 4) AS CHAR))) AS row_hash
+          FROM LIST_OF_MOBA_INDI_HISTORY
+    ),
+    marked AS (
+        SELECT hist.*,
+               LAG(row_hash) OVER (PARTITION BY app_id ORDER BY changed_at) AS prev_hash
+          FROM hist
+    ),
+    versions AS (
+        SELECT app_id, name, price_us, releaseYear, userScore, changed_at,
+               LEAD(changed_at) OVER (PARTITION BY app_id ORDER BY changed_at) AS next_start
+          FROM marked
+         WHERE prev_hash IS NULL OR prev_hash <> row_hash
+    )
+    SELECT app_id, name, price_us, releaseYear, userScore, changed_at,
+           IFNULL(next_start - INTERVAL 1 SECOND, '{OPEN_END}') AS end_date
+      FROM versions
+     ORDER BY app_id, changed_at
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+def backfill_LIST_OF_MOBA_INDI_HISTORY(chunk_size=5000):
+    """
+    merge_LIST_OF_MOBA_INDI_HISTORY의 일괄 버전 (같은 버전 결과):
+      1) 윈도 함수로 app별 버전/유효기간을 한 번에 계산
+      2) TITLELIST 활성 행을 한 번 읽어서, app의 첫 history 버전이 활성 행과 같으면 건너뜀
+         (행 단위 경로에서 [NO CHANGE]로 스킵되는 경우)
+      3) 한 트랜잭션에서 활성 행 만료(첫 버전 시작 1초 전) + 버전 INSERT를 chunk 단위 executemany
+    """
+    t0 = time.perf_counter()
+    versions = fetch_history_versions()
+    print(f"[INFO] history => 연속 중복 제거 후 버전 {len(versions)}개")
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+            SELECT app_id, name, user_tags, price_us, releaseYear, userScore
+              FROM TITLELIST
+             WHERE end_date = '{OPEN_END}'
+            """)
+            current = {int(r[0]): _state_key(*r[1:]) for r in cur.fetchall()}
+
+        to_insert, to_expire = [], []
+        expired = set()
+        prev_app = None
+        for app_id, name, price_us, releaseYr, score, start, end in versions:
+            app_id = int(app_id)
+            if app_id != prev_app:
+                prev_app = app_id
+                if current.get(app_id) == _state_key(name, None, price_us, releaseYr, score):
+                    continue  # 첫 버전이 활성 행과 같음 => 활성 행 유지, 다음 버전에서 만료
+            if app_id in current and app_id not in expired:
+                expired.add(app_id)
+                to_expire.append((app_id, start))
+            to_insert.append((app_id, normalize_value("name", name), "",
+                              normalize_value("price_us", price_us), normalize_value("releaseYear", releaseYr),
+                              normalize_value("userScore", score), str(start), str(end)))
+
+        with conn.cursor() as cur:
+            expire_rows = [(str(start), app_id) for app_id, start in to_expire]
+            for i in range(0, len(expire_rows), chunk_size):
+                cur.executemany(f"""
+                UPDATE TITLELIST
+                   SET end_date = DATE_SUB(%s, INTERVAL 1 SECOND)
+                 WHERE app_id = %s
+                   AND end_date = '{OPEN_END}'
+                """, expire_rows[i:i + chunk_size])
+            for i in range(0, len(to_insert), chunk_size):
+                cur.executemany("""
+                INSERT INTO TITLELIST
+                 (app_id, name, user_tags, price_us, releaseYear, userScore, start_date, end_date)
+                VALUES
+                 (%s, %s, %s, %s, %s, %s, %s, %s)
+                """, to_insert[i:i + chunk_size])
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"[SCD] history backfill: 버전 insert {len(to_insert)} / 기존 활성 행 만료 {len(to_expire)} "
+          f"({time.perf_counter() - t0:.2f}초)")
+
 def main():
     # A) TITLELIST 테이블 SCD 구조 보장
     create_scd_table()
+    create_app_tag_table()
+    create_titlelist_current_table()
+    migrate_content_hash()
 
     # B) 현재 LIST_OF_MOBA_INDI 데이터를 TITLELIST로 업서트
     merge_moba_indi_current()
 
     # C) 과거 LIST_OF_MOBA_INDI_HISTORY 데이터를 TITLELIST로 업서트
-    merge_LIST_OF_MOBA_INDI_HISTORY()
+    #    기본은 윈도 함수 일괄 backfill, BACKFILL_MODE=row 이면 예전 행 단위 재생
+    if BACKFILL_MODE == "row":
+        merge_LIST_OF_MOBA_INDI_HISTORY()
+    else:
+        backfill_LIST_OF_MOBA_INDI_HISTORY()
+
+    # D) backfill로 들어간 버전의 content_hash 채우고
+    #    활성 버전 기준으로 태그 브리지 테이블(APP_TAG) / 현재 버전 테이블 재생성
+    backfill_content_hash("TITLELIST", ["app_id", "start_date"])
+    rebuild_app_tag()
+    rebuild_titlelist_current()
 
+    print_db_stats()
     print("[DONE] All merges completed. Check TITLELIST for SCD versions.")
 
 if __name__ == "__main__":
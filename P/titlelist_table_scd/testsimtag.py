@@ -1,34 +1,22 @@
 import os
+import sys
 import time
 import json
 import pymysql
-from dotenv import load_dotenv
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.tag_registry import TagRegistry
+from common.db import get_connection
+
 ################################################
 # 1) DB 연결 & 환경
 ################################################
-def get_connection():
-    load_dotenv()
-    dbuser = os.getenv('dbuser')
-    password = os.getenv('password')
-    host = os.getenv('host')
-    port = int(os.getenv('port', 3306))
-    dbname = os.getenv('name')
-
-    return pymysql.connect(
-        host=host,
-        user=dbuser,
-        password=password,
-        db=dbname,
-        port=port,
-        charset="utf8mb4"
-    )
-
 def ensure_user_tags_column_in_test_table():
     """
     TEST_SIMILAR_GAMES 테이블에 user_tags 컬럼이 없으면 JSON 타입으로 추가.
@@ -110,60 +98,12 @@ def update_user_tags_in_test_table(row_id, tags_json):
 ################################################
 # 3) TAGS 테이블 (정수화) 로직
 ################################################
-def ensure_tags_table():
-    """
-    TAGS 테이블이 없으면 생성
-    tag_id INT AUTO_INCREMENT, tag_name VARCHAR(255) UNIQUE
-    """
-    conn = get_connection()
-    try:
-        with conn.cursor() as cur:
-            create_sql = """
-            CREATE TABLE IF NOT EXISTS TAGS (
-                tag_id INT AUTO_INCREMENT PRIMARY KEY,
-                tag_name VARCHAR(255) NOT NULL UNIQUE
-            )
-            """
-            cur.execute(create_sql)
-            conn.commit()
-    finally:
-        conn.close()
-
-def get_or_create_tag_id_in_db(tag_name):
-    """
-    문자열 태그 -> tag_id
-    만약 DB에 없으면 INSERT (자동 생성)
-    """
-    conn = get_connection()
-    the_id = None
-    try:
-        with conn.cursor() as cur:
-            sel_sql = "SELECT tag_id FROM TAGS WHERE tag_name=%s"
-            cur.execute(sel_sql, (tag_name,))
-            row = cur.fetchone()
-            if row:
-                the_id = row[0]
-            else:
-                # 만약 '공식 TAGS'만 허용하고 싶다면 여기서 '스킵' 할 수도 있다.
-                ins_sql = "INSERT INTO TAGS (tag_name) VALUES (%s)"
-                cur.execute(ins_sql, (tag_name,))
-                conn.commit()
-                the_id = cur.lastrowid
-    finally:
-        conn.close()
-    return the_id
-
-def convert_tags_to_int_list(tag_list):
+def convert_tags_to_int_list(tag_list, registry):
     """
     문자열 태그 배열 -> 정수 ID 배열
-    TAGS 테이블 참고 (없으면 INSERT)
+    TagRegistry(메모리 사전) 참고, 처음 보는 태그만 TAGS에 일괄 INSERT IGNORE
     """
-    int_list = []
-    for t in tag_list:
-        tag_id = get_or_create_tag_id_in_db(t)  # 없으면 새로 생성
-        if tag_id:
-            int_list.append(tag_id)
-    return int_list
+    return registry.to_ids(tag_list)
 
 ################################################
 # 4) +버튼 태그 크롤 함수
@@ -209,8 +149,8 @@ def main():
     # 1) TEST_SIMILAR_GAMES 테이블에 user_tags 컬럼 없으면 추가
     ensure_user_tags_column_in_test_table()
 
-    # 2) TAGS 테이블도 보장 (정수화에 필요)
-    ensure_tags_table()
+    # 2) TAGS 테이블 보장 + 전체 태그 사전 한 번 로드 (정수화에 필요)
+    registry = TagRegistry(get_connection)
 
     # 3) TEST_SIMILAR_GAMES 모든 행
     rows = fetch_all_test_similar_rows()
@@ -242,7 +182,7 @@ def main():
             str_tags = data.get("user_tags", [])
 
             # (C) 문자열 태그 -> 정수 태그 ID (TAGS 테이블 참조)
-            new_int_list = convert_tags_to_int_list(str_tags)
+            new_int_list = convert_tags_to_int_list(str_tags, registry)
             new_int_list.sort()  # 정렬하면 순서 문제로 인한 불필요한 갱신 방지
 
             # 비교
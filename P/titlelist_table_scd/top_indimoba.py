@@ -1,32 +1,20 @@
 import os
+import sys
 import time
 import requests
-import pymysql
 from datetime import datetime
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.db import get_connection
+
 ##################################################
 # 1) Env & DB 설정
 ##################################################
 load_dotenv()
 
-dbuser = os.getenv('dbuser')
-password = os.getenv('password')
-host = os.getenv('host')
-port = int(os.getenv('port', 3306))
-dbname = os.getenv('name')
-
-def get_connection():
-    return pymysql.connect(
-        host=host,
-        user=dbuser,
-        password=password,
-        database=dbname,
-        port=port,
-        charset="utf8mb4"
-    )
-
 ##################################################
 # 2) TOPINDIMOBA_GAME SCD 테이블 생성
 ##################################################
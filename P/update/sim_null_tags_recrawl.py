@@ -1,33 +1,23 @@
 import os
+import sys
 import time
 import json
-import pymysql
-from dotenv import load_dotenv
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.tag_http_extractor import fetch_tags_bulk
+from common.tag_registry import TagRegistry
+from common.db import get_connection, print_db_stats
+from common.similarity_changelog import create_changelog_table, log_app_changes
+
 ########################################
 # 1) DB 연결
 ########################################
-def get_connection():
-    load_dotenv()
-    dbuser = os.getenv('dbuser')
-    password = os.getenv('password')
-    host = os.getenv('host')
-    port = int(os.getenv('port', 3306))
-    dbname = os.getenv('name')
-    return pymysql.connect(
-        host=host,
-        user=dbuser,
-        password=password,
-        db=dbname,
-        port=port,
-        charset="utf8mb4"
-    )
-
 ########################################
 # 2) user_tags='[]' 또는 NULL인 행 조회 (game_app_id ASC)
 ########################################
@@ -55,6 +45,20 @@ def fetch_empty_array_user_tags_rows():
 ########################################
 # 3) +버튼 태그 크롤
 ########################################
+def open_logged_in_driver():
+    """
+    HTTP 파싱 실패분 fallback용 브라우저 (처음 필요할 때만 열고 수동 로그인)
+    """
+    options = webdriver.ChromeOptions()
+    # options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.get("https://store.steampowered.com/login/")
+    print("[안내] 스팀 로그인(성인인증 등) 후 콘솔에 Enter를 눌러주세요.")
+    input()
+    return driver
+
 def fetch_tags_via_plus_button(app_id, driver):
     from selenium.common.exceptions import NoSuchElementException
     url = f"https://store.steampowered.com/app/{app_id}"
@@ -82,66 +86,18 @@ def fetch_tags_via_plus_button(app_id, driver):
 ########################################
 # 4) 태그(TABLE) 동기화 (문자열 → 숫자 ID)
 ########################################
-def get_or_create_tag_id_in_db(tag_name):
-    """
-    TAGS 테이블에서 tag_name으로 tag_id 조회.
-    없으면 INSERT 후, 새 tag_id 반환
-    """
-    conn = get_connection()
-    the_id = None
-    try:
-        with conn.cursor() as cur:
-            sel_sql = "SELECT tag_id FROM TAGS WHERE tag_name=%s"
-            cur.execute(sel_sql, (tag_name,))
-            row = cur.fetchone()
-            if row:
-                the_id = row[0]
-            else:
-                ins_sql = "INSERT INTO TAGS (tag_name) VALUES (%s)"
-                cur.execute(ins_sql, (tag_name,))
-                conn.commit()
-                the_id = cur.lastrowid
-    finally:
-        conn.close()
-    return the_id
-
-def convert_tags_to_int_list(tag_list, local_mapping):
-    """
-    문자열 태그 리스트 → tag_id 리스트 (TAGS 연동)
-    """
-    int_list = []
-    for t in tag_list:
-        if t in local_mapping:
-            tag_id = local_mapping[t]
-        else:
-            tag_id = get_or_create_tag_id_in_db(t)
-            local_mapping[t] = tag_id
-        int_list.append(tag_id)
-    return int_list
-
-########################################
-# 5) 태그 매핑 로컬 JSON
-########################################
-TAG_JSON_PATH = "tag_dict.json"
-
-def load_tag_mapping():
-    if not os.path.exists(TAG_JSON_PATH):
-        return {}
-    with open(TAG_JSON_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data if data else {}
-
-def save_tag_mapping(mapping):
-    with open(TAG_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(mapping, f, ensure_ascii=False, indent=2)
+# common.tag_registry.TagRegistry 사용: 시작할 때 TAGS를 한 번 읽고,
+# 처음 보는 태그는 배치 단위로 INSERT IGNORE + SELECT IN
 
 ########################################
-# 6) DB 업데이트 (id 없이, (game_app_id, recommended_app_id)로 처리)
+# 5) DB 업데이트 (id 없이, (game_app_id, recommended_app_id)로 처리)
 ########################################
-def update_user_tags_in_similar_games(game_app_id, recommended_app_id, tags_json):
+def update_user_tags_in_similar_games(game_app_ids, recommended_app_id, tags_json):
     """
     크롤링 결과(문자열/정수 리스트 JSON)를 SIMILAR_GAMES.user_tags에 업데이트.
     테이블에 'id' 컬럼 없이, (game_app_id, recommended_app_id)를 조건으로 사용
+    recommended_app_id 하나에 걸린 행들을 한 트랜잭션에서 갱신하고,
+    같은 트랜잭션에서 SIMILARITY_CHANGELOG에 기록 (증분 유사도 갱신용)
     """
     conn = get_connection()
     try:
@@ -152,78 +108,73 @@ def update_user_tags_in_similar_games(game_app_id, recommended_app_id, tags_json
              WHERE game_app_id = %s
                AND recommended_app_id = %s
             """
-            cur.execute(sql, (tags_json, game_app_id, recommended_app_id))
+            cur.executemany(sql, [(tags_json, g_id, recommended_app_id) for g_id in game_app_ids])
+            log_app_changes(cur, [recommended_app_id], source="SIMILAR_GAMES")
         conn.commit()
     finally:
         conn.close()
 
 ########################################
-# 7) MAIN
+# 6) MAIN
 ########################################
 def main():
-    # (A) 브라우저 열기 (창 띄움)
-    options = webdriver.ChromeOptions()
-    # options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    # (A) user_tags='[]' 또는 NULL인 행만 가져오기
+    rows = fetch_empty_array_user_tags_rows()
+    print(f"[INFO] 재크롤 대상 행 수(user_tags='[]' or NULL): {len(rows)}")
+    if not rows:
+        print("[INFO] 빈 배열/NULL인 레코드가 없습니다. 종료.")
+        return
+
+    # (B) recommended_app_id를 기준으로 그룹화
+    from collections import defaultdict
+    grouped = defaultdict(list)
+    for (game_app_id, reco_app_id) in rows:
+        grouped[reco_app_id].append(game_app_id)
+
+    print(f"[INFO] unique recommended_app_id 개수: {len(grouped)}")
+    create_changelog_table()
+
+    # (C) 태그는 HTTP로 한 번에 동시 수집, 실패분만 브라우저(로그인) fallback
+    driver_ref = [None]
+
+    def selenium_fallback(app_id):
+        if driver_ref[0] is None:
+            driver_ref[0] = open_logged_in_driver()
+        return fetch_tags_via_plus_button(app_id, driver_ref[0])
 
     try:
-        # (B) 스팀 로그인
-        driver.get("https://store.steampowered.com/login/")
-        print("[안내] 스팀 로그인(성인인증 등) 후 콘솔에 Enter를 눌러주세요.")
-        input()
-
-        # (C) user_tags='[]' 또는 NULL인 행만 가져오기
-        rows = fetch_empty_array_user_tags_rows()
-        print(f"[INFO] 재크롤 대상 행 수(user_tags='[]' or NULL): {len(rows)}")
-        if not rows:
-            print("[INFO] 빈 배열/NULL인 레코드가 없습니다. 종료.")
-            return
-
-        # (D) recommended_app_id를 기준으로 그룹화
-        from collections import defaultdict
-        grouped = defaultdict(list)
-        for (game_app_id, reco_app_id) in rows:
-            grouped[reco_app_id].append(game_app_id)
-
-        print(f"[INFO] unique recommended_app_id 개수: {len(grouped)}")
-
-        # (E) 캐시 (reco_app_id별 문자열 태그)
-        tags_cache = {}
+        tag_results = fetch_tags_bulk(list(grouped.keys()), max_workers=8,
+                                      selenium_fallback=selenium_fallback)
 
-        # (F) 태그 문자열 → 태그 ID 매핑 캐시
-        local_mapping = load_tag_mapping()
+        # (D) 태그 문자열 → 태그 ID (TAGS 한 번 로드 + 새 태그 일괄 등록)
+        registry = TagRegistry(get_connection)
+        registry.resolve_many(t for r in tag_results.values() for t in r["user_tags"])
 
-        # (G) 그룹 순회
+        # (E) 그룹 순회
         total = len(grouped)
         for i, (reco_app_id, game_ids) in enumerate(grouped.items(), start=1):
             print(f"\n[{i}/{total}] app_id={reco_app_id}, 관련 game_app_id 개수={len(game_ids)}")
 
-            # 캐시 확인
-            if reco_app_id in tags_cache:
-                str_tags = tags_cache[reco_app_id]
-                print(f" => 캐시 태그 재사용: {str_tags}")
-            else:
-                # 새로 크롤
-                str_tags = fetch_tags_via_plus_button(reco_app_id, driver)
-                tags_cache[reco_app_id] = str_tags
-                print(f" => 새로 크롤: {str_tags}")
+            str_tags = tag_results[reco_app_id]["user_tags"]
+            print(f" => 태그({tag_results[reco_app_id]['source']}): {str_tags}")
+            if not str_tags:
+                print("   태그 수집 실패 => 건너뜀 (다음 재크롤 대상으로 남김)")
+                continue
 
             # 문자열 태그 -> tag_id 리스트
-            int_tags_list = convert_tags_to_int_list(str_tags, local_mapping)
+            int_tags_list = registry.to_ids(str_tags)
             tags_json = json.dumps(int_tags_list, ensure_ascii=False)
 
             # 모든 (game_app_id, reco_app_id)에 대해 DB 업데이트
-            for g_id in game_ids:
-                update_user_tags_in_similar_games(g_id, reco_app_id, tags_json)
-                print(f"   game_app_id={g_id} => 업데이트 완료: {tags_json}")
+            update_user_tags_in_similar_games(game_ids, reco_app_id, tags_json)
+            print(f"   game_app_id={game_ids} => 업데이트 완료: {tags_json}")
 
-        # (H) 로컬 매핑 파일 최종 저장
-        save_tag_mapping(local_mapping)
+        registry.print_stats()
+        print_db_stats()
 
     finally:
-        driver.quit()
+        if driver_ref[0] is not None:
+            driver_ref[0].quit()
 
     print("\n[DONE] user_tags='[]' or NULL 레코드들 재크롤링 완료 (game_app_id ASC).")
 
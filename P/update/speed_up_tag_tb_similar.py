@@ -1,34 +1,26 @@
 import os
-import time
+import sys
 import json
+import time
 import pymysql
-from dotenv import load_dotenv
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.tag_http_extractor import fetch_tags_bulk
+from common.webdriver_pool import capture_login_cookies, run_driver_pool, fetch_tags_with_waits
+from common.tag_registry import TagRegistry
+from common.db import get_connection, print_db_stats
+from common.similarity_changelog import create_changelog_table, log_app_changes
+
+# 드라이버 풀 설정 (headless 드라이버 수 / 전체 합산 초당 페이지 로드 상한)
+N_DRIVERS = int(os.getenv("N_DRIVERS", 4))
+MAX_PAGES_PER_SEC = float(os.getenv("MAX_PAGES_PER_SEC", 2.0))
+# user_tags 일괄 반영 방식: "staging"(임시 테이블 + UPDATE JOIN) 또는 "executemany"
+BULK_WRITE_MODE = os.getenv("BULK_WRITE_MODE", "staging")
 
 ########################################
 # 1) DB 연결 & 환경
 ########################################
-def get_connection():
-    load_dotenv()
-    dbuser = os.getenv('dbuser')
-    password = os.getenv('password')
-    host = os.getenv('host')
-    port = int(os.getenv('port', 3306))
-    dbname = os.getenv('name')
-
-    return pymysql.connect(
-        host=host,
-        user=dbuser,
-        password=password,
-        db=dbname,
-        port=port,
-        charset="utf8mb4"
-    )
-
 def ensure_user_tags_column_in_similar_games():
     """
     SIMILAR_GAMES 테이블에 user_tags 컬럼이 없으면 JSON 타입으로 추가.
@@ -89,230 +81,165 @@ def ensure_tags_table():
 ########################################
 # 2) SIMILAR_GAMES 접근 함수
 ########################################
-def fetch_all_similar_games_rows():
-    """
-    SIMILAR_GAMES 테이블 모든 행의 (game_app_id, recommended_app_id) 반환
-    """
-    conn = get_connection()
-    rows = []
-    try:
-        with conn.cursor() as cur:
-            # id 컬럼 없이 2개만 SELECT
-            sql = "SELECT game_app_id, recommended_app_id FROM SIMILAR_GAMES"
-            cur.execute(sql)
-            rows = cur.fetchall()
-    finally:
-        conn.close()
-    return rows
-
-def get_current_user_tags_in_db(game_app_id, recommended_app_id):
-    """
-    SIMILAR_GAMES.user_tags (JSON 배열)를 파이썬 list[int]로 변환.
-    없거나 NULL이면 빈 리스트.
-    """
-    conn = get_connection()
-    user_tags_json = None
-    try:
-        with conn.cursor() as cur:
-            sel_sql = """
-            SELECT user_tags
-              FROM SIMILAR_GAMES
-             WHERE game_app_id=%s
-               AND recommended_app_id=%s
-            """
-            cur.execute(sel_sql, (game_app_id, recommended_app_id))
-            row = cur.fetchone()
-            if row:
-                user_tags_json = row[0]
-    finally:
-        conn.close()
-
+def parse_user_tags(user_tags_json):
+    """SIMILAR_GAMES.user_tags (JSON 배열) -> list[int]. 없거나 NULL/깨진 값이면 빈 리스트"""
     if not user_tags_json:
         return []
     try:
         return json.loads(user_tags_json)
-    except:
+    except (TypeError, ValueError):
         return []
 
-def update_user_tags_in_similar_games(game_app_id, recommended_app_id, tags_json):
+def fetch_all_similar_games_tags():
     """
-    SIMILAR_GAMES.user_tags 업데이트 (id 컬럼 없이)
+    SIMILAR_GAMES 전체를 한 번에 스캔해서
+    {(game_app_id, recommended_app_id): 현재 user_tags(list[int])} 반환
+    (행마다 SELECT 하지 않음)
     """
     conn = get_connection()
+    current = {}
     try:
         with conn.cursor() as cur:
-            sql = """
-            UPDATE SIMILAR_GAMES
-               SET user_tags = %s
-             WHERE game_app_id=%s
-               AND recommended_app_id=%s
-            """
-            cur.execute(sql, (tags_json, game_app_id, recommended_app_id))
-        conn.commit()
+            cur.execute("SELECT game_app_id, recommended_app_id, user_tags FROM SIMILAR_GAMES")
+            for game_app_id, recommended_app_id, user_tags in cur.fetchall():
+                current[(game_app_id, recommended_app_id)] = parse_user_tags(user_tags)
     finally:
         conn.close()
+    return current
 
-########################################
-# 3) 태그(TAGS) 테이블과 동기화 (문자열→숫자ID)
-########################################
-def get_or_create_tag_id_in_db(tag_name):
+def bulk_update_user_tags(changes, mode=BULK_WRITE_MODE, chunk_size=5000):
     """
-    DB의 TAGS 테이블에서 tag_name으로 tag_id 조회,
-    없으면 INSERT
+    changes: [(game_app_id, recommended_app_id, tags_json), ...]
+    mode="staging"     : 임시 테이블에 executemany로 적재 -> UPDATE ... JOIN 한 번
+    mode="executemany" : UPDATE ... WHERE (game_app_id, recommended_app_id) 를 chunk 단위 executemany
+    태그가 바뀐 recommended_app_id는 같은 트랜잭션에서 SIMILARITY_CHANGELOG에 기록 (증분 유사도 갱신용)
+    반환: (DB가 변경했다고 보고한 행 수, 쓰기 시간 초)
     """
+    if not changes:
+        return 0, 0.0
+    t0 = time.perf_counter()
+    affected = 0
     conn = get_connection()
-    the_id = None
     try:
         with conn.cursor() as cur:
-            sel_sql = "SELECT tag_id FROM TAGS WHERE tag_name=%s"
-            cur.execute(sel_sql, (tag_name,))
-            row = cur.fetchone()
-            if row:
-                the_id = row[0]
+            if mode == "staging":
+                # TEMPORARY TABLE은 커넥션(세션) 단위라 다른 작업과 충돌 없음
+                cur.execute("DROP TEMPORARY TABLE IF EXISTS TMP_SIMILAR_USER_TAGS")
+                cur.execute("""
+                CREATE TEMPORARY TABLE TMP_SIMILAR_USER_TAGS (
+                    game_app_id        BIGINT NOT NULL,
+                    recommended_app_id BIGINT NOT NULL,
+                    user_tags          JSON,
+                    PRIMARY KEY (game_app_id, recommended_app_id)
+                )
+                """)
+                for i in range(0, len(changes), chunk_size):
+                    cur.executemany("""
+                    INSERT INTO TMP_SIMILAR_USER_TAGS (game_app_id, recommended_app_id, user_tags)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE user_tags = VALUES(user_tags)
+                    """, changes[i:i + chunk_size])
+                cur.execute("""
+                UPDATE SIMILAR_GAMES s
+                  JOIN TMP_SIMILAR_USER_TAGS t
+                    ON s.game_app_id = t.game_app_id
+                   AND s.recommended_app_id = t.recommended_app_id
+                   SET s.user_tags = t.user_tags
+                """)
+                affected = cur.rowcount
+                cur.execute("DROP TEMPORARY TABLE IF EXISTS TMP_SIMILAR_USER_TAGS")
             else:
-                ins_sql = "INSERT INTO TAGS (tag_name) VALUES (%s)"
-                cur.execute(ins_sql, (tag_name,))
-                conn.commit()
-                the_id = cur.lastrowid
+                for i in range(0, len(changes), chunk_size):
+                    chunk = [(tags_json, g_id, r_id) for g_id, r_id, tags_json in changes[i:i + chunk_size]]
+                    cur.executemany("""
+                    UPDATE SIMILAR_GAMES
+                       SET user_tags = %s
+                     WHERE game_app_id=%s
+                       AND recommended_app_id=%s
+                    """, chunk)
+                    affected += cur.rowcount
+            log_app_changes(cur, (r_id for _, r_id, _ in changes), source="SIMILAR_GAMES")
+        conn.commit()
     finally:
         conn.close()
-    return the_id
-
-def convert_tags_to_int_list(tag_list, local_mapping):
-    """
-    문자열 태그 리스트 -> 숫자 태그ID 리스트 (TAGS 테이블 연동).
-    이미 존재하는 태그는 기존 tag_id 재사용.
-    """
-    int_list = []
-    for t in tag_list:
-        if t in local_mapping:
-            tag_id = local_mapping[t]
-        else:
-            tag_id = get_or_create_tag_id_in_db(t)
-            local_mapping[t] = tag_id
-        int_list.append(tag_id)
-    return int_list
-
-########################################
-# 4) 태그 매핑 로컬 JSON
-########################################
-TAG_JSON_PATH = "tag_dict.json"
-
-def load_tag_mapping():
-    if not os.path.exists(TAG_JSON_PATH):
-        return {}
-    with open(TAG_JSON_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data if data else {}
-
-def save_tag_mapping(mapping):
-    with open(TAG_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(mapping, f, ensure_ascii=False, indent=2)
+    return affected, time.perf_counter() - t0
 
 ########################################
-# 5) 셀레니움: 스팀 로그인 + '+버튼' 태그 크롤
+# 3) 태그(TAGS) 테이블과 동기화 (문자열→숫자ID)
 ########################################
-def steam_manual_login(driver):
-    login_url = "https://store.steampowered.com/login/"
-    driver.get(login_url)
-    print("\n[안내] 스팀 로그인 페이지가 열렸습니다.")
-    print("브라우저에서 직접 로그인(2차 인증, 성인인증 등) 후 콘솔에 Enter를 눌러주세요.")
-    input("로그인 완료 후 Enter...")
-
-def fetch_tags_via_plus_button(app_id, driver):
-    from selenium.common.exceptions import NoSuchElementException
-    url = f"https://store.steampowered.com/app/{app_id}"
-    driver.get(url)
-    time.sleep(2)
-
-    try:
-        plus_btn = driver.find_element(By.CSS_SELECTOR, "div.app_tag.add_button")
-        plus_btn.click()
-        time.sleep(1)
-    except NoSuchElementException:
-        print(f"[WARN] +버튼 없음 app_id={app_id}")
-        return []
-
-    try:
-        tag_elems = driver.find_elements(By.CSS_SELECTOR, "#app_tagging_modal a.app_tag")
-        tags = [el.text.strip() for el in tag_elems if el.text.strip()]
-        return tags
-    except:
-        print(f"[WARN] 태그 팝업 수집 실패 app_id={app_id}")
-        return []
+# common.tag_registry.TagRegistry 사용: 시작할 때 TAGS를 한 번 읽고,
+# 처음 보는 태그는 배치 단위로 INSERT IGNORE + SELECT IN (태그마다 커넥션 열지 않음)
 
 ########################################
-# 6) MAIN
+# 4) MAIN
 ########################################
 def main():
     # 1) DB 컬럼/테이블 보장
     ensure_user_tags_column_in_similar_games()
     ensure_tags_table()
+    create_changelog_table()
 
-    # 2) 모든 행 가져오기
-    rows = fetch_all_similar_games_rows()
-    print(f"[INFO] SIMILAR_GAMES 전체 행 수: {len(rows)}")
-    if not rows:
+    # 2) 모든 행 + 현재 user_tags를 한 번에 가져오기
+    current_tags = fetch_all_similar_games_tags()
+    print(f"[INFO] SIMILAR_GAMES 전체 행 수: {len(current_tags)}")
+    if not current_tags:
         print("[INFO] 처리할 데이터가 없습니다. 종료.")
         return
 
-    # 3) 로컬 태그 매핑 로드
-    local_tag_mapping = load_tag_mapping()
-
-    # 4) 브라우저 열기 (헤드풀 모드) + 로그인
-    options = webdriver.ChromeOptions()
-    # options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-
-    try:
-        steam_manual_login(driver)
-
-        # (A) recommended_app_id를 기준으로 묶기
-        from collections import defaultdict
-        grouped_by_reco = defaultdict(list)
-        for (game_app_id, recommended_app_id) in rows:
-            grouped_by_reco[recommended_app_id].append(game_app_id)
-
-        print(f"[INFO] 중복 포함한 recommended_app_id 개수: {len(grouped_by_reco)}")
-
-        reco_cache = {}
-        total_unique_reco = len(grouped_by_reco)
-        cnt = 0
-
-        for reco_app_id, game_id_list in grouped_by_reco.items():
-            cnt += 1
-            print(f"\n[{cnt}/{total_unique_reco}] recommended_app_id={reco_app_id}, 관련 row 수={len(game_id_list)}")
-
-            # (B) 캐시 확인
-            if reco_app_id in reco_cache:
-                str_tags = reco_cache[reco_app_id]
-                print(f" => 이미 크롤 완료된 app_id={reco_app_id}, 태그 재사용.")
-            else:
-                # 처음 크롤
-                str_tags = fetch_tags_via_plus_button(reco_app_id, driver)
-                reco_cache[reco_app_id] = str_tags
-                print(f" => 새로 크롤: {str_tags}")
-
-            # (C) 문자열 태그 -> tag_id 리스트
-            new_int_list = convert_tags_to_int_list(str_tags, local_tag_mapping)
-            tags_json = json.dumps(new_int_list, ensure_ascii=False)
-
-            # (D) 매핑된 모든 game_app_id 에 대해 user_tags 갱신
-            for g_id in game_id_list:
-                old_int_list = get_current_user_tags_in_db(g_id, reco_app_id)
-                if old_int_list == new_int_list:
-                    print(f"    (game_app_id={g_id}, reco_app_id={reco_app_id}) => 태그 동일, 스킵")
-                else:
-                    update_user_tags_in_similar_games(g_id, reco_app_id, tags_json)
-                    print(f"    (game_app_id={g_id}, reco_app_id={reco_app_id}) => DB 업데이트 완료: {new_int_list}")
-
-    finally:
-        driver.quit()
-
-    # 6) 로컬 태그 매핑 저장
-    save_tag_mapping(local_tag_mapping)
+    # 3) 태그 이름 <-> ID 사전 (TAGS 한 번 로드)
+    registry = TagRegistry(get_connection)
+
+    # (A) recommended_app_id를 기준으로 묶기
+    from collections import defaultdict
+    grouped_by_reco = defaultdict(list)
+    for (game_app_id, recommended_app_id) in current_tags:
+        grouped_by_reco[recommended_app_id].append(game_app_id)
+
+    print(f"[INFO] 중복 포함한 recommended_app_id 개수: {len(grouped_by_reco)}")
+
+    # 4) 태그는 HTTP로 한 번에 동시 수집, 실패분만 로그인 쿠키를 공유하는 headless 드라이버 풀로 처리
+    def selenium_bulk_fallback(failed_ids):
+        cookies = capture_login_cookies()
+        return run_driver_pool(failed_ids, fetch_tags_with_waits, cookies,
+                               n_workers=N_DRIVERS, max_per_sec=MAX_PAGES_PER_SEC)
+
+    tag_results = fetch_tags_bulk(list(grouped_by_reco.keys()), max_workers=8,
+                                  selenium_bulk_fallback=selenium_bulk_fallback)
+
+    # 수집된 태그 중 처음 보는 것들을 한 번에 등록
+    registry.resolve_many(t for r in tag_results.values() for t in r["user_tags"])
+
+    # 5) 메모리에서 기존 user_tags와 비교 => 바뀐 행만 모음
+    changes = []
+    compared = 0
+    skipped = 0
+    for reco_app_id, game_id_list in grouped_by_reco.items():
+        # (B) 수집 결과 (recommended_app_id당 한 번만 크롤됨)
+        #     실패/빈 결과는 기존 user_tags를 "[]"로 덮어쓰지 않고 건너뜀 (다음 실행에서 다시 시도)
+        result = tag_results[reco_app_id]
+        str_tags = result["user_tags"]
+        if result["source"] == "fail" or not str_tags:
+            skipped += 1
+            continue
+
+        # (C) 문자열 태그 -> tag_id 리스트
+        new_int_list = registry.to_ids(str_tags)
+        tags_json = json.dumps(new_int_list, ensure_ascii=False)
+
+        # (D) 매핑된 모든 game_app_id 중 태그가 달라진 행만
+        for g_id in game_id_list:
+            compared += 1
+            if current_tags[(g_id, reco_app_id)] != new_int_list:
+                changes.append((g_id, reco_app_id, tags_json))
+
+    # 6) 바뀐 행만 한 번에 반영
+    affected, write_sec = bulk_update_user_tags(changes)
+    print(f"\n[INFO] 비교 {compared}행 / 변경 {len(changes)}행 (DB 반영 {affected}행) "
+          f"/ 쓰기 {write_sec:.2f}초 ({BULK_WRITE_MODE})")
+    print(f"[INFO] 태그 수집 실패/빈 결과로 건너뛴 recommended_app_id: {skipped}개 (기존 user_tags 유지)")
+
+    registry.print_stats()
+    print_db_stats()
     print("\n[DONE] 전체 크롤 완료.")
     print("    - tag_id는 기존 태그명을 재사용하므로 바뀌지 않습니다.")
     print("    - 중복 recommended_app_id는 한 번만 크롤했습니다.")
@@ -1,57 +1,81 @@
 import os
-import time
-import pymysql
+import sys
 from dotenv import load_dotenv
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.webdriver_pool import capture_login_cookies, run_driver_pool
+from common.title_resolver import resolve_titles
+from common.db import get_connection, print_db_stats
+from common.similarity_changelog import create_changelog_table, log_app_changes
 
-def get_connection():
-    """
-    .env에서 로드한 DB_HOST, DB_USER, DB_PW, DB_NAME을 이용해 pymysql 연결
-    """
-    DB_HOST = os.getenv("host")
-    DB_USER = os.getenv("dbuser")
-    DB_PW = os.getenv("password")
-    DB_NAME = os.getenv("name")
-
-    return pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PW,
-        database=DB_NAME,
-        charset="utf8mb4"
-    )
-
-def steam_manual_login(driver):
-    """
-    스토어 로그인 페이지로 이동 -> 사용자 수동 로그인
-    """
-    login_url = "https://store.steampowered.com/login/"
-    driver.get(login_url)
-    print("\n[안내] Steam 로그인 페이지가 열렸습니다.")
-    print("브라우저에서 직접 아이디/비번/2차인증을 마친 뒤, 콘솔에 Enter를 눌러주세요.")
-    input("로그인 완료 후 Enter...")
+# 드라이버 풀 설정 (headless 드라이버 수 / 전체 합산 초당 페이지 로드 상한)
+N_DRIVERS = int(os.getenv("N_DRIVERS", 4))
+MAX_PAGES_PER_SEC = float(os.getenv("MAX_PAGES_PER_SEC", 2.0))
 
-def get_game_title(driver, store_url, fallback_app_id):
+RECO_XPATH = '//*[@id="released"]/div/a[@data-ds-appid]'
+
+
+def crawl_more_like_this(driver, game_app_id, limiter=None):
     """
-    해당 store_url에서 #appHubAppName 요소를 찾아 게임 제목을 반환
-    실패 시 'Unknown Title'
+    드라이버 풀 작업 함수: More Like This 페이지에서 추천 게임 9개의 data-ds-appid만 수집
+    (제목은 크롤이 끝난 뒤 resolve_titles로 한 번에 조회 -> 추천 게임 페이지 이동 없음)
+    반환: [rec_id, ...] (9개 확보 실패 시 [])
     """
+    rec_url = f"https://store.steampowered.com/recommended/morelike/app/{game_app_id}/"
     try:
-        driver.get(store_url)
-        title_elem = WebDriverWait(driver, 12).until(
-            EC.visibility_of_element_located((By.XPATH, '//*[@id="appHubAppName"]'))
+        if limiter:
+            limiter.wait()
+        driver.get(rec_url)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located((By.XPATH, RECO_XPATH))
         )
-        return title_elem.text.strip()
     except Exception as e:
-        print(f"    [WARN] RecAppID={fallback_app_id} 제목 로딩 실패 → {e}")
-        return "Unknown Title"
+        print(f"  [WARN] BaseAppID={game_app_id} 추천 페이지 로드 실패: {e}")
+        return []
+
+    collected_ids = set()
+    attempts = 0
+    max_attempts = 10
+
+    # 최대 9개 수집 (고정 sleep 대신 새로고침 후 명시적 대기)
+    while len(collected_ids) < 9 and attempts < max_attempts:
+        if attempts > 0:
+            if limiter:
+                limiter.wait()
+            driver.refresh()
+            try:
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_all_elements_located((By.XPATH, RECO_XPATH))
+                )
+            except Exception as e:
+                print(f"    [WARN] BaseAppID={game_app_id} 새로고침 후 로드 실패: {e}")
+
+        elements = driver.find_elements(By.XPATH, RECO_XPATH)
+        for el in elements:
+            raw_appid = el.get_attribute("data-ds-appid")
+            if not raw_appid:
+                continue
+            splitted = raw_appid.split()
+            valid = [x for x in splitted if x.isdigit()]
+            if valid:
+                collected_ids.add(valid[0])
+            if len(collected_ids) >= 9:
+                break
+
+        attempts += 1
+        if len(collected_ids) < 9:
+            print(f"    [INFO] BaseAppID={game_app_id} 시도 {attempts}회 → {len(collected_ids)}/9개, 재시도...")
+
+    if len(collected_ids) < 9:
+        print(f"  [WARN] BaseAppID={game_app_id} → 추천 게임 9개 확보 실패. 스킵.")
+        return []
+
+    return [int(rec_id) for rec_id in collected_ids]
 
 def main():
     print("[INFO] 스크립트 시작합니다...")
@@ -83,79 +107,27 @@ def main():
         print("[ERROR] DB 쿼리 중 오류:", e)
         return
 
-    # (C) Selenium 드라이버 (창 보이게)
-    options = webdriver.ChromeOptions()
-    # options.add_argument("--headless")  # 필요 시 주석 해제
-    options.add_argument("--disable-gpu")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    # (C) 수동 로그인 1회 -> 쿠키를 공유하는 headless 드라이버 풀로 크롤링
+    cookies = capture_login_cookies()
+    pool_results = run_driver_pool(game_app_ids, crawl_more_like_this, cookies,
+                                   n_workers=N_DRIVERS, max_per_sec=MAX_PAGES_PER_SEC)
 
-    # (수동 로그인)
-    steam_manual_login(driver)
+    # (D) 추천 게임 제목 일괄 조회 (DB -> 로컬 캐시 -> HTTP, 전체 기본 app에 걸쳐 중복 제거)
+    all_rec_ids = {rec_id for rec_ids in pool_results.values() if rec_ids for rec_id in rec_ids}
+    conn = get_connection()
+    try:
+        titles = resolve_titles(all_rec_ids, conn=conn)
+    finally:
+        conn.close()
 
-    # (D) 크롤링
     output_data = []
-    for idx, game_app_id in enumerate(game_app_ids, start=1):
-        print(f"\n[INFO] ({idx}/{len(game_app_ids)}) BaseAppID={game_app_id} 크롤링 시작.")
-        rec_url = f"https://store.steampowered.com/recommended/morelike/app/{game_app_id}/"
-        try:
-            driver.get(rec_url)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.XPATH, '//*[@id="released"]/div/a[@data-ds-appid]'))
-            )
-        except Exception as e:
-            print(f"  [WARN] BaseAppID={game_app_id} 추천 페이지 로드 실패: {e}")
-            continue
-
-        collected_ids = set()
-        attempts = 0
-        max_attempts = 10
-
-        # 최대 9개 수집
-        while len(collected_ids) < 9 and attempts < max_attempts:
-            if attempts > 0:
-                driver.refresh()
-                time.sleep(1)
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located((By.XPATH, '//*[@id="released"]/div/a[@data-ds-appid]'))
-                )
-            except Exception as e:
-                print(f"    [WARN] BaseAppID={game_app_id} 새로고침 후 로드 실패: {e}")
-
-            elements = driver.find_elements(By.XPATH, '//*[@id="released"]/div/a[@data-ds-appid]')
-            for el in elements:
-                raw_appid = el.get_attribute("data-ds-appid")
-                if not raw_appid:
-                    continue
-                splitted = raw_appid.split()
-                valid = [x for x in splitted if x.isdigit()]
-                if valid:
-                    collected_ids.add(valid[0])
-                if len(collected_ids) >= 9:
-                    break
-
-            attempts += 1
-            if len(collected_ids) < 9:
-                print(f"    [INFO] BaseAppID={game_app_id} 시도 {attempts}회 → {len(collected_ids)}/9개, 재시도...")
-                time.sleep(1)
-
-        if len(collected_ids) < 9:
-            print(f"  [WARN] BaseAppID={game_app_id} → 추천 게임 9개 확보 실패. 스킵.")
-            continue
-
-        # 추천 게임 상세페이지로 제목 가져오기
-        for rec_id in collected_ids:
-            store_url = f"https://store.steampowered.com/app/{rec_id}"
-            rec_title = get_game_title(driver, store_url, rec_id)
-            if rec_title == "Unknown Title":
+    for game_app_id in game_app_ids:
+        for rec_id in pool_results.get(game_app_id) or []:
+            rec_title = titles.get(rec_id)
+            if not rec_title:
                 print(f"    [WARN] BaseAppID={game_app_id}의 RecAppID={rec_id} 제목 불러오기 실패. 스킵.")
                 continue
-
             output_data.append((game_app_id, rec_id, rec_title))
-            print(f"    [INFO] BaseAppID={game_app_id} → RecAppID={rec_id}, 제목='{rec_title}'")
-
-    driver.quit()
 
     if not output_data:
         print("[INFO] 결과가 없습니다. 스크립트 종료.")
@@ -163,6 +135,7 @@ def main():
 
     # (E) DB INSERT
     try:
+        create_changelog_table()
         conn = get_connection()
         cur = conn.cursor()
         # SIMILAR_GAMES 테이블: (game_app_id, recommended_app_id)에 UNIQUE KEY
@@ -171,14 +144,19 @@ def main():
             VALUES (%s, %s, %s)
             ON DUPLICATE KEY UPDATE recommended_title = VALUES(recommended_title)
         """
+        inserted_apps = set()
         for row_data in output_data:
             cur.execute(insert_sql, row_data)
-            # rowcount=0이면 변경없음, 1이면 INSERT or UPDATE
+            # rowcount=0이면 변경없음, 1이면 INSERT, 2면 UPDATE
             if cur.rowcount == 0:
                 print(f" -> [No changes] game_app_id={row_data[0]}, recommended_app_id={row_data[1]}")
             else:
                 print(f" -> [INSERT or UPDATE OK] game_app_id={row_data[0]}, recommended_app_id={row_data[1]}")
+            if cur.rowcount == 1:
+                inserted_apps.add(row_data[1])
 
+        # 새로 들어온 추천 app은 증분 유사도 갱신 대상 (태그는 speed_up_tag_tb_similar.py가 채우면서 다시 기록)
+        log_app_changes(cur, inserted_apps, source="SIMILAR_GAMES")
         conn.commit()
         cur.close()
         conn.close()
@@ -186,6 +164,7 @@ def main():
     except Exception as e:
         print("[ERROR] DB INSERT 중 오류:", e)
 
+    print_db_stats()
     print("[INFO] 스크립트 완료!")
 
 if __name__ == "__main__":
@@ -7,10 +7,10 @@
 
 
 import os
+import sys
 import time
 import json
-import requests
-import pymysql
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -19,30 +19,32 @@ from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.tag_http_extractor import fetch_tags_via_http
+from common.pipeline import Pipeline
+from common.tag_registry import TagRegistry
+from common.algolia_crawler import AlgoliaCatalogCrawler
+from common.rate_limiter import print_rate_stats
+from common.db import get_connection, print_db_stats
+from common.scd_merge import ScdMerger
+from common.app_tag import create_app_tag_table
+from common.titlelist_current import create_titlelist_current_table, load_current_user_tags
+from common.content_hash import migrate_content_hash, load_current_hashes, skip_unchanged
+
 ########################################
 # 1) ENV & DB SETUP
 ########################################
 load_dotenv()
 
-dbuser = os.getenv('dbuser')
-password = os.getenv('password')
-host = os.getenv('host')
-port = int(os.getenv('port', 3306))
-dbname = os.getenv('name')
+# 태그를 이 일수보다 오래 전에 크롤했으면 lastUpdated 변화가 없어도 다시 크롤
+TAG_MAX_AGE_DAYS = int(os.getenv("TAG_MAX_AGE_DAYS", 30))
+# 1이면 워터마크 무시하고 전체 갱신
+FULL_REFRESH = os.getenv("FULL_REFRESH", "0") == "1"
 
 ALGOLIA_APP_ID = os.getenv("ALGOLIA_APP_ID", "94HE6YATEI")
 ALGOLIA_API_KEY = os.getenv("ALGOLIA_API_KEY", "")
 
-def get_connection():
-    return pymysql.connect(
-        host=host,
-        user=dbuser,
-        password=password,
-        database=dbname,
-        port=port,
-        charset="utf8mb4"
-    )
-
 ########################################
 # 2) CREATE SCD TABLE
 ########################################
@@ -72,169 +74,162 @@ def get_connection():
 ########################################
 # 3) SCD Upsert
 ########################################
+# 행 단위 SELECT/비교/UPDATE/INSERT 대신 common.scd_merge.ScdMerger
+# (스테이징 테이블 적재 -> row hash JOIN으로 변경 분류 -> 만료 UPDATE 1번 + INSERT SELECT 1번)
+_merger_ref = [None]
+
+def get_scd_merger():
+    if _merger_ref[0] is None:
+        _merger_ref[0] = ScdMerger("TITLELIST", app_tag_table="APP_TAG",
+                                   current_table="TITLELIST_CURRENT", hash_column="content_hash")
+    return _merger_ref[0]
+
+def upsert_titlelist_scd_batch(rows, start_date=None, close_missing=False, known_hashes=None):
+    """
+    rows: [(app_id, name, price_us, releaseYear, userScore, user_tags_json), ...]
+    한 트랜잭션에서 집합 연산으로 SCD2 머지
+    known_hashes: {app_id: content_hash}를 주면 내용이 같은 app은 머지 전에 제외
+    반환: (insert 수, update 수, 변경없음 수)
+    """
+    snapshot = [{"app_id": app_id, "name": name, "user_tags": user_tags_json, "price_us": price_us,
+                 "releaseYear": releaseYear, "userScore": userScore}
+                for app_id, name, price_us, releaseYear, userScore, user_tags_json in rows]
+    n_skipped = 0
+    if known_hashes is not None and not close_missing:
+        snapshot, n_skipped = skip_unchanged(snapshot, known_hashes)
+    stats = get_scd_merger().merge(snapshot, start_date=start_date, close_missing=close_missing)
+    return stats["insert"], stats["update"], stats["same"] + n_skipped
+
 def upsert_titlelist_scd_version(
     app_id, name, price_us, releaseYear, userScore,
     user_tags_json="",  # 태그 배열의 JSON 문자열. 예: "[1,2,3]"
     start_date=None
 ):
-    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    if not start_date:
-        start_date = now_str
+    # app 하나짜리 호출도 같은 머지 경로 사용
+    return upsert_titlelist_scd_batch(
+        [(app_id, name, price_us, releaseYear, userScore, user_tags_json)], start_date=start_date)
 
+########################################
+# 3-1) 증분 크롤용 워터마크 (app별 Algolia lastUpdated + 태그 크롤 시각)
+########################################
+def create_watermark_table():
+    create_sql = """
+    CREATE TABLE IF NOT EXISTS TITLELIST_WATERMARK (
+      app_id          BIGINT   NOT NULL,
+      last_updated    BIGINT,              -- Algolia lastUpdated (unix time)
+      tags_crawled_at DATETIME,
+      PRIMARY KEY (app_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """
     conn = get_connection()
     try:
         with conn.cursor() as cur:
-            sel_sql = """
-            SELECT name, user_tags, price_us, releaseYear, userScore
-              FROM TITLELIST
-             WHERE app_id=%s
-               AND end_date='9999-12-31'
-             ORDER BY start_date DESC
-             LIMIT 1
-            """
-            cur.execute(sel_sql, (app_id,))
-            row = cur.fetchone()
-
-            if not row:
-                # 첫 Insert
-                ins_sql = """
-                INSERT INTO TITLELIST
-                 (app_id, name, user_tags, price_us, releaseYear, userScore,
-                  start_date, end_date)
-                VALUES
-                 (%s, %s, %s, %s, %s, %s, %s, '9999-12-31')
-                """
-                cur.execute(ins_sql, (
-                    app_id,
-                    name or "",
-                    user_tags_json or "",
-                    float(price_us or 0.0),
-                    releaseYear or "",
-                    float(userScore or 0.0),
-                    start_date
-                ))
-                print(f"[INSERT] app_id={app_id}, name={name}, userScore={userScore} tags={user_tags_json}")
-            else:
-                old_name, old_tags, old_price, old_year, old_score = row
-                old_name = old_name or ""
-                old_tags = old_tags or ""
-                old_year = old_year or ""
-                old_price = float(old_price or 0.0)
-                old_score = float(old_score or 0.0)
-
-                new_name = name or ""
-                new_tags = user_tags_json or ""
-                new_price = float(price_us or 0.0)
-                new_year = releaseYear or ""
-                new_score = float(userScore or 0.0)
-
-                changed = (
-                    old_name != new_name or
-                    old_tags != new_tags or
-                    old_price != new_price or
-                    old_year != new_year or
-                    old_score != new_score
-                )
-                if changed:
-                    expire_sql = """
-                    UPDATE TITLELIST
-                       SET end_date=%s
-                     WHERE app_id=%s
-                       AND end_date='9999-12-31'
-                    """
-                    cur.execute(expire_sql, (now_str, app_id))
-
-                    ins_sql = """
-                    INSERT INTO TITLELIST
-                     (app_id, name, user_tags, price_us, releaseYear, userScore,
-                      start_date, end_date)
-                    VALUES
-                     (%s, %s, %s, %s, %s, %s, %s, '9999-12-31')
-                    """
-                    cur.execute(ins_sql, (
-                        app_id,
-                        new_name,
-                        new_tags,
-                        new_price,
-                        new_year,
-                        new_score,
-                        start_date
-                    ))
-                    print(f"[UPDATE] app_id={app_id}, changed => {new_tags}")
-                else:
-                    print(f"[NO CHANGE] app_id={app_id}")
+            cur.execute(create_sql)
+        conn.commit()
+    finally:
+        conn.close()
 
+def load_watermarks(app_ids, chunk_size=1000):
+    """{app_id: (last_updated, tags_crawled_at)}"""
+    app_ids = list(app_ids)
+    marks = {}
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            for i in range(0, len(app_ids), chunk_size):
+                chunk = app_ids[i:i + chunk_size]
+                placeholders = ",".join(["%s"] * len(chunk))
+                cur.execute(f"""
+                    SELECT app_id, last_updated, tags_crawled_at
+                      FROM TITLELIST_WATERMARK
+                     WHERE app_id IN ({placeholders})
+                """, chunk)
+                for app_id, last_updated, tags_crawled_at in cur.fetchall():
+                    marks[int(app_id)] = (last_updated, tags_crawled_at)
+    finally:
+        conn.close()
+    return marks
+
+def save_watermarks(rows, chunk_size=5000):
+    """rows: [(app_id, last_updated, tags_crawled_at), ...]"""
+    if not rows:
+        return
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            for i in range(0, len(rows), chunk_size):
+                cur.executemany("""
+                    INSERT INTO TITLELIST_WATERMARK (app_id, last_updated, tags_crawled_at)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                      last_updated = VALUES(last_updated),
+                      tags_crawled_at = VALUES(tags_crawled_at)
+                """, rows[i:i + chunk_size])
         conn.commit()
     finally:
         conn.close()
 
+def select_dirty_hits(hits, marks, max_age_days=TAG_MAX_AGE_DAYS, now=None):
+    """
+    다시 크롤해야 하는 hit만 반환.
+    - 워터마크 없음 (새 app)
+    - Algolia lastUpdated가 바뀜
+    - 태그 크롤한 지 max_age_days 넘음
+    """
+    now = now or datetime.now()
+    dirty = []
+    for h in hits:
+        app_id = int(h["objectID"])
+        mark = marks.get(app_id)
+        if mark is None:
+            dirty.append(h)
+            continue
+        last_updated, tags_crawled_at = mark
+        if h.get("lastUpdated") != last_updated:
+            dirty.append(h)
+        elif tags_crawled_at is None or (now - tags_crawled_at).days >= max_age_days:
+            dirty.append(h)
+    return dirty
+
 ########################################
 # 4) Algolia(steamdb) Crawling
 ########################################
-session = requests.Session()
-
-def fetch_page(page=0, hits_per_page=50):
-    # (키 & 인덱스) => 유효한지 주의!
-    base_url = (
-        f"https://{ALGOLIA_APP_ID.lower()}-dsn.algolia.net/1/indexes/*/queries"
-        "?x-algolia-agent=Algolia%20for%20JavaScript..."
-        f"&x-algolia-api-key={ALGOLIA_API_KEY}"
-        f"&x-algolia-application-id={ALGOLIA_APP_ID}"
-    )
-    session.headers.update({
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "User-Agent": "Mozilla/5.0",
-        "Referer": "https://steamdb.info/instantsearch/",
-        "Origin": "https://steamdb.info"
-    })
-    payload = {
-        "requests": [
-            {
-                "indexName": "steamdb",
-                "attributesToHighlight": ["name"],
-                "attributesToRetrieve": [
-                    "lastUpdated", "small_capsule", "name",
-                    "price_us", "releaseYear", "userScore"
-                ],
-                "facetFilters": ["tags:Indie", "tags:MOBA", ["appType:Game"]],
-                "facets": [],
-                "hitsPerPage": hits_per_page,
-                "page": page,
-                "query": ""
-            }
-        ]
-    }
-    try:
-        resp = session.post(base_url, json=payload, timeout=10)
-        resp.raise_for_status()
-        return resp.json()
-    except requests.RequestException as e:
-        print(f"[ERROR] fetch_page({page}) => {e}")
-        return None
-
-def crawl_steamdb_all(hits_per_page=50, delay=0.5):
-    all_hits = []
-    page_num = 0
-    while True:
-        print(f"[INFO] Fetching page={page_num} (hits_per_page={hits_per_page})")
-        data = fetch_page(page=page_num, hits_per_page=hits_per_page)
-        if not data: break
-
-        arr = data.get("results", [])
-        if not arr: break
-
-        main_result = arr[0]
-        hits = main_result.get("hits", [])
-        if not hits: break
-
-        all_hits.extend(hits)
-        nb_pages = main_result.get("nbPages", 1)
-        page_num += 1
-        print(f" page={page_num-1} => {len(hits)} hits (total so far={len(all_hits)})")
-        if page_num >= nb_pages:
-            break
-        time.sleep(delay)
+ALGOLIA_BASE_URL = (
+    f"https://{ALGOLIA_APP_ID.lower()}-dsn.algolia.net/1/indexes/*/queries"
+    "?x-algolia-agent=Algolia%20for%20JavaScript..."
+    f"&x-algolia-api-key={ALGOLIA_API_KEY}"
+    f"&x-algolia-application-id={ALGOLIA_APP_ID}"
+)
+ALGOLIA_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "User-Agent": "Mozilla/5.0",
+    "Referer": "https://steamdb.info/instantsearch/",
+    "Origin": "https://steamdb.info"
+}
+# (키 & 인덱스) => 유효한지 주의! page / hitsPerPage는 크롤러가 채움
+ALGOLIA_REQUEST = {
+    "indexName": "steamdb",
+    "attributesToHighlight": ["name"],
+    "attributesToRetrieve": [
+        "lastUpdated", "small_capsule", "name",
+        "price_us", "releaseYear", "userScore"
+    ],
+    "facetFilters": ["tags:Indie", "tags:MOBA", ["appType:Game"]],
+    "query": ""
+}
+
+def make_steamdb_crawler(hits_per_page=50, max_workers=8):
+    # 페이지 병렬 요청 + releaseYear/가격대 분할 (crawler.complete로 부분 크롤 여부 확인)
+    return AlgoliaCatalogCrawler(ALGOLIA_BASE_URL, ALGOLIA_HEADERS, ALGOLIA_REQUEST,
+                                 hits_per_page=hits_per_page, max_workers=max_workers)
+
+def stream_steamdb_hits(hits_per_page=50, max_workers=8):
+    # hit를 하나씩 yield
+    return make_steamdb_crawler(hits_per_page, max_workers).stream()
+
+def crawl_steamdb_all(hits_per_page=50, max_workers=8):
+    all_hits = list(stream_steamdb_hits(hits_per_page, max_workers))
     print(f"[DONE] total {len(all_hits)} from Algolia steamdb.")
     return all_hits
 
@@ -247,6 +242,15 @@ def steam_manual_login(driver):
     print("스팀 로그인 후 콘솔에 Enter...")
     input()
 
+def open_logged_in_driver():
+    options = webdriver.ChromeOptions()
+    # options.add_argument("--headless")  # 주석처리, 사람 로그인
+    options.add_argument("--disable-gpu")
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    steam_manual_login(driver)
+    return driver
+
 def fetch_tags_via_plus_button(app_id, driver):
     result = {"app_id": app_id, "name": None, "user_tags": []}
     url = f"https://store.steampowered.com/app/{app_id}"
@@ -279,86 +283,128 @@ def fetch_tags_via_plus_button(app_id, driver):
 ########################################
 # 5-1) 태그 매핑
 ########################################
-TAG_JSON_PATH = "tag_dict.json"
-
-def load_tag_mapping():
-    if not os.path.exists(TAG_JSON_PATH):
-        return {}, 1
-    with open(TAG_JSON_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    if not data:
-        return {}, 1
-    max_val = max(data.values())
-    return data, max_val+1
-
-def save_tag_mapping(mapping):
-    with open(TAG_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(mapping, f, ensure_ascii=False, indent=2)
-
-def get_tag_id(tag_name, mapping, next_id_ref):
-    if tag_name not in mapping:
-        mapping[tag_name] = next_id_ref[0]
-        next_id_ref[0] += 1
-        save_tag_mapping(mapping)
-    return mapping[tag_name]
-
-def convert_tags_to_int_list(tag_list, mapping, next_id_ref):
-    return [get_tag_id(t, mapping, next_id_ref) for t in tag_list]
+# 예전 tag_dict.json(로컬 ID) 대신 TAGS 테이블 ID 사용 (SIMILAR_GAMES.user_tags와 같은 ID 체계)
+# common.tag_registry.TagRegistry: TAGS 한 번 로드, 새 태그는 배치 단위 INSERT IGNORE + SELECT IN
 
 ########################################
-# 6) MAIN
+# 6) MAIN (단계별 스트리밍 파이프라인)
 ########################################
+# Algolia 크롤 -> 워터마크 필터 -> 태그 크롤 -> 태그 ID 변환 -> SCD 배치 쓰기
+# 각 단계는 크기 제한 queue로 연결 => 앞 단계가 끝나기 전에 뒤 단계가 이미 처리 시작
+TAG_WORKERS = int(os.getenv("TAG_WORKERS", 8))
+SCD_BATCH_SIZE = int(os.getenv("SCD_BATCH_SIZE", 200))
+# 태그 단계(rate limit)가 병목이라 뒤 단계 입력은 느리게 들어옴 => 배치를 채울 때까지 기다리는 최대 시간(초)
+SCD_BATCH_TIMEOUT = float(os.getenv("SCD_BATCH_TIMEOUT", 30))
+
 def main():
     # 1) SCD 테이블
     # create_scd_table()
-
-    # 2) Algolia -> app list
-    hits = crawl_steamdb_all(hits_per_page=50, delay=0.5)
-    print(f"[INFO] total algolia hits: {len(hits)}")
-
-    # 3) 셀레니움 브라우저 + 수동 로그인
-    options = webdriver.ChromeOptions()
-    # options.add_argument("--headless")  # 주석처리, 사람 로그인
-    options.add_argument("--disable-gpu")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-
-    steam_manual_login(driver)
-
-    # 4) 태그 매핑 로드
-    tag_mapping, next_id_val = load_tag_mapping()
-    next_id_ref = [next_id_val]
-
-    # 5) for each app => upsert
-    for i, h in enumerate(hits):
-        objectID = h.get("objectID", "")
-        if not objectID.isdigit():
-            continue
-        app_id = int(objectID)
-
-        name = h.get("name", "")
-        price_us = h.get("price_us", 0.0)
-        releaseYear = str(h.get("releaseYear", ""))
-        userScore = h.get("userScore", 0.0)
-
-        # (A) steam 태그
-        tag_info = fetch_tags_via_plus_button(app_id, driver=driver)
-        raw_tags = tag_info["user_tags"]
-        int_list = convert_tags_to_int_list(raw_tags, tag_mapping, next_id_ref)
-        user_tags_json = json.dumps(int_list)
-
-        # (B) SCD 업서트
-        upsert_titlelist_scd_version(
-            app_id=app_id,
-            name=name,  # Algolia의 name vs Steam store name 중 어느 걸 쓸지도 선택 가능
-            price_us=price_us,
-            releaseYear=releaseYear,
-            userScore=userScore,
-            user_tags_json=user_tags_json
-        )
-        print(f"[{i+1}/{len(hits)}] app_id={app_id}, name={name}, tags={raw_tags}")
-
-    driver.quit()
+    create_watermark_table()
+    create_app_tag_table()
+    create_titlelist_current_table()
+    migrate_content_hash()
+    if FULL_REFRESH:
+        print("[INFO] FULL_REFRESH=1 => 전체 app 갱신")
+
+    # 셀레니움(+수동 로그인)은 HTTP 파싱 실패 app이 처음 나올 때만 열고, 드라이버 1개를 lock으로 공유
+    driver_ref = [None]
+    driver_lock = threading.Lock()
+
+    def selenium_fallback(app_id):
+        with driver_lock:
+            if driver_ref[0] is None:
+                driver_ref[0] = open_logged_in_driver()
+            return fetch_tags_via_plus_button(app_id, driver=driver_ref[0])["user_tags"]
+
+    # 태그 이름 <-> ID 사전 (TAGS 한 번 로드)
+    registry = TagRegistry(get_connection)
+    crawled_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    totals = {"hits": 0, "dirty": 0, "insert": 0, "update": 0, "same": 0}
+    pending_marks = []   # 크롤이 완료되면 한 번에 기록할 워터마크
+    # 현재 버전 해시 {app_id: content_hash} (쿼리 1번) => 내용이 같은 app은 SCD 머지 전에 제외
+    current_hashes = load_current_hashes()
+
+    # 2) 워터마크 비교 => lastUpdated가 바뀌었거나 태그가 오래된 app만 다음 단계로
+    def filter_stage(hits, emit):
+        totals["hits"] += len(hits)
+        if not FULL_REFRESH:
+            marks = load_watermarks(int(h["objectID"]) for h in hits)
+            hits = select_dirty_hits(hits, marks)
+        totals["dirty"] += len(hits)
+        for h in hits:
+            emit(h)
+
+    # 3) HTTP로 태그 수집 (실패 시 셀레니움 fallback)
+    def tag_stage(h, emit):
+        app_id = int(h["objectID"])
+        data = fetch_tags_via_http(app_id)
+        if data:
+            emit((h, data["user_tags"], True))
+            return
+        tags = selenium_fallback(app_id) or []
+        emit((h, tags, bool(tags)))
+
+    # 4) 태그 이름 -> ID (배치 안의 새 태그를 한 번에 등록)
+    def intern_stage(items, emit):
+        registry.resolve_many(t for _, raw_tags, _ in items for t in raw_tags)
+        for h, raw_tags, tags_ok in items:
+            emit((h, json.dumps(registry.to_ids(raw_tags)), tags_ok))
+
+    # 5) SCD 배치 업서트 + 워터마크 모아 두기
+    #    (워터마크는 Algolia 크롤이 빠짐없이 끝났을 때만 마지막에 한 번에 기록
+    #     => 중간에 죽거나 부분 크롤이면 다음 실행에서 재처리,
+    #     태그 수집 실패한 app은 tags_crawled_at을 비워 두어 다음 실행에서 다시 크롤)
+    #    태그 수집 실패 => "[]"로 덮지 않고 현재 버전의 user_tags를 그대로 사용
+    #     (빈 태그 버전이 APP_TAG / TITLELIST_CURRENT / 태그 벡터 / 유사도로 퍼지지 않게)
+    #     현재 버전이 없는 새 app은 태그를 받을 때까지 머지에서 제외 (워터마크만 기록)
+    def write_stage(items, emit):
+        kept_tags = load_current_user_tags(int(h["objectID"]) for h, _, tags_ok in items if not tags_ok)
+        rows = []
+        for h, user_tags_json, tags_ok in items:
+            app_id = int(h["objectID"])
+            if not tags_ok:
+                if app_id not in kept_tags:
+                    continue
+                user_tags_json = kept_tags[app_id]
+            rows.append((app_id, h.get("name", ""), h.get("price_us", 0.0),
+                         str(h.get("releaseYear", "")), h.get("userScore", 0.0), user_tags_json))
+        n_ins, n_upd, n_same = upsert_titlelist_scd_batch(rows, known_hashes=current_hashes)
+        pending_marks.extend((int(h["objectID"]), h.get("lastUpdated"), crawled_at if tags_ok else None)
+                             for h, _, tags_ok in items)
+        totals["insert"] += n_ins
+        totals["update"] += n_upd
+        totals["same"] += n_same
+
+    crawler = make_steamdb_crawler(hits_per_page=50)
+    hits = (h for h in crawler.stream()
+            if str(h.get("objectID", "")).isdigit())
+
+    pipe = Pipeline("update_titlelist", log_interval=10.0)
+    pipe.add_stage("filter", filter_stage, workers=1, queue_size=2000, batch_size=500)
+    pipe.add_stage("tags", tag_stage, workers=TAG_WORKERS, queue_size=500)
+    pipe.add_stage("intern", intern_stage, workers=1, queue_size=500, batch_size=200,
+                   batch_timeout=SCD_BATCH_TIMEOUT)
+    pipe.add_stage("scd_writer", write_stage, workers=1, queue_size=1000, batch_size=SCD_BATCH_SIZE,
+                   batch_timeout=SCD_BATCH_TIMEOUT)
+    try:
+        pipe.run(hits)
+    finally:
+        if driver_ref[0] is not None:
+            driver_ref[0].quit()
+
+    # 6) 부분 크롤(요청 실패 / 파티션 누락)이면 워터마크를 올리지 않음
+    if crawler.complete:
+        save_watermarks(pending_marks)
+        print(f"[INFO] 워터마크 {len(pending_marks)}개 기록")
+    else:
+        print(f"[WARN] Algolia 부분 크롤 => 워터마크 {len(pending_marks)}개 기록 안 함 (다음 실행에서 재처리)")
+
+    print(f"[INFO] algolia hits {totals['hits']} => 변경/오래된 app {totals['dirty']} "
+          f"(태그 최대 보관 {TAG_MAX_AGE_DAYS}일)")
+    print(f"[INFO] TITLELIST insert {totals['insert']} / update {totals['update']} / 변경없음 {totals['same']}")
+    registry.print_stats()
+    print_rate_stats()
+    print_db_stats()
     print("[DONE] Combined Algolia+Steam SCD update done.")
 
 if __name__ == "__main__":
@@ -8,9 +8,15 @@ import plotly.express as px
 import mysql.connector
 from dotenv import load_dotenv
 import os
+import sys
 import json
 from streamlit_elements import elements, mui, nivo
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.tag_bitmap_index import TagBitmapIndex, match_titles
+from common.app_tag import tag_filter_sql
+
 # .env 파일 로드 (로컬에서만)
 if os.path.exists(".env"):
     load_dotenv()
@@ -121,42 +127,33 @@ def fetch_review_categories():
         cursor.close()
         connection.close()
 
+# 현재 TITLELIST 스냅샷으로 만든 태그 비트맵 인덱스 (세션 간 공유, 10분마다 다시 로드)
+@st.cache_resource(ttl=600)
+def get_tag_index():
+    connection = get_db_connection()
+    if not connection:
+        return None
+    try:
+        return TagBitmapIndex.from_connection(connection)
+    finally:
+        connection.close()
+
 # 캐싱된 타이틀 및 리뷰 가져오기
 @st.cache_data
 def fetch_titles_by_tags(selected_tags):
     connection = get_db_connection()
     if not connection:
         return pd.DataFrame()
-
     try:
         cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT tag_id, tag_name FROM TAGS")
-        tag_results = cursor.fetchall()
-        tag_id_to_name = {tag['tag_id']: tag['tag_name'] for tag in tag_results}
-
-        tag_id_query = """
-        SELECT tag_id, tag_name
-        FROM TAGS
-        WHERE tag_name IN ({})
-        """
-        tag_placeholders = ','.join(['%s'] * len(selected_tags))
-        cursor.execute(tag_id_query.format(tag_placeholders), selected_tags)
-        selected_tag_results = cursor.fetchall()
-        tag_id_map = {tag['tag_name']: tag['tag_id'] for tag in selected_tag_results}
-
-        selected_tag_ids = [str(tag_id_map[tag]) for tag in selected_tags if tag in tag_id_map]
-        if not selected_tag_ids:
+        # 태그 이름 <-> ID 변환과 태그 교집합은 메모리 비트맵 인덱스에서 (태그 조합이 바뀌어도 TAGS / APP_TAG 조회 없음)
+        # 인덱스가 없을 때만 DB로 계산, 커넥션은 리뷰(REVIEW_TAG) 조회용
+        tag_params, tag_id_to_name, results = match_titles(selected_tags, get_tag_index(), connection,
+                                                           columns=("app_id", "name", "user_tags", "userScore"))
+        if not tag_params:
             st.warning("선택한 태그에 해당하는 tag_id가 없습니다.")
             return pd.DataFrame()
-
-        query = """
-        SELECT app_id, name, user_tags, userScore
-        FROM TITLELIST
-        WHERE {conditions}
-        """
-        conditions = " AND ".join([f"JSON_CONTAINS(user_tags, %s)" for _ in selected_tag_ids])
-        cursor.execute(query.format(conditions=conditions), [str(id) for id in selected_tag_ids])
-        results = cursor.fetchall()
+        tag_match, tag_params = tag_filter_sql(tag_params)
 
         # 동적 카테고리 가져오기
         categories = fetch_review_categories()
@@ -164,9 +161,9 @@ def fetch_titles_by_tags(selected_tags):
         review_query = f"""
         SELECT app_id, review_id, {review_query_cols}
         FROM REVIEW_TAG
-        WHERE app_id IN (SELECT app_id FROM TITLELIST WHERE {conditions})
+        WHERE app_id IN ({tag_match})
         """
-        cursor.execute(review_query.format(conditions=conditions), [str(id) for id in selected_tag_ids])
+        cursor.execute(review_query, tag_params)
         review_results = cursor.fetchall()
 
         df = pd.DataFrame(results)
@@ -8,11 +8,18 @@ import plotly.express as px
 import mysql.connector
 from dotenv import load_dotenv
 import os
+import sys
 import json
 from streamlit_elements import elements, mui, nivo
 import time
 import re  # 텍스트 전처리를 위한 정규 표현식 모듈 추가
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.tag_bitmap_index import TagBitmapIndex, match_titles
+from common.app_tag import tag_filter_sql
+from common.tag_vectors import TagVectors
+
 # .env 파일 로드 (로컬에서만)
 if os.path.exists(".env"):
     load_dotenv()
@@ -176,6 +183,22 @@ def fetch_review_categories():
         cursor.close()
         connection.close()
 
+# 현재 TITLELIST 스냅샷으로 만든 태그 비트맵 인덱스 (세션 간 공유, 10분마다 다시 로드)
+@st.cache_resource(ttl=600)
+def get_tag_index():
+    connection = get_db_connection()
+    if not connection:
+        return None
+    try:
+        return TagBitmapIndex.from_connection(connection)
+    finally:
+        connection.close()
+
+# IDF x 순위 가중 태그 벡터 (J/build_tag_vectors.py가 저장한 .npy를 메모리 매핑, 없으면 None)
+@st.cache_resource(ttl=600)
+def get_tag_vectors():
+    return TagVectors.load()
+
 # 타이틀 및 리뷰 가져오기
 @st.cache_data(hash_funcs={list: lambda x: tuple(x)})
 def fetch_titles_by_tags(selected_tags):
@@ -184,42 +207,23 @@ def fetch_titles_by_tags(selected_tags):
         return pd.DataFrame(), {}, {}
     try:
         cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT tag_id, tag_name FROM TAGS")
-        tag_results = cursor.fetchall()
-        tag_id_to_name = {tag['tag_id']: tag['tag_name'] for tag in tag_results}
-
-        tag_id_query = """
-        SELECT tag_id, tag_name
-        FROM TAGS
-        WHERE tag_name IN ({})
-        """
-        tag_placeholders = ','.join(['%s'] * len(selected_tags))
-        cursor.execute(tag_id_query.format(tag_placeholders), selected_tags)
-        selected_tag_results = cursor.fetchall()
-        tag_id_map = {tag['tag_name']: tag['tag_id'] for tag in selected_tag_results}
-
-        selected_tag_ids = [str(tag_id_map[tag]) for tag in selected_tags if tag in tag_id_map]
-        if not selected_tag_ids:
+        # 태그 이름 <-> ID 변환과 태그 교집합은 메모리 비트맵 인덱스에서 (태그 조합이 바뀌어도 TAGS / APP_TAG 조회 없음)
+        # 인덱스가 없을 때만 DB로 계산, 커넥션은 리뷰(REVIEW_TAG) 조회용
+        tag_params, tag_id_to_name, results = match_titles(selected_tags, get_tag_index(), connection,
+                                                           columns=("app_id", "name", "user_tags", "userScore"))
+        if not tag_params:
             st.warning("선택한 태그에 해당하는 tag_id가 없습니다.")
             return pd.DataFrame(), {}, {}
-
-        query = """
-        SELECT app_id, name, user_tags, userScore
-        FROM TITLELIST
-        WHERE {conditions}
-        """
-        conditions = " AND ".join([f"JSON_CONTAINS(user_tags, %s)" for _ in selected_tag_ids])
-        cursor.execute(query.format(conditions=conditions), [str(id) for id in selected_tag_ids])
-        results = cursor.fetchall()
+        tag_match, tag_params = tag_filter_sql(tag_params)
 
         categories = fetch_review_categories()
         review_query_cols = ", ".join(categories)
         review_query = f"""
         SELECT app_id, review_id, {review_query_cols}
         FROM REVIEW_TAG
-        WHERE app_id IN (SELECT app_id FROM TITLELIST WHERE {conditions})
+        WHERE app_id IN ({tag_match})
         """
-        cursor.execute(review_query.format(conditions=conditions), [str(id) for id in selected_tag_ids])
+        cursor.execute(review_query, tag_params)
         review_results = cursor.fetchall()
 
         df = pd.DataFrame(results)
@@ -911,6 +915,14 @@ else:
                     on="recommended_app_id",
                     how="left"
                 )
+                # MATRIX top-9에 없는 추천 게임은 태그 벡터로 바로 계산한 유사도(%)로 채움
+                tag_vectors = get_tag_vectors()
+                if tag_vectors is not None:
+                    vector_similarity = pd.Series(
+                        tag_vectors.similarity(title_info["app_id"], combined_df["recommended_app_id"]) * 100,
+                        index=combined_df.index
+                    )
+                    combined_df["similarity"] = combined_df["similarity"].fillna(vector_similarity)
                 combined_df["similarity"] = combined_df["similarity"].fillna(0)
                 combined_df = combined_df.sort_values("similarity", ascending=False).drop_duplicates(subset=["recommended_app_id"], keep="first")
 
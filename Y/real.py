@@ -8,8 +8,13 @@ import plotly.express as px
 import mysql.connector
 from dotenv import load_dotenv
 import os
+import sys
 import json
 
+# 공용 모듈(common/) import를 위해 repo 루트를 path에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.tag_bitmap_index import TagBitmapIndex, match_titles
+
 # .env 파일 로드
 load_dotenv()
 
@@ -31,46 +36,35 @@ def get_db_connection():
         st.error(f"데이터베이스 연결 오류: {err}")
         return None
 
-# 태그로 타이틀 가져오기
-def fetch_titles_by_tags(selected_tags):
+# 현재 TITLELIST 스냅샷으로 만든 태그 비트맵 인덱스 (세션 간 공유, 10분마다 다시 로드)
+@st.cache_resource(ttl=600)
+def get_tag_index():
     connection = get_db_connection()
     if not connection:
-        return pd.DataFrame()
+        return None
+    try:
+        return TagBitmapIndex.from_connection(connection)
+    finally:
+        connection.close()
+
+# 태그로 타이틀 가져오기
+def fetch_titles_by_tags(selected_tags):
+    # 태그 이름 <-> ID 변환과 태그 교집합은 메모리 비트맵 인덱스에서
+    # => 인덱스가 있으면 DB 커넥션을 열지 않음 (없을 때만 TAGS + APP_TAG 교집합 SQL)
+    tag_index = get_tag_index()
+    connection = None
+    if tag_index is None:
+        connection = get_db_connection()
+        if not connection:
+            return pd.DataFrame()
 
     try:
-        cursor = connection.cursor(dictionary=True)
-
-        # TAGS 테이블에서 모든 tag_id와 tag_name 조회
-        cursor.execute("SELECT tag_id, tag_name FROM TAGS")
-        tag_results = cursor.fetchall()
-        tag_id_to_name = {tag['tag_id']: tag['tag_name'] for tag in tag_results}
-
-        # 선택된 태그 이름에 해당하는 tag_id 조회
-        tag_id_query = """
-        SELECT tag_id, tag_name
-        FROM TAGS
-        WHERE tag_name IN ({})
-        """
-        tag_placeholders = ','.join(['%s'] * len(selected_tags))
-        cursor.execute(tag_id_query.format(tag_placeholders), selected_tags)
-        selected_tag_results = cursor.fetchall()
-        tag_id_map = {tag['tag_name']: tag['tag_id'] for tag in selected_tag_results}
-
-        selected_tag_ids = [str(tag_id_map[tag]) for tag in selected_tags if tag in tag_id_map]
-        if not selected_tag_ids:
+        tag_params, tag_id_to_name, results = match_titles(selected_tags, tag_index, connection,
+                                                           columns=("app_id", "name", "user_tags", "userScore"))
+        if not tag_params:
             st.warning("선택한 태그에 해당하는 tag_id가 없습니다.")
             return pd.DataFrame()
 
-        # TITLELIST에서 데이터 조회
-        query = """
-        SELECT app_id, name, user_tags, userScore
-        FROM TITLELIST
-        WHERE {conditions}
-        """
-        conditions = " AND ".join([f"JSON_CONTAINS(user_tags, %s)" for _ in selected_tag_ids])
-        cursor.execute(query.format(conditions=conditions), [str(id) for id in selected_tag_ids])
-        results = cursor.fetchall()
-
         df = pd.DataFrame(results)
         if not df.empty:
             # user_tags를 tag_name으로 변환
@@ -92,8 +86,8 @@ def fetch_titles_by_tags(selected_tags):
         st.error(f"쿼리 실행 오류: {err}")
         return pd.DataFrame()
     finally:
-        cursor.close()
-        connection.close()
+        if connection:
+            connection.close()
 
 # 워드 클라우드 색상 함수
 def color_func(word, font_size, position, orientation, random_state=None, **kwargs):
@@ -0,0 +1 @@
+# common/ : 여러 크롤러/ETL 스크립트(J, P, Y)가 같이 쓰는 공용 모듈
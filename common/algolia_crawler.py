@@ -0,0 +1,235 @@
+# algolia_crawler.py (steamdb Algolia 인덱스 병렬 + 파티션 크롤러)
+#
+# 기존 crawl_steamdb_all / crawl_all_pages: page=0,1,2,... 를 한 장씩 순서대로 요청하고
+#   결과를 all_hits 리스트 하나에 모음. 또 Algolia는 한 쿼리로 앞쪽 1000건(paginationLimitedTo)까지만
+#   페이지로 내려주기 때문에, 결과가 그보다 많으면 뒤쪽은 못 가져옴.
+# 변경:
+#   1) page 0 응답에서 nbPages를 알면 나머지 페이지를 스레드 풀로 한꺼번에 요청
+#   2) nbHits가 상한(hits_cap)을 넘으면 쿼리를 쪼갬
+#        releaseYear facet 값별 -> 그래도 넘으면 가격대(price_us numericFilters)별
+#        releaseYear 분할에는 나머지 파티션 하나 (releaseYear:-YYYY facet 부정 => releaseYear 없는 hit)
+#        가격대 분할은 price_us가 없는(null) hit를 잡는 필터가 없음 (numericFilters는 없는 값에 안 걸림)
+#        => 쪼갠 파티션들의 nbHits 합이 원래 nbHits와 다르면 경고 (stats["count_mismatch"])
+#   4) 요청 실패 / 상한 초과 파티션 / 합계 불일치 / 생산자 예외가 있으면 crawler.complete == False
+#      생산자 예외는 stream()이 끝날 때 다시 raise => 호출자가 부분 크롤을 완료로 오인하지 않게
+#   3) hit는 크기 제한 있는 queue로 흘려보냄 (소비자가 느리면 생산자가 기다림)
+#      objectID 기준 중복 제거
+#   요청 간격은 rate_limiter("algolia")가 조절
+#
+# 사용 예:
+#   crawler = AlgoliaCatalogCrawler(BASE_URL, HEADERS, base_request)
+#   for hit in crawler.stream():
+#       ...
+
+import copy
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from common.rate_limiter import limited_post
+
+ALGOLIA_HITS_CAP = 1000  # Algolia 기본 paginationLimitedTo
+
+# (이상, 미만) 단위: USD. None은 제한 없음
+PRICE_BANDS = [
+    (None, 0.01),  # 무료
+    (0.01, 5),
+    (5, 10),
+    (10, 20),
+    (20, 40),
+    (40, None),
+]
+
+_DONE = object()  # queue 종료 표시
+
+
+# splitter: (page 0 결과, facetFilters, numericFilters, filters) => 자식 파티션 [(facetFilters, numericFilters, filters)]
+#   filters: Algolia filters 문자열 조각 리스트 (AND로 묶음, base_request의 filters를 그대로 전달)
+def split_by_release_year(result, facet_filters, numeric_filters, filters):
+    years = sorted((result.get("facets") or {}).get("releaseYear", {}))
+    parts = [(facet_filters + [f"releaseYear:{year}"], numeric_filters, filters) for year in years]
+    # 나머지: 위 연도 어디에도 안 걸리는 hit (releaseYear 없음)
+    parts.append((facet_filters + [f"releaseYear:-{year}" for year in years], numeric_filters, filters))
+    return parts
+
+
+def split_by_price_band(result, facet_filters, numeric_filters, filters):
+    parts = []
+    for low, high in PRICE_BANDS:
+        band = []
+        if low is not None:
+            band.append(f"price_us>={low}")
+        if high is not None:
+            band.append(f"price_us<{high}")
+        parts.append((facet_filters, numeric_filters + band, filters))
+    return parts
+
+
+class AlgoliaCatalogCrawler:
+    def __init__(self, base_url, headers, base_request, hits_per_page=100,
+                 max_workers=8, hits_cap=ALGOLIA_HITS_CAP, queue_size=2000, splitters=None):
+        """
+        base_request: Algolia requests[0] 딕셔너리 (indexName, facetFilters, attributesToRetrieve ...)
+                      page / hitsPerPage는 크롤러가 채움
+        """
+        self.base_url = base_url
+        self.headers = headers
+        self.base_request = base_request
+        self.hits_per_page = hits_per_page
+        self.max_workers = max_workers
+        self.hits_cap = hits_cap
+        self.queue_size = queue_size
+        self.splitters = splitters or [split_by_release_year, split_by_price_band]
+        self.local = threading.local()
+        self.seen_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "failed": 0, "partitions": 0, "hits": 0, "duplicates": 0,
+                      "count_mismatch": 0, "truncated": 0}
+        self.error = None   # 생산자 스레드에서 난 예외 (stream()이 끝날 때 다시 raise)
+
+    @property
+    def complete(self):
+        """빠짐없이 다 받았는지: 예외 / 요청 실패 / 상한 초과 파티션 / 파티션 합계 불일치가 하나도 없을 때만 True"""
+        s = self.stats
+        return self.error is None and s["failed"] == 0 and s["truncated"] == 0 and s["count_mismatch"] == 0
+
+    def _count(self, key, n=1):
+        with self.stats_lock:
+            self.stats[key] += n
+
+    ########################################
+    # 요청
+    ########################################
+    def _session(self):
+        # 스레드마다 Session 하나 (keep-alive 재사용)
+        if not hasattr(self.local, "session"):
+            s = requests.Session()
+            s.headers.update(self.headers)
+            self.local.session = s
+        return self.local.session
+
+    def _query(self, page, facet_filters, numeric_filters, filters, facets=None):
+        req = copy.deepcopy(self.base_request)
+        req["page"] = page
+        req["hitsPerPage"] = self.hits_per_page
+        req["facetFilters"] = facet_filters
+        if numeric_filters:
+            req["numericFilters"] = numeric_filters
+        if filters:
+            req["filters"] = " AND ".join(filters)
+        if facets is not None:
+            req["facets"] = facets
+            req["maxValuesPerFacet"] = 1000
+        self._count("requests")
+        try:
+            resp = limited_post(self._session(), self.base_url, json={"requests": [req]}, timeout=10)
+            resp.raise_for_status()
+            results = resp.json().get("results", [])
+            return results[0] if results else None
+        except (requests.RequestException, ValueError) as e:
+            self._count("failed")
+            print(f"[ERROR] algolia page={page} filters={facet_filters} {numeric_filters} {filters} => {e}")
+            return None
+
+    ########################################
+    # 생산자
+    ########################################
+    def _put_hits(self, hits, out_queue, seen):
+        for h in hits:
+            object_id = h.get("objectID")
+            with self.seen_lock:
+                if object_id in seen:
+                    self.stats["duplicates"] += 1
+                    continue
+                seen.add(object_id)
+                self.stats["hits"] += 1
+            out_queue.put(h)  # queue가 가득 차면 여기서 대기
+
+    def _fetch_page(self, page, facet_filters, numeric_filters, filters, out_queue, seen):
+        result = self._query(page, facet_filters, numeric_filters, filters)
+        if result:
+            self._put_hits(result.get("hits", []), out_queue, seen)
+
+    def _plan(self, facet_filters, numeric_filters, filters, depth, pool, futures, out_queue, seen):
+        """
+        page 0을 받아보고 상한 이하면 나머지 페이지를 pool에 바로 제출,
+        넘으면 다음 splitter로 쪼개서 재귀. => 이 파티션의 nbHits (요청 실패면 None)
+        """
+        facets = ["releaseYear"] if depth < len(self.splitters) else None
+        first = self._query(0, facet_filters, numeric_filters, filters, facets=facets)
+        if not first:
+            return None
+        nb_hits = first.get("nbHits", 0)
+
+        if nb_hits > self.hits_cap and depth < len(self.splitters):
+            children = self.splitters[depth](first, facet_filters, numeric_filters, filters)
+            print(f"[ALGOLIA] nbHits={nb_hits} > {self.hits_cap} => {len(children)}개로 분할 "
+                  f"({self.splitters[depth].__name__})")
+            child_hits = [self._plan(child_ff, child_nf, child_f, depth + 1, pool, futures, out_queue, seen)
+                          for child_ff, child_nf, child_f in children]
+            # 자식 파티션이 부모를 빠짐없이 / 겹침없이 나눴는지 확인 (실패한 자식이 있으면 비교 불가)
+            if None not in child_hits and sum(child_hits) != nb_hits:
+                self._count("count_mismatch")
+                note = (" => price_us가 없는(null) hit는 가격대 파티션에 안 잡힘"
+                        if self.splitters[depth] is split_by_price_band else "")
+                print(f"[WARN] 파티션 합계 불일치: filters={facet_filters} {numeric_filters} {filters} "
+                      f"nbHits={nb_hits} != 자식 합 {sum(child_hits)} ({self.splitters[depth].__name__}){note}")
+            return nb_hits
+
+        if nb_hits > self.hits_cap:
+            self._count("truncated")
+            print(f"[WARN] 더 쪼갤 수 없음: filters={facet_filters} {numeric_filters} {filters} "
+                  f"nbHits={nb_hits} 중 {self.hits_cap}건만 수집")
+
+        self._count("partitions")
+        self._put_hits(first.get("hits", []), out_queue, seen)
+        for page in range(1, first.get("nbPages", 1)):
+            futures.append(pool.submit(self._fetch_page, page, facet_filters, numeric_filters, filters,
+                                       out_queue, seen))
+        return nb_hits
+
+    def _produce(self, out_queue):
+        seen = set()
+        futures = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                base_ff = list(self.base_request.get("facetFilters", []))
+                base_nf = list(self.base_request.get("numericFilters", []))
+                base_f = [f"({self.base_request['filters']})"] if self.base_request.get("filters") else []
+                self._plan(base_ff, base_nf, base_f, 0, pool, futures, out_queue, seen)
+                for f in futures:
+                    f.result()
+        except Exception as e:
+            self.error = e
+            print(f"[ERROR] algolia 크롤 중단 => {e}")
+        finally:
+            out_queue.put(_DONE)
+
+    ########################################
+    # 소비자
+    ########################################
+    def stream(self):
+        """
+        hit를 도착하는 순서대로 하나씩 yield (순서 보장 없음)
+        생산자가 예외로 중단됐으면 마지막에 그 예외를 다시 raise. 요청 실패 등은 self.complete로 확인
+        """
+        out_queue = queue.Queue(maxsize=self.queue_size)
+        producer = threading.Thread(target=self._produce, args=(out_queue,), daemon=True)
+        producer.start()
+        while True:
+            h = out_queue.get()
+            if h is _DONE:
+                break
+            yield h
+        producer.join()
+        s = self.stats
+        print(f"[ALGOLIA] hits {s['hits']} (중복 {s['duplicates']}) / 파티션 {s['partitions']} "
+              f"/ 요청 {s['requests']} (실패 {s['failed']}) / 합계 불일치 {s['count_mismatch']} "
+              f"/ 상한 초과 {s['truncated']} => {'완료' if self.complete else '부분 크롤'}")
+        if self.error is not None:
+            raise self.error
+
+    def crawl_all(self):
+        return list(self.stream())
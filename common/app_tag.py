@@ -0,0 +1,117 @@
+# app_tag.py (APP_TAG 브리지 테이블: app_id <-> tag_id 정규화)
+#
+# 기존 대시보드 fetch_titles_by_tags: 선택 태그마다 JSON_CONTAINS(user_tags, %s)
+#   => 인덱스를 못 타서 태그 필터 한 번마다 TITLELIST 전체(모든 SCD 버전) 풀스캔
+# 변경: 현재 버전의 태그를 (app_id, tag_id, tag_rank) 행으로 풀어서 APP_TAG에 저장
+#   - PK (app_id, tag_id)   : app별 태그 교체(DELETE/INSERT)용
+#   - INDEX (tag_id, app_id): 태그별 app 목록 = 인덱스 range scan만으로 교집합 계산
+#   - tag_rank: user_tags 배열 안의 순서 (1부터, 스팀 상점 태그 순서 = 투표 많은 순)
+#   유지 경로:
+#     - ScdMerger(app_tag_table="APP_TAG"): 새 버전이 들어간 app만 같은 트랜잭션에서 교체
+#     - rebuild_app_tag(): TITLELIST 활성 행에서 전체 재생성 (최초 1회 / backfill 후)
+#
+# 태그 필터 쿼리:
+#   sql, params = tag_filter_sql([3, 17])
+#   => 태그를 모두 가진 app_id 목록 (GROUP BY app_id HAVING COUNT(*) = 태그 수)
+
+from common.db import get_connection
+
+OPEN_END = "9999-12-31"
+
+
+def create_app_tag_table(table="APP_TAG"):
+    create_sql = f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+      app_id   BIGINT   NOT NULL,
+      tag_id   INT      NOT NULL,
+      tag_rank SMALLINT NOT NULL,
+      PRIMARY KEY (app_id, tag_id),
+      KEY idx_tag_app (tag_id, app_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(create_sql)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def json_tags_select(source, alias, condition):
+    """source.user_tags(JSON 배열)를 (app_id, tag_id, tag_rank) 행으로 푸는 SELECT (MySQL 8 JSON_TABLE)"""
+    return f"""
+    SELECT {alias}.app_id, j.tag_id, MIN(j.tag_rank)
+      FROM {source} {alias},
+           JSON_TABLE({alias}.user_tags, '$[*]'
+                      COLUMNS (tag_rank FOR ORDINALITY, tag_id INT PATH '$')) j
+     WHERE {condition}
+       AND j.tag_id IS NOT NULL
+     GROUP BY {alias}.app_id, j.tag_id
+    """
+
+
+def refresh_app_tags_from_stage(cur, stage, table="APP_TAG"):
+    """
+    ScdMerger 트랜잭션 안에서 호출: 스테이징에서 새 버전이 생긴 app(action I/U)만 태그 교체
+    (같은 문장에서 TEMPORARY TABLE을 두 번 참조할 수 없어서 DELETE / INSERT 각각 한 번씩)
+    """
+    cur.execute(f"""
+    DELETE a FROM {table} a
+      JOIN {stage} s
+        ON s.app_id = a.app_id
+       AND s.action IN ('I', 'U')
+    """)
+    cur.execute(f"INSERT INTO {table} (app_id, tag_id, tag_rank)" + json_tags_select(
+        stage, "s", "s.action IN ('I', 'U') AND JSON_VALID(s.user_tags)"))
+    return cur.rowcount
+
+
+def drop_closed_app_tags(cur, titlelist="TITLELIST", table="APP_TAG", open_end=OPEN_END):
+    """활성 버전이 없어진 app(스냅샷에서 빠져 만료된 app)의 태그 행 삭제"""
+    cur.execute(f"""
+    DELETE a FROM {table} a
+      LEFT JOIN {titlelist} t
+        ON t.app_id = a.app_id
+       AND t.end_date = '{open_end}'
+     WHERE t.app_id IS NULL
+    """)
+    return cur.rowcount
+
+
+def rebuild_app_tag(titlelist="TITLELIST", table="APP_TAG", open_end=OPEN_END):
+    """TITLELIST 활성 행 전체에서 APP_TAG 재생성 (한 트랜잭션)"""
+    create_app_tag_table(table)
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DELETE FROM {table}")
+            cur.execute(f"INSERT INTO {table} (app_id, tag_id, tag_rank)" + json_tags_select(
+                titlelist, "t", f"t.end_date = '{open_end}' AND JSON_VALID(t.user_tags)"))
+            n = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"[APP_TAG] {table} 재생성: {n}행")
+    return n
+
+
+def tag_filter_sql(tag_ids, table="APP_TAG"):
+    """
+    선택한 태그를 모두 가진 app_id 목록 SELECT
+      - 태그 1개: 인덱스 (tag_id, app_id) range scan
+      - 여러 개: 같은 인덱스로 태그별 app을 모아 app_id별 개수 = 태그 수 (교집합)
+    반환: (sql, params)
+    """
+    tag_ids = [int(t) for t in dict.fromkeys(tag_ids)]
+    placeholders = ",".join(["%s"] * len(tag_ids))
+    if len(tag_ids) == 1:
+        return f"SELECT app_id FROM {table} WHERE tag_id = %s", tag_ids
+    sql = f"""
+    SELECT app_id
+      FROM {table}
+     WHERE tag_id IN ({placeholders})
+     GROUP BY app_id
+    HAVING COUNT(*) = {len(tag_ids)}
+    """
+    return sql, tag_ids
@@ -0,0 +1,99 @@
+# checkpoint_journal.py (대량 스캔용 append-only 체크포인트 저널)
+#
+# 기존 genre_action.py: partial_results.json 하나에 {appid: {...}} 전체를 들고 있다가
+#   100개마다 json.dump(indent=4)로 파일 전체를 다시 씀 => 진행될수록 저장 비용이 커짐 (~15만 앱)
+# 변경: SQLite 파일 하나에 처리 결과를 한 줄씩 INSERT만 함 (수정/전체 재작성 없음)
+#   - 기록 1건 = INSERT 1번, flush_every건마다 한 번에 commit (WAL 모드라 중간에 죽어도 파일은 안전)
+#   - 재개 시에는 key(appid) 인덱스만 읽어서 처리 완료 집합을 만듦 (payload는 필요한 것만 조회)
+#   - 기존 partial_results.json이 있으면 첫 실행 때 한 번 옮겨 담음
+#
+# 사용 예:
+#   journal = CheckpointJournal("genre_scan_journal.sqlite")
+#   done = journal.processed_keys()
+#   journal.append("570", {"result": "VP", "name": "Dota 2"})
+#   journal.close()
+
+import os
+import json
+import time
+import sqlite3
+
+
+class CheckpointJournal:
+    def __init__(self, path, flush_every=100):
+        self.path = path
+        self.flush_every = flush_every
+        self.buffer = []
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                key        TEXT PRIMARY KEY,
+                result     TEXT,
+                payload    TEXT,
+                written_at REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_journal_result ON journal(result)")
+        self.db.commit()
+
+    ########################################
+    # 재개용 조회
+    ########################################
+    def processed_keys(self):
+        """처리 완료된 key 집합 (인덱스만 읽음)"""
+        self.flush()
+        return {row[0] for row in self.db.execute("SELECT key FROM journal")}
+
+    def records(self, result=None):
+        """{key: payload dict}. result를 주면 해당 결과만 (예: 'VP')"""
+        self.flush()
+        if result is None:
+            rows = self.db.execute("SELECT key, payload FROM journal")
+        else:
+            rows = self.db.execute("SELECT key, payload FROM journal WHERE result=?", (result,))
+        return {key: json.loads(payload) for key, payload in rows}
+
+    def count(self):
+        self.flush()
+        return self.db.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+
+    ########################################
+    # 기록
+    ########################################
+    def append(self, key, record):
+        """record(dict) 1건 추가. 같은 key가 이미 있으면 무시 (append-only)"""
+        self.buffer.append((str(key), record.get("result"),
+                            json.dumps(record, ensure_ascii=False), time.time()))
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.db.executemany(
+            "INSERT OR IGNORE INTO journal (key, result, payload, written_at) VALUES (?, ?, ?, ?)",
+            self.buffer
+        )
+        self.db.commit()
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    ########################################
+    # 기존 JSON 체크포인트 이전
+    ########################################
+    def import_legacy_json(self, filename):
+        """예전 {key: {...}} 형식 JSON을 저널로 옮김. 저널이 비어 있을 때만 수행"""
+        if not os.path.exists(filename) or self.count() > 0:
+            return 0
+        with open(filename, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for key, record in data.items():
+            self.append(key, record)
+        self.flush()
+        print(f"[JOURNAL] '{filename}'에서 {len(data)}건을 '{self.path}'로 옮겼습니다.")
+        return len(data)
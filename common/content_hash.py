@@ -0,0 +1,161 @@
+# content_hash.py (TITLELIST 버전 내용 해시: 변경 감지용 64bit)
+#
+# 기존: app이 바뀌었는지 알려면 활성 TITLELIST 행을 읽어서 name / user_tags / price_us /
+#   releaseYear / userScore를 하나씩 비교. user_tags는 문자열 비교라 "[1,2]"와 "[1, 2]"도 다르다고 판단
+# 변경: 버전마다 정규화한 직렬화 문자열의 64bit 해시(content_hash BIGINT)를 저장 + 인덱스
+#   - 정규화: None -> '' / 0, user_tags는 JSON 정수 배열로 파싱 후 공백 없는 형태 ("[1,2]", 순서 유지 = 태그 순위)
+#            FLOAT는 소수 4자리 (FLOAT 컬럼에서 읽은 9.98999977 == 9.99)
+#   - 해시: blake2b 8바이트 -> signed BIGINT
+#   - 크롤러는 load_current_hashes()로 {app_id: hash}를 쿼리 한 번에 받아서
+#     skip_unchanged()로 바뀐 app만 SCD 머지로 넘김 (쓰기 작업 전에 걸러냄)
+
+import json
+import hashlib
+
+from common.db import get_connection
+
+HASH_COLUMN = "content_hash"
+SEP = "\x1f"
+
+
+def canonical_tags(user_tags):
+    """user_tags(JSON 문자열 또는 리스트) -> 공백 없는 정수 배열 JSON. 없거나 파싱 실패면 ''"""
+    if user_tags is None or user_tags == "":
+        return ""
+    tags = user_tags
+    if isinstance(tags, (str, bytes)):
+        try:
+            tags = json.loads(tags)
+        except ValueError:
+            return ""
+    if not isinstance(tags, list):
+        return ""
+    try:
+        return json.dumps([int(t) for t in tags], separators=(",", ":"))
+    except (TypeError, ValueError):
+        return json.dumps(tags, separators=(",", ":"), ensure_ascii=False)
+
+
+def _canonical_float(value):
+    return f"{round(float(value or 0.0), 4):.4f}"
+
+
+def canonical_row(name, user_tags, price_us, releaseYear, userScore):
+    return SEP.join([
+        "" if name is None else str(name),
+        canonical_tags(user_tags),
+        _canonical_float(price_us),
+        "" if releaseYear is None else str(releaseYear),
+        _canonical_float(userScore),
+    ])
+
+
+def content_hash(name, user_tags, price_us, releaseYear, userScore):
+    """정규화한 버전 내용의 64bit 해시 (MySQL BIGINT에 들어가도록 signed)"""
+    digest = hashlib.blake2b(canonical_row(name, user_tags, price_us, releaseYear, userScore).encode("utf-8"),
+                             digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def row_hash(row):
+    """dict(name, user_tags, price_us, releaseYear, userScore) -> content_hash"""
+    return content_hash(row.get("name"), row.get("user_tags"), row.get("price_us"),
+                        row.get("releaseYear"), row.get("userScore"))
+
+
+########################################
+# 조회 / 걸러내기
+########################################
+def load_current_hashes(table="TITLELIST_CURRENT"):
+    """{app_id: content_hash} (쿼리 1번)"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT app_id, {HASH_COLUMN} FROM {table}")
+            return {int(app_id): h for app_id, h in cur.fetchall() if h is not None}
+    finally:
+        conn.close()
+
+
+def skip_unchanged(rows, hashes):
+    """
+    rows(dict 리스트) 중 현재 해시와 다른 것만 반환 => (바뀐 rows, 건너뛴 수)
+    hashes는 머지 후 상태에 맞게 여기서 갱신 (같은 실행 안에서 다음 배치에도 사용)
+    """
+    changed, skipped = [], 0
+    for r in rows:
+        app_id = int(r["app_id"])
+        h = row_hash(r)
+        if hashes.get(app_id) == h:
+            skipped += 1
+            continue
+        hashes[app_id] = h
+        changed.append(r)
+    return changed, skipped
+
+
+########################################
+# 컬럼 추가 / 기존 행 채우기
+########################################
+def ensure_content_hash_column(table, index_columns):
+    """content_hash 컬럼 + 인덱스가 없으면 추가 (information_schema로 확인)"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+             WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+            """, (table, HASH_COLUMN))
+            if cur.fetchone()[0] == 0:
+                cur.execute(f"""
+                ALTER TABLE {table}
+                  ADD COLUMN {HASH_COLUMN} BIGINT NULL,
+                  ADD KEY idx_content_hash ({", ".join(index_columns)})
+                """)
+                print(f"[HASH] {table}.{HASH_COLUMN} 컬럼 추가")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def backfill_content_hash(table, key_columns, chunk_size=5000):
+    """content_hash가 NULL인 행을 chunk 단위로 계산해서 채움 (마지막 키 다음부터 이어 읽는 keyset 페이지)"""
+    keys = ", ".join(key_columns)
+    n_key = len(key_columns)
+    where_key = " AND ".join(f"{k} = %s" for k in key_columns)
+    after_key = f"AND ({keys}) > ({', '.join(['%s'] * n_key)})"
+    total = 0
+    last_key = None
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            while True:
+                cur.execute(f"""
+                SELECT {keys}, name, user_tags, price_us, releaseYear, userScore
+                  FROM {table}
+                 WHERE {HASH_COLUMN} IS NULL
+                   {after_key if last_key else ""}
+                 ORDER BY {keys}
+                 LIMIT {int(chunk_size)}
+                """, last_key)
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                updates = [(content_hash(*r[n_key:]),) + tuple(r[:n_key]) for r in rows]
+                cur.executemany(f"UPDATE {table} SET {HASH_COLUMN} = %s WHERE {where_key}", updates)
+                conn.commit()
+                total += len(rows)
+                last_key = tuple(rows[-1][:n_key])
+    finally:
+        conn.close()
+    if total:
+        print(f"[HASH] {table}: {total}행 content_hash 채움")
+    return total
+
+
+def migrate_content_hash():
+    """TITLELIST / TITLELIST_CURRENT에 content_hash 컬럼을 보장하고 비어 있는 행을 채움"""
+    ensure_content_hash_column("TITLELIST", ["app_id", "end_date", HASH_COLUMN])
+    ensure_content_hash_column("TITLELIST_CURRENT", [HASH_COLUMN])
+    backfill_content_hash("TITLELIST", ["app_id", "start_date"])
+    backfill_content_hash("TITLELIST_CURRENT", ["app_id"])
@@ -0,0 +1,265 @@
+# db.py (공용 MySQL 커넥션 풀)
+#
+# 기존: 모듈마다 get_connection()을 따로 두고, 호출할 때마다 load_dotenv() + pymysql.connect()
+#       => 행 하나 처리할 때마다 TCP + TLS + 인증 핸드셰이크
+# 변경:
+#   - .env 설정은 프로세스에서 한 번만 읽음
+#   - 크기 제한 있는 커넥션 풀 (DB_POOL_SIZE, 기본 8). 다 쓰고 있으면 DB_POOL_TIMEOUT초까지 대기
+#   - 꺼낼 때 health check: 일정 시간(DB_PING_INTERVAL) 이상 놀던 커넥션은 ping, 죽었으면 새로 연결
+#   - 쿼리별 실행 시간 집계 (print_db_stats), DB_SLOW_QUERY_MS 넘는 쿼리는 바로 출력
+#
+# 기존 코드 패턴 그대로 사용 가능:
+#   conn = get_connection()
+#   try:
+#       with conn.cursor() as cur:
+#           cur.execute(...)
+#       conn.commit()
+#   finally:
+#       conn.close()      # 실제로 끊지 않고 풀에 반납 (commit 안 된 작업은 rollback)
+#
+# pandas(read_sql / to_sql)를 쓰는 스크립트는 get_engine()으로 같은 설정의 SQLAlchemy 엔진 사용
+
+import os
+import re
+import time
+import queue
+import threading
+
+import pymysql
+from dotenv import load_dotenv
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_PING_INTERVAL = float(os.getenv("DB_PING_INTERVAL", 30))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 1000))
+
+_config_ref = [None]
+_config_lock = threading.Lock()
+
+def get_db_config():
+    """.env -> pymysql.connect 인자 (한 번만 읽음)"""
+    with _config_lock:
+        if _config_ref[0] is None:
+            load_dotenv()
+            _config_ref[0] = {
+                "host": os.getenv("host"),
+                "user": os.getenv("dbuser"),
+                "password": os.getenv("password"),
+                "database": os.getenv("name"),
+                "port": int(os.getenv("port", 3306)),
+                "charset": "utf8mb4",
+            }
+        return _config_ref[0]
+
+
+########################################
+# 쿼리 시간 집계
+########################################
+class QueryStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.by_query = {}  # 정규화된 SQL -> [횟수, 누적 초, 최대 초]
+
+    @staticmethod
+    def normalize(sql):
+        sql = re.sub(r"\s+", " ", str(sql)).strip()
+        sql = re.sub(r"\((\s*%s\s*,?)+\)", "(...)", sql)  # IN (%s,%s,...) 길이 차이 무시
+        return sql[:120]
+
+    def record(self, sql, elapsed):
+        key = self.normalize(sql)
+        with self.lock:
+            s = self.by_query.setdefault(key, [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += elapsed
+            s[2] = max(s[2], elapsed)
+        if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+            print(f"[DB][SLOW] {elapsed * 1000:.0f}ms :: {key}")
+
+    def print_top(self, n=15):
+        with self.lock:
+            rows = sorted(self.by_query.items(), key=lambda kv: kv[1][1], reverse=True)[:n]
+        for sql, (count, total, worst) in rows:
+            print(f"  {total:8.2f}s  {count:6d}회  avg {total / count * 1000:7.1f}ms  max {worst * 1000:7.1f}ms  {sql}")
+
+
+class TimedCursor:
+    """pymysql 커서 래퍼: execute/executemany 시간만 재고 나머지는 그대로 위임"""
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def execute(self, sql, args=None):
+        t0 = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, args)
+        finally:
+            self._stats.record(sql, time.perf_counter() - t0)
+
+    def executemany(self, sql, args):
+        t0 = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, args)
+        finally:
+            self._stats.record(sql, time.perf_counter() - t0)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+
+class PooledConnection:
+    """close()하면 풀에 반납되는 커넥션 래퍼"""
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._closed = False
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._raw.cursor(*args, **kwargs), self._pool.stats)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._pool.release(self._raw)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+########################################
+# 풀
+########################################
+class ConnectionPool:
+    def __init__(self, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, ping_interval=DB_PING_INTERVAL):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.idle = queue.LifoQueue()          # (raw, 마지막 사용 시각)
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.stats = QueryStats()
+        self.counts = {"created": 0, "reused": 0, "pinged": 0, "dropped": 0, "waited": 0}
+        self.lock = threading.Lock()
+
+    def _count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def _connect(self):
+        t0 = time.perf_counter()
+        raw = pymysql.connect(**get_db_config())
+        self.stats.record("-- connect", time.perf_counter() - t0)
+        self._count("created")
+        return raw
+
+    def _healthy(self, raw, idle_sec):
+        if not raw.open:
+            return False
+        if idle_sec < self.ping_interval:
+            return True
+        self._count("pinged")
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except pymysql.err.Error:
+            return False
+
+    def acquire(self):
+        if not self.slots.acquire(blocking=False):
+            self._count("waited")
+            if not self.slots.acquire(timeout=self.timeout):
+                raise TimeoutError(f"DB 커넥션 풀 대기 시간 초과 ({self.max_size}개 모두 사용 중)")
+        try:
+            while True:
+                try:
+                    raw, last_used = self.idle.get_nowait()
+                except queue.Empty:
+                    return PooledConnection(self, self._connect())
+                if self._healthy(raw, time.monotonic() - last_used):
+                    self._count("reused")
+                    return PooledConnection(self, raw)
+                self._discard(raw)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def _discard(self, raw):
+        self._count("dropped")
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def release(self, raw):
+        try:
+            if raw.open:
+                raw.rollback()  # commit 안 한 작업은 버림 (pymysql close와 같은 동작)
+                self.idle.put((raw, time.monotonic()))
+            else:
+                self._discard(raw)
+        except pymysql.err.Error:
+            self._discard(raw)
+        finally:
+            self.slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                raw, _ = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(raw)
+
+    def print_stats(self, n=15):
+        c = self.counts
+        print(f"[DB] 풀 {self.max_size}개: 새 연결 {c['created']} / 재사용 {c['reused']} "
+              f"/ ping {c['pinged']} / 폐기 {c['dropped']} / 대기 {c['waited']}")
+        self.stats.print_top(n)
+
+
+_pool_ref = [None]
+_pool_lock = threading.Lock()
+
+def get_pool():
+    with _pool_lock:
+        if _pool_ref[0] is None:
+            _pool_ref[0] = ConnectionPool()
+        return _pool_ref[0]
+
+def get_connection():
+    """풀에서 커넥션 하나 꺼냄. conn.close()로 반납"""
+    return get_pool().acquire()
+
+_engine_ref = [None]
+
+def get_engine():
+    """pandas용 SQLAlchemy 엔진 (같은 .env 설정, 풀 크기 / pre-ping 동일)"""
+    with _pool_lock:
+        if _engine_ref[0] is None:
+            from sqlalchemy import create_engine
+            from sqlalchemy.engine import URL
+            cfg = get_db_config()
+            url = URL.create("mysql+pymysql", username=cfg["user"], password=cfg["password"],
+                             host=cfg["host"], port=cfg["port"], database=cfg["database"],
+                             query={"charset": cfg["charset"]})
+            _engine_ref[0] = create_engine(url, pool_size=DB_POOL_SIZE, max_overflow=0,
+                                           pool_timeout=DB_POOL_TIMEOUT, pool_pre_ping=True)
+        return _engine_ref[0]
+
+def print_db_stats(n=15):
+    if _pool_ref[0] is not None:
+        _pool_ref[0].print_stats(n)
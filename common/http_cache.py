@@ -0,0 +1,319 @@
+# http_cache.py (appdetails / appreviews / storesearch 응답 디스크 캐시)
+#
+# genre_list.py, genre_action.py는 실행할 때마다 같은 엔드포인트를 처음부터 다시 호출함.
+# 여기서는 응답을 로컬 디스크에 저장해서 재실행 시 대부분 디스크에서 읽도록 한다.
+#   - 내용 주소(content-addressed) 저장: 응답 본문의 sha256을 파일명으로 blobs/ 에 저장
+#     (같은 본문은 한 번만 저장, 요청 키 -> blob 해시는 SQLite 인덱스에 기록)
+#   - 엔드포인트별 TTL (appdetails 7일, appreviews 1일, storesearch 1일 ...)
+#   - 엔드포인트별 cacheable(resp): 200이어도 실패 본문(null, appdetails {"<id>":{"success":false}} 등)은 저장 안 함
+#     (스로틀 / 일시 실패 응답이 TTL 동안 캐시에 박히지 않도록)
+#   - TTL 지난 항목은 ETag / Last-Modified로 조건부 재검증 (304면 본문 재사용)
+#     재검증이 네트워크 오류 / 429 / 5xx / 저장 불가 본문이면 오래된 캐시를 반환 (stale_on_error)
+#   - force_refresh=True면 캐시를 건너뛰고 새로 요청 (호출자 재시도용)
+#   - 전체 크기 상한 초과 시 마지막 접근 시간 기준 LRU 삭제
+#     (고유 blob 바이트 합계는 캐시를 열 때 한 번 집계하고 이후 저장 / 삭제 때 증감)
+#   - hit / miss / revalidated 통계 출력
+#   - 실제 네트워크 요청은 rate_limiter(엔드포인트 계열별 AIMD)를 거침
+#
+# 사용 예:
+#   from common.http_cache import cached_get, print_cache_stats
+#   resp = cached_get("https://store.steampowered.com/api/appdetails", params={"appids": 570})
+#   if resp.status_code == 200: data = resp.json()
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+import requests
+
+from common.rate_limiter import limited_get
+
+CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".steam_http_cache"))
+CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 2 * 1024 ** 3))  # 기본 2GB
+
+# URL에 포함된 문자열 -> TTL(초). 먼저 매칭되는 항목 사용
+ENDPOINT_TTLS = [
+    ("/api/appdetails", 7 * 24 * 3600),
+    ("/appreviews/", 24 * 3600),
+    ("/api/storesearch", 24 * 3600),
+    ("/ISteamApps/GetAppList", 24 * 3600),
+]
+DEFAULT_TTL = 24 * 3600
+
+
+def _json_body(resp):
+    try:
+        return json.loads(resp.content)
+    except ValueError:
+        return None
+
+
+def appdetails_cacheable(resp):
+    """{"<id>": {"success": true, "data": ...}} 인 응답만 (null / success false는 스로틀·일시 실패일 수 있음)"""
+    data = _json_body(resp)
+    return isinstance(data, dict) and bool(data) and all(
+        isinstance(v, dict) and v.get("success") is True for v in data.values())
+
+
+def appreviews_cacheable(resp):
+    data = _json_body(resp)
+    return isinstance(data, dict) and data.get("success") == 1
+
+
+def default_cacheable(resp):
+    """본문이 비었거나 JSON null이면 저장 안 함 (HTML 등 JSON이 아닌 본문은 저장)"""
+    content = resp.content.strip()
+    return bool(content) and content != b"null"
+
+
+# URL에 포함된 문자열 -> cacheable(resp) 판정 함수. 먼저 매칭되는 항목 사용, 없으면 default_cacheable
+ENDPOINT_CACHEABLE = [
+    ("/api/appdetails", appdetails_cacheable),
+    ("/appreviews/", appreviews_cacheable),
+]
+
+
+class CachedResponse:
+    """requests.Response에서 크롤러가 실제로 쓰는 부분만 흉내낸 객체"""
+    def __init__(self, status_code, content, headers=None, from_cache=False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+
+class HttpCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, ttls=None, session=None, cacheable=None):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttls = ttls or ENDPOINT_TTLS
+        self.cacheable = cacheable or ENDPOINT_CACHEABLE
+        self.session = session or requests.Session()
+        self.lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0, "revalidated": 0, "stale_on_error": 0, "evicted": 0, "uncacheable": 0}
+
+        self.db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                req_key       TEXT PRIMARY KEY,
+                url           TEXT,
+                blob_hash     TEXT,
+                size          INTEGER,
+                etag          TEXT,
+                last_modified TEXT,
+                fetched_at    REAL,
+                last_access   REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_blob ON entries(blob_hash)")
+        self.db.commit()
+        # 고유 blob 바이트 합계: 열 때 한 번만 집계하고 이후에는 저장 / 교체 / 삭제 때 증감
+        # (쓰기마다 SUM(...) GROUP BY blob_hash를 돌리면 캐시가 찰수록 쓰기가 느려짐)
+        self.total_bytes = self._total_size()
+
+    ########################################
+    # 내부 유틸
+    ########################################
+    def _ttl_for(self, url):
+        for pattern, ttl in self.ttls:
+            if pattern in url:
+                return ttl
+        return DEFAULT_TTL
+
+    def _is_cacheable(self, url, resp):
+        if resp.status_code != 200:
+            return False
+        for pattern, check in self.cacheable:
+            if pattern in url:
+                return check(resp)
+        return default_cacheable(resp)
+
+    @staticmethod
+    def _request_key(url, params):
+        full = url + ("?" + urlencode(sorted((params or {}).items())) if params else "")
+        return hashlib.sha256(full.encode("utf-8")).hexdigest(), full
+
+    def _blob_path(self, blob_hash):
+        return os.path.join(self.blob_dir, blob_hash[:2], blob_hash)
+
+    def _write_blob(self, content):
+        blob_hash = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(blob_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        return blob_hash
+
+    def _read_blob(self, blob_hash):
+        try:
+            with open(self._blob_path(blob_hash), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _total_size(self):
+        # 같은 blob을 여러 키가 공유할 수 있으므로 blob 단위로 합산
+        row = self.db.execute("SELECT SUM(size) FROM (SELECT blob_hash, MAX(size) AS size FROM entries GROUP BY blob_hash)").fetchone()
+        return row[0] or 0
+
+    def _blob_in_use(self, blob_hash):
+        return self.db.execute("SELECT 1 FROM entries WHERE blob_hash=? LIMIT 1", (blob_hash,)).fetchone() is not None
+
+    def _drop_blob_if_unused(self, blob_hash, size):
+        """더 이상 어떤 키도 가리키지 않는 blob이면 파일 삭제 + 합계 차감 (lock 안에서 호출)"""
+        if self._blob_in_use(blob_hash):
+            return
+        try:
+            os.remove(self._blob_path(blob_hash))
+        except FileNotFoundError:
+            pass
+        self.total_bytes -= size
+
+    def _evict_if_needed(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        rows = self.db.execute("SELECT req_key, blob_hash, size FROM entries ORDER BY last_access ASC").fetchall()
+        for req_key, blob_hash, size in rows:
+            if self.total_bytes <= self.max_bytes * 0.9:
+                break
+            self.db.execute("DELETE FROM entries WHERE req_key=?", (req_key,))
+            self._drop_blob_if_unused(blob_hash, size)
+            self.stats["evicted"] += 1
+        self.db.commit()
+
+    def _store(self, req_key, full_url, resp, now):
+        blob_hash = self._write_blob(resp.content)
+        with self.lock:
+            old = self.db.execute("SELECT blob_hash, size FROM entries WHERE req_key=?", (req_key,)).fetchone()
+            # 같은 본문을 이미 다른 키가 가리키고 있으면(중복 제거) 합계는 그대로
+            if not self._blob_in_use(blob_hash):
+                self.total_bytes += len(resp.content)
+            self.db.execute("""
+                INSERT OR REPLACE INTO entries
+                  (req_key, url, blob_hash, size, etag, last_modified, fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (req_key, full_url, blob_hash, len(resp.content),
+                  resp.headers.get("ETag"), resp.headers.get("Last-Modified"), now, now))
+            # 같은 키의 예전 본문이 다른 blob이었으면 아무도 안 가리킬 때 정리
+            if old and old[0] != blob_hash:
+                self._drop_blob_if_unused(old[0], old[1])
+            self.db.commit()
+            self._evict_if_needed()
+
+    ########################################
+    # GET
+    ########################################
+    def get(self, url, params=None, timeout=15, force_refresh=False, **kwargs):
+        """
+        캐시 우선 GET. 200이고 엔드포인트의 cacheable(resp)을 통과한 응답만 저장 (429/5xx/실패 본문은 저장 안 함).
+        force_refresh=True면 캐시를 읽지 않고 새로 요청 (결과가 저장 가능하면 캐시도 갱신).
+        """
+        req_key, full_url = self._request_key(url, params)
+        now = time.time()
+
+        row = None
+        if not force_refresh:
+            with self.lock:
+                row = self.db.execute(
+                    "SELECT blob_hash, etag, last_modified, fetched_at FROM entries WHERE req_key=?",
+                    (req_key,)
+                ).fetchone()
+
+        content = self._read_blob(row[0]) if row else None
+        if row and content is not None:
+            blob_hash, etag, last_modified, fetched_at = row
+            if now - fetched_at < self._ttl_for(url):
+                with self.lock:
+                    self.db.execute("UPDATE entries SET last_access=? WHERE req_key=?", (now, req_key))
+                    self.db.commit()
+                    self.stats["hit"] += 1
+                return CachedResponse(200, content, from_cache=True)
+
+            # TTL 만료 -> 조건부 재검증
+            headers = dict(kwargs.pop("headers", None) or {})
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            try:
+                resp = limited_get(self.session, url, params=params, headers=headers, timeout=timeout, **kwargs)
+            except requests.RequestException:
+                # 네트워크 오류 시 오래된 캐시라도 반환
+                with self.lock:
+                    self.stats["stale_on_error"] += 1
+                return CachedResponse(200, content, from_cache=True)
+
+            if resp.status_code == 304:
+                with self.lock:
+                    self.db.execute("UPDATE entries SET fetched_at=?, last_access=? WHERE req_key=?",
+                                    (now, now, req_key))
+                    self.db.commit()
+                    self.stats["revalidated"] += 1
+                return CachedResponse(200, content, from_cache=True)
+
+            # 429 / 5xx / 실패 본문도 네트워크 오류와 똑같이 오래된 캐시 반환 (캐시는 그대로 두고 다음에 다시 재검증)
+            if resp.status_code == 429 or resp.status_code >= 500 or (
+                    resp.status_code == 200 and not self._is_cacheable(url, resp)):
+                with self.lock:
+                    self.stats["stale_on_error"] += 1
+                return CachedResponse(200, content, from_cache=True)
+        else:
+            resp = limited_get(self.session, url, params=params, timeout=timeout, **kwargs)
+
+        with self.lock:
+            self.stats["miss"] += 1
+        if self._is_cacheable(url, resp):
+            self._store(req_key, full_url, resp, now)
+        elif resp.status_code == 200:
+            with self.lock:
+                self.stats["uncacheable"] += 1
+        return CachedResponse(resp.status_code, resp.content, resp.headers)
+
+    def print_stats(self):
+        s = self.stats
+        total = s["hit"] + s["miss"] + s["revalidated"] + s["stale_on_error"]
+        local = total - s["miss"]
+        ratio = (local / total * 100) if total else 0.0
+        print(f"[HTTP CACHE] 요청 {total}건 => hit {s['hit']} / revalidated(304) {s['revalidated']} "
+              f"/ miss {s['miss']} (저장 안 함 {s['uncacheable']}) / stale {s['stale_on_error']} / evicted {s['evicted']} "
+              f"=> 로컬 처리 {ratio:.1f}%, 디스크 {self.total_bytes / 1024 ** 2:.1f}MB")
+
+
+########################################
+# 모듈 기본 캐시 (스크립트에서 바로 사용)
+########################################
+_default_cache = [None]
+
+def get_default_cache():
+    if _default_cache[0] is None:
+        _default_cache[0] = HttpCache()
+    return _default_cache[0]
+
+def cached_get(url, params=None, **kwargs):
+    return get_default_cache().get(url, params=params, **kwargs)
+
+def print_cache_stats():
+    if _default_cache[0] is not None:
+        _default_cache[0].print_stats()
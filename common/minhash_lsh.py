@@ -0,0 +1,309 @@
+# minhash_lsh.py (카탈로그 규모 태그 유사도: MinHash 시그니처 + 밴드 LSH 후보 + 정확한 재채점)
+#
+# 기존: common.similarity.compute_topk는 all-pairs 정확 계산
+#   => Indie/MOBA 부분집합은 괜찮지만 GetAppList 카탈로그(15만 app, P/genre_action.py)면 N^2 칸
+# 변경:
+#   - app마다 태그 집합의 MinHash 시그니처 (num_perm개 uint32, h(x) = (a*x + b) mod (2^31 - 1)의 최솟값)
+#     두 시그니처에서 값이 같은 칸의 비율 ≈ 두 태그 집합의 Jaccard
+#   - 가중 MinHash: 재채점이 IDF x 순위 가중 코사인이라, 태그를 가중치에 비례한 개수(1 ~ weight_levels)의
+#     토큰으로 늘린 뒤 MinHash (weighted_tag_tokens) => 흔한 태그("Indie")는 1칸, 드문 앞순위 태그는 여러 칸
+#     => 충돌이 코사인을 좌우하는 드문 태그 겹침 위주로 일어남
+#     (합성 Zipf 카탈로그 2만 app / 태그 400개 / app당 5~20개 기준 recall@9:
+#      가중치 없음 32 x 4 => 이웃 52% / 점수 25%,  가중 8단계 64 x 3 => 이웃 93% / 점수 79%)
+#   - 시그니처를 bands x rows로 나눠 밴드마다 버킷 키 => 한 밴드라도 키가 같으면 후보 쌍
+#     (Jaccard 임계 ≈ (1/bands)^(1/rows), 기본 192칸 = 64 x 3 => 약 0.25)
+#     같은 키 버킷이 너무 크면(흔한 태그 조합) 정렬 순서로 max_bucket칸 안의 이웃끼리만 후보
+#   - 후보 쌍만 태그 행렬로 코사인을 정확히 다시 계산해서 app별 top-k
+#     (정렬 규칙은 exact 엔진과 같음: 점수 내림차순 / 동점은 app_id 오름차순)
+#     + "이웃의 이웃"(app당 k^2개)을 후보로 더해 다시 top-k (refine회, LSH가 놓친 Jaccard 낮은 이웃 보충)
+#   - 시그니처는 MINHASH_DIR에 .npy로 저장, 태그 지문(fingerprint)이 바뀐 app만 다시 계산
+#   - recall_report(): 샘플 app에 대해 exact 엔진 top-k와 비교한 recall
+#
+# 사용 예:
+#   store = MinHashStore.open()
+#   changed = store.update(app_ids, weighted_tag_tokens(tag_lists, vectors.tag_ids, vectors.idf)); store.save()
+#   pairs = LshIndex(store.signatures).candidate_pairs()
+#   topk = lsh_topk(matrix, pairs, k=9)          # (이웃 행 위치, 점수), common.similarity와 같은 모양
+
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+
+from common.similarity import (TOP_K, SCORE_DECIMALS, segment_topk, pack_topk, topk_for_rows,
+                               dense_transpose)
+from common.tag_vectors import rank_weight
+
+MINHASH_DIR = os.getenv("MINHASH_DIR", os.path.join(os.path.expanduser("~"), ".steam_minhash"))
+NUM_PERM = int(os.getenv("MINHASH_PERM", 192))
+LSH_BANDS = int(os.getenv("LSH_BANDS", 64))
+WEIGHT_LEVELS = int(os.getenv("MINHASH_WEIGHT_LEVELS", 8))   # 태그 하나가 가질 수 있는 최대 토큰 수 (0이면 가중치 없음)
+WEIGHT_SLOTS = 64      # 토큰 = 태그 * 64 + 복제 번호 (WEIGHT_LEVELS < 64)
+MAX_BUCKET = int(os.getenv("LSH_MAX_BUCKET", 200))
+LSH_REFINE = int(os.getenv("LSH_REFINE", 2))
+PRIME = (1 << 31) - 1
+EMPTY = PRIME          # 태그가 없는 app의 시그니처 값 (어떤 해시보다 큼)
+
+
+def _tag_int(tag):
+    """태그 id(정수)는 그대로, 이름(문자열)은 blake2b 4바이트"""
+    try:
+        return int(tag)
+    except (TypeError, ValueError):
+        return int.from_bytes(hashlib.blake2b(str(tag).encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def tag_fingerprint(tags):
+    """태그 집합(순서 / 중복 무시)의 64bit 지문 => 바뀐 app만 시그니처 재계산"""
+    canonical = ",".join(str(t) for t in sorted({_tag_int(t) for t in tags}))
+    return int.from_bytes(hashlib.blake2b(canonical.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+def _hash_params(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, num_perm, dtype=np.int64).astype(np.uint64)
+    b = rng.integers(0, PRIME, num_perm, dtype=np.int64).astype(np.uint64)
+    return a, b
+
+
+def minhash_signatures(tag_lists, num_perm=NUM_PERM, seed=1, chunk_apps=4096):
+    """태그 리스트들 -> (n x num_perm) uint32 시그니처 (chunk_apps개씩 벡터화, 중간 배열 nnz x num_perm)"""
+    a, b = _hash_params(num_perm, seed)
+    signatures = np.full((len(tag_lists), num_perm), EMPTY, dtype=np.uint32)
+    for start in range(0, len(tag_lists), chunk_apps):
+        chunk = [sorted({_tag_int(t) % PRIME for t in tags}) for tags in tag_lists[start:start + chunk_apps]]
+        lengths = np.asarray([len(tags) for tags in chunk])
+        if not lengths.sum():
+            continue
+        flat = np.fromiter((t for tags in chunk for t in tags), dtype=np.uint64, count=int(lengths.sum()))
+        hashed = (flat[:, None] * a + b) % PRIME                       # a, x < 2^31 => 곱 < 2^62
+        nonempty = np.flatnonzero(lengths)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+        signatures[start + nonempty] = np.minimum.reduceat(hashed, offsets, axis=0)
+    return signatures
+
+
+def weighted_tag_tokens(tag_lists, tag_ids, idf, levels=WEIGHT_LEVELS):
+    """
+    태그 리스트들 -> 가중 MinHash용 토큰 리스트들
+    태그마다 가중치 IDF x 순위 감쇠(common.tag_vectors와 같은 식)를 최댓값 대비 levels단계로 양자화해서
+    그 수(최소 1)만큼 토큰 (태그 * WEIGHT_SLOTS + 0..q-1). 사전에 없는 태그는 1개. levels=0이면 태그 그대로
+    (토큰 집합이 바뀌면 tag_fingerprint도 바뀜 => IDF가 움직여 단계가 바뀐 app만 시그니처 재계산)
+    """
+    if not levels:
+        return [list(tags) for tags in tag_lists]
+    if levels >= WEIGHT_SLOTS:
+        raise ValueError(f"levels({levels})는 {WEIGHT_SLOTS}보다 작아야 함")
+    idf_of = {int(t): float(w) for t, w in zip(tag_ids, idf)}
+    max_weight = max(idf_of.values(), default=1.0)    # 순위 0의 감쇠 = 1.0
+    tokens = []
+    for tags in tag_lists:
+        row = []
+        for rank, t in enumerate(dict.fromkeys(_tag_int(t) for t in tags)):
+            w = idf_of.get(t)
+            q = 1 if w is None else max(1, int(round(w * rank_weight(rank) / max_weight * levels)))
+            row.extend(t * WEIGHT_SLOTS + c for c in range(q))
+        tokens.append(row)
+    return tokens
+
+
+########################################
+# 시그니처 저장소 (디스크 .npy + 증분 갱신)
+########################################
+class MinHashStore:
+    FILES = ("app_ids", "fingerprints", "signatures")
+
+    def __init__(self, path=MINHASH_DIR, num_perm=NUM_PERM, seed=1):
+        self.path = path
+        self.num_perm = num_perm
+        self.seed = seed
+        self.app_ids = np.zeros(0, dtype=np.int64)
+        self.fingerprints = np.zeros(0, dtype=np.int64)
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+
+    @classmethod
+    def open(cls, path=MINHASH_DIR, num_perm=NUM_PERM, seed=1):
+        """저장된 시그니처를 읽음. 없거나 파라미터(num_perm / seed)가 다르면 빈 저장소"""
+        store = cls(path, num_perm, seed)
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return store
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("num_perm") != num_perm or meta.get("seed") != seed:
+            print(f"[MINHASH] 저장된 파라미터가 다름 {meta} => 전체 다시 계산")
+            return store
+        for name in cls.FILES:
+            setattr(store, name, np.load(os.path.join(path, f"{name}.npy")))
+        return store
+
+    def update(self, app_ids, tag_lists):
+        """
+        저장소를 app_ids 순서로 다시 맞추고, 새 app / 태그가 바뀐 app만 시그니처 계산
+        (app_ids에 없는 app은 빠짐) => 다시 계산한 행 위치 배열
+        """
+        t0 = time.perf_counter()
+        app_ids = np.asarray(app_ids, dtype=np.int64)
+        fingerprints = np.asarray([tag_fingerprint(tags) for tags in tag_lists], dtype=np.int64)
+        old_pos = {int(a): i for i, a in enumerate(self.app_ids)}
+        signatures = np.empty((len(app_ids), self.num_perm), dtype=np.uint32)
+        changed = []
+        for i, (app_id, fp) in enumerate(zip(app_ids, fingerprints)):
+            j = old_pos.get(int(app_id))
+            if j is not None and self.fingerprints[j] == fp:
+                signatures[i] = self.signatures[j]
+            else:
+                changed.append(i)
+        changed = np.asarray(changed, dtype=np.int64)
+        if len(changed):
+            signatures[changed] = minhash_signatures([tag_lists[i] for i in changed], self.num_perm, self.seed)
+        self.app_ids, self.fingerprints, self.signatures = app_ids, fingerprints, signatures
+        print(f"[MINHASH] {len(app_ids)}개 app 중 {len(changed)}개 시그니처 계산 ({time.perf_counter() - t0:.1f}초)")
+        return changed
+
+    def save(self):
+        """파일마다 임시 파일에 쓰고 os.replace (meta.json은 마지막에 => 중간에 죽으면 이전 저장본 유지)"""
+        os.makedirs(self.path, exist_ok=True)
+        for name in self.FILES:
+            target = os.path.join(self.path, f"{name}.npy")
+            with open(f"{target}.tmp", "wb") as f:
+                np.save(f, getattr(self, name))
+            os.replace(f"{target}.tmp", target)
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"num_perm": self.num_perm, "seed": self.seed, "n_apps": int(len(self.app_ids))}, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+
+########################################
+# 밴드 LSH
+########################################
+class LshIndex:
+    def __init__(self, signatures, bands=LSH_BANDS, seed=7):
+        n, num_perm = signatures.shape
+        if bands > num_perm:
+            raise ValueError(f"bands({bands})가 num_perm({num_perm})보다 큼")
+        self.n = n
+        self.bands = bands
+        self.rows_per_band = num_perm // bands      # 나머지 칸은 쓰지 않음
+        self.valid = np.flatnonzero((signatures != EMPTY).any(axis=1))   # 태그 없는 app 제외
+        multipliers = np.random.default_rng(seed).integers(1, 1 << 62, self.rows_per_band,
+                                                          dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        sig = signatures[self.valid].astype(np.uint64)
+        # 밴드마다 rows_per_band칸을 64bit 키 하나로 (곱셈 후 합, 2^64에서 wrap)
+        self.keys = [(sig[:, b * self.rows_per_band:(b + 1) * self.rows_per_band] * multipliers).sum(axis=1)
+                     for b in range(bands)]
+
+    def threshold(self):
+        """후보가 될 확률이 1/2쯤 되는 Jaccard 값"""
+        return (1.0 / self.bands) ** (1.0 / self.rows_per_band)
+
+    def candidate_pairs(self, max_bucket=MAX_BUCKET):
+        """모든 밴드에서 같은 버킷에 들어간 (i, j) 쌍 (i < j, 행 위치, 중복 제거)"""
+        t0 = time.perf_counter()
+        band_unique = []
+        for keys in self.keys:
+            order = np.lexsort((self.valid, keys))
+            sorted_keys, members = keys[order], self.valid[order]
+            same_run = np.r_[False, sorted_keys[1:] == sorted_keys[:-1]]
+            group = np.cumsum(~same_run)
+            run_len = np.bincount(group)
+            width = min(max_bucket, int(run_len.max()) if len(run_len) else 0)
+            # 정렬 순서에서 d칸 떨어진 두 원소가 같은 버킷이면 후보 (버킷이 커도 max_bucket칸까지만)
+            band_pairs = []
+            for d in range(1, width):
+                same = group[:-d] == group[d:]
+                i, j = members[:-d][same], members[d:][same]
+                band_pairs.append(np.minimum(i, j) * self.n + np.maximum(i, j))
+            # 밴드 안에서 먼저 중복 제거, 밴드 간 중복은 마지막에 한 번
+            if band_pairs:
+                band_unique.append(np.unique(np.concatenate(band_pairs)))
+        pairs = np.unique(np.concatenate(band_unique)) if band_unique else np.zeros(0, dtype=np.int64)
+        print(f"[LSH] {self.bands}밴드 x {self.rows_per_band}행 (Jaccard 임계 약 {self.threshold():.2f}): "
+              f"후보 {len(pairs)}쌍 (전체 쌍의 {len(pairs) / max(self.n * (self.n - 1) / 2, 1):.4%}, "
+              f"{time.perf_counter() - t0:.1f}초)")
+        return pairs // self.n, pairs % self.n
+
+
+########################################
+# 후보 재채점 / recall
+########################################
+def rescore_pairs(matrix, left, right, chunk_pairs=500_000):
+    """후보 쌍의 코사인 (행 L2 정규화된 태그 행렬의 행 내적, float64)"""
+    matrix = matrix.tocsr().astype(np.float64)
+    scores = np.empty(len(left), dtype=np.float64)
+    for start in range(0, len(left), chunk_pairs):
+        stop = start + chunk_pairs
+        scores[start:stop] = np.asarray(matrix[left[start:stop]].multiply(matrix[right[start:stop]])
+                                        .sum(axis=1)).ravel()
+    return np.round(scores, SCORE_DECIMALS)
+
+
+def _scored_candidates(matrix, left, right):
+    """(i, j) 쌍 재채점 -> 양방향 (행, 열, 점수) 후보 (점수 0 제외)"""
+    scores = rescore_pairs(matrix, left, right)
+    keep = scores > 0
+    left, right, scores = left[keep], right[keep], scores[keep]
+    return np.concatenate((left, right)), np.concatenate((right, left)), np.concatenate((scores, scores))
+
+
+def lsh_topk(matrix, pairs, k=TOP_K, refine=LSH_REFINE):
+    """
+    LSH 후보 쌍만 재채점해서 app별 top-k => (n x k) 이웃 행 위치(-1 = 없음), 점수
+    refine: 이웃의 이웃(k x k개)을 후보로 추가해서 다시 top-k 하는 횟수
+            (LSH가 놓친 Jaccard 낮은 이웃을 n * k^2 쌍 재채점으로 보충)
+    """
+    t0 = time.perf_counter()
+    n = matrix.shape[0]
+    best = segment_topk(*_scored_candidates(matrix, *pairs), k)
+    for _ in range(refine):
+        neighbors = pack_topk(*best, n, k)[0]
+        rows, cols = best[0], best[1]
+        # i -> j (i의 이웃) -> j의 이웃 l  =>  (i, l) 후보
+        second = neighbors[cols]
+        left = np.repeat(rows, k)
+        right = second.ravel()
+        keep = (right >= 0) & (right != left)
+        left, right = np.minimum(left[keep], right[keep]), np.maximum(left[keep], right[keep])
+        encoded = np.unique(left * n + right)
+        extra = _scored_candidates(matrix, encoded // n, encoded % n)
+        merged = [np.concatenate((a, b)) for a, b in zip(best, extra)]
+        # 이미 top-k에 있는 (행, 열)이 다시 들어오므로 중복 제거 후 top-k
+        _, first = np.unique(merged[0] * n + merged[1], return_index=True)
+        best = segment_topk(*(a[first] for a in merged), k)
+    topk = pack_topk(*best, n, k)
+    print(f"[LSH] 후보 {len(pairs[0])}쌍 재채점 + 이웃의 이웃 {refine}회 + top-{k}: {time.perf_counter() - t0:.1f}초")
+    return topk
+
+
+def recall_report(matrix, topk, sample=500, k=TOP_K, seed=0, block_rows=64):
+    """
+    샘플 app에 대해 exact 엔진(common.similarity.topk_for_rows) top-k와 비교
+    - neighbor recall: exact 이웃 중 LSH 결과에도 있는 비율
+    - score recall: 순위별 LSH 점수가 exact 점수 이상인 비율 (동점 이웃이 바뀐 경우도 맞은 것으로)
+    """
+    n = matrix.shape[0]
+    rows = np.sort(np.random.default_rng(seed).choice(n, min(sample, n), replace=False))
+    dense_t = dense_transpose(matrix)
+    exact_neighbors, exact_scores = [], []
+    for start in range(0, len(rows), block_rows):
+        block_neighbors, block_scores = topk_for_rows(matrix, rows[start:start + block_rows], k, dense_t=dense_t)
+        exact_neighbors.append(block_neighbors)
+        exact_scores.append(block_scores)
+    exact_neighbors, exact_scores = np.vstack(exact_neighbors), np.vstack(exact_scores)
+    lsh_neighbors, lsh_scores = topk[0][rows], topk[1][rows]
+
+    hits = total = 0
+    for exact_row, lsh_row in zip(exact_neighbors, lsh_neighbors):
+        expected = set(exact_row[exact_row >= 0].tolist())
+        hits += len(expected & set(lsh_row[lsh_row >= 0].tolist()))
+        total += len(expected)
+    valid = exact_neighbors >= 0
+    score_hits = int(((lsh_scores >= exact_scores - 10.0 ** -SCORE_DECIMALS) & valid).sum())
+    report = {"sample": len(rows), "neighbor_recall": hits / total if total else 1.0,
+              "score_recall": score_hits / valid.sum() if valid.sum() else 1.0}
+    print(f"[LSH] recall@{k} (샘플 {report['sample']}개 app): 이웃 일치 {report['neighbor_recall']:.1%} "
+          f"/ 점수 기준 {report['score_recall']:.1%}")
+    return report
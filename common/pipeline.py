@@ -0,0 +1,191 @@
+# pipeline.py (크기 제한 queue로 연결된 단계별 스트리밍 파이프라인)
+#
+# 기존 update_titlelist.py main(): Algolia 전체 크롤이 끝날 때까지 기다린 뒤
+#   태그 크롤 -> 태그 ID 변환 -> SCD 업서트를 app 하나씩 순서대로 처리
+# 여기서는 각 단계를 스레드 워커로 띄우고 단계 사이를 queue.Queue(maxsize)로 연결
+#   - 단계마다 워커 수(동시성)와 queue 크기(backpressure)를 따로 지정
+#   - batch_size를 주면 여러 건을 모아서 한 번에 처리 (DB 쓰기 등)
+#     batch_size개가 차거나, 첫 건을 담은 뒤 batch_timeout초가 지나거나, 입력이 끝나면 처리
+#     (입력 queue가 잠깐 비었다고 바로 처리하지 않음 => 앞 단계가 느려도 배치가 1건씩 쪼개지지 않음)
+#     실제 배치 크기(횟수 / 평균 / 최소 / 최대)는 요약에 출력
+#   - log_interval초마다 단계별 처리 건수 / 초당 처리량 / 입력 queue 대기 건수 출력
+#     => 어느 단계가 병목인지 확인 가능 (앞 단계 queue가 가득 차 있으면 그 단계가 느림)
+#
+# 사용 예:
+#   pipe = Pipeline("titlelist")
+#   pipe.add_stage("tags", fetch_fn, workers=8, queue_size=200)      # fn(item, emit)
+#   pipe.add_stage("writer", write_fn, batch_size=200)               # fn(items, emit)
+#   pipe.run(source_iterable)
+
+import time
+import queue
+import threading
+
+_DONE = object()  # 단계 종료 표시
+
+
+class Stage:
+    def __init__(self, name, fn, workers=1, queue_size=1000, batch_size=None, batch_timeout=1.0):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.in_queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.emitted = 0
+        self.failed = 0
+        self.busy_sec = 0.0
+        self.batch_sizes = []   # 실제로 처리한 배치 크기들 (batch_size가 있을 때만)
+
+    def _count(self, processed=0, emitted=0, failed=0, busy=0.0):
+        with self.lock:
+            self.processed += processed
+            self.emitted += emitted
+            self.failed += failed
+            self.busy_sec += busy
+
+
+class Pipeline:
+    def __init__(self, name="pipeline", log_interval=10.0):
+        self.name = name
+        self.log_interval = log_interval
+        self.stages = []
+        self.source_count = 0
+
+    def add_stage(self, name, fn, workers=1, queue_size=1000, batch_size=None, batch_timeout=1.0):
+        """
+        fn(item, emit)  또는 batch_size가 있으면 fn(items, emit)
+        emit(x)로 다음 단계에 넘김 (마지막 단계는 emit 결과를 버림)
+        """
+        self.stages.append(Stage(name, fn, workers, queue_size, batch_size, batch_timeout))
+        return self
+
+    ########################################
+    # 워커
+    ########################################
+    def _emit_fn(self, idx):
+        stage = self.stages[idx]
+        next_q = self.stages[idx + 1].in_queue if idx + 1 < len(self.stages) else None
+
+        def emit(x):
+            stage._count(emitted=1)
+            if next_q is not None:
+                next_q.put(x)  # 다음 단계 queue가 가득 차면 대기 (backpressure)
+        return emit
+
+    def _call(self, stage, payload, emit, n_items):
+        t0 = time.perf_counter()
+        try:
+            stage.fn(payload, emit)
+            stage._count(processed=n_items, busy=time.perf_counter() - t0)
+        except Exception as e:
+            stage._count(failed=n_items, busy=time.perf_counter() - t0)
+            print(f"[PIPE][{stage.name}] 처리 실패 ({n_items}건) => {e}")
+
+    def _worker(self, idx):
+        stage = self.stages[idx]
+        emit = self._emit_fn(idx)
+        if not stage.batch_size:
+            while True:
+                item = stage.in_queue.get()
+                if item is _DONE:
+                    return
+                self._call(stage, item, emit, 1)
+
+        batch = []
+        deadline = None  # 첫 건을 담은 시각 + batch_timeout
+        done = False
+        while not done:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = stage.in_queue.get(timeout=timeout)
+                if item is _DONE:
+                    done = True
+                else:
+                    if not batch:
+                        deadline = time.monotonic() + stage.batch_timeout
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (done or len(batch) >= stage.batch_size or time.monotonic() >= deadline):
+                with stage.lock:
+                    stage.batch_sizes.append(len(batch))
+                self._call(stage, batch, emit, len(batch))
+                batch = []
+                deadline = None
+
+    def _run_stage(self, idx):
+        stage = self.stages[idx]
+        threads = [threading.Thread(target=self._worker, args=(idx,), daemon=True,
+                                    name=f"{stage.name}-{i}")
+                   for i in range(stage.workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # 이 단계의 워커가 모두 끝나면 다음 단계 워커 수만큼 종료 표시 전달
+        if idx + 1 < len(self.stages):
+            nxt = self.stages[idx + 1]
+            for _ in range(nxt.workers):
+                nxt.in_queue.put(_DONE)
+
+    ########################################
+    # 로그
+    ########################################
+    def _log_line(self, prev, elapsed):
+        parts = [f"source {self.source_count}"]
+        for s in self.stages:
+            rate = (s.processed - prev.get(s.name, 0)) / elapsed if elapsed > 0 else 0.0
+            prev[s.name] = s.processed
+            parts.append(f"{s.name} {s.processed}건 {rate:.1f}/s q={s.in_queue.qsize()}/{s.in_queue.maxsize}")
+        print(f"[PIPE][{self.name}] " + " | ".join(parts))
+
+    def _monitor(self, stop):
+        prev = {}
+        last = time.perf_counter()
+        while not stop.wait(self.log_interval):
+            now = time.perf_counter()
+            self._log_line(prev, now - last)
+            last = now
+
+    def print_summary(self, elapsed):
+        print(f"[PIPE][{self.name}] 완료: {elapsed:.1f}초, source {self.source_count}건")
+        for s in self.stages:
+            rate = s.processed / elapsed if elapsed > 0 else 0.0
+            util = s.busy_sec / (elapsed * s.workers) * 100 if elapsed > 0 else 0.0
+            print(f"  - {s.name:<12} workers={s.workers:<2} 처리 {s.processed} / 출력 {s.emitted} "
+                  f"/ 실패 {s.failed}  {rate:.1f}건/s  워커 사용률 {util:.0f}%")
+            if s.batch_sizes:
+                print(f"    {'':<12} 배치 {len(s.batch_sizes)}회 (목표 {s.batch_size}) 평균 "
+                      f"{sum(s.batch_sizes) / len(s.batch_sizes):.1f}건, 최소 {min(s.batch_sizes)} / "
+                      f"최대 {max(s.batch_sizes)}")
+
+    ########################################
+    # 실행
+    ########################################
+    def run(self, source):
+        """source(iterable)의 item을 첫 단계에 넣고 모든 단계가 끝날 때까지 대기"""
+        t0 = time.perf_counter()
+        stop = threading.Event()
+        monitor = threading.Thread(target=self._monitor, args=(stop,), daemon=True)
+        monitor.start()
+
+        runners = [threading.Thread(target=self._run_stage, args=(i,), daemon=True)
+                   for i in range(len(self.stages))]
+        for r in runners:
+            r.start()
+
+        first = self.stages[0]
+        try:
+            for item in source:
+                first.in_queue.put(item)
+                self.source_count += 1
+        finally:
+            for _ in range(first.workers):
+                first.in_queue.put(_DONE)
+            for r in runners:
+                r.join()
+            stop.set()
+            self.print_summary(time.perf_counter() - t0)
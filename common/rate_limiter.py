@@ -0,0 +1,185 @@
+# rate_limiter.py (Steam 엔드포인트 계열별 429 적응형 속도 제한기)
+#
+# 기존: 429가 오면 고정 30초 sleep -> 1회 재시도 -> 포기,
+#       다른 스크립트는 time.sleep(0.5) / 1.0 / 1.5 하드코딩
+# 변경: 엔드포인트 계열(family)마다 토큰 버킷 1개 + AIMD
+#   - 성공할 때마다 초당 요청 수(rate)를 조금씩 올림 (additive increase)
+#   - 429를 받으면 rate를 곱으로 줄이고 (multiplicative decrease)
+#     Retry-After 헤더가 있으면 그 시간 동안 해당 계열 전체를 멈춤
+#   - 성공은 2xx/3xx만. 5xx는 서버가 힘들다는 신호라 rate만 줄임 (멈추지는 않음), 그 외 4xx는 그대로
+#   - 같은 계열을 쓰는 모든 스레드/코루틴이 하나의 버킷을 공유
+#   - get_rate_stats()/print_rate_stats()로 실제 달성한 requests/sec 확인
+#
+# 사용 예:
+#   from common.rate_limiter import limited_get, print_rate_stats
+#   resp = limited_get(session, "https://store.steampowered.com/api/appdetails", params={...})
+
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# family: (시작 rate, 최소 rate, 최대 rate)  단위: requests/sec
+FAMILY_DEFAULTS = {
+    "store_api":  (2.0, 0.1, 10.0),   # store.steampowered.com/api/* (appdetails, storesearch)
+    "appreviews": (4.0, 0.2, 20.0),   # store.steampowered.com/appreviews/*
+    "store_page": (2.0, 0.1, 10.0),   # store.steampowered.com/app/* HTML
+    "webapi":     (5.0, 0.5, 20.0),   # api.steampowered.com
+    "algolia":    (5.0, 0.5, 20.0),   # steamdb Algolia
+    "default":    (2.0, 0.1, 10.0),
+}
+
+
+def family_for_url(url):
+    if "algolia.net" in url:
+        return "algolia"
+    if "api.steampowered.com" in url:
+        return "webapi"
+    if "/appreviews/" in url:
+        return "appreviews"
+    if "store.steampowered.com/api/" in url:
+        return "store_api"
+    if "store.steampowered.com" in url:
+        return "store_page"
+    return "default"
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜) -> 초. 없거나 이상하면 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, name, rate=2.0, min_rate=0.1, max_rate=10.0,
+                 increase_step=0.05, decrease_factor=0.5, burst=1.0,
+                 default_backoff=30.0):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step      # 성공 1회당 rate 증가량
+        self.decrease_factor = decrease_factor  # 429 1회당 rate 배율
+        self.burst = burst
+        self.default_backoff = default_backoff  # Retry-After 없을 때 멈출 시간(초)
+        self.lock = threading.Lock()
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        # 통계
+        self.started = time.monotonic()
+        self.n_success = 0
+        self.n_throttled = 0
+        self.n_errors = 0
+
+    def reserve(self):
+        """토큰 1개 예약 -> 기다려야 할 시간(초) 반환 (sleep은 호출자가)"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            self.tokens -= 1.0
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.paused_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        with self.lock:
+            self.n_success += 1
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after=None):
+        with self.lock:
+            self.n_throttled += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            pause = retry_after if retry_after is not None else self.default_backoff
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            self.tokens = min(self.tokens, 0.0)
+        print(f"[RATE] {self.name}: 429 -> rate {self.rate:.2f}/s 로 감소, {pause:.1f}초 대기")
+
+    def on_server_error(self):
+        """5xx: 증가 없이 rate만 곱으로 줄임 (Retry-After 같은 대기 신호가 없으니 멈추지는 않음)"""
+        with self.lock:
+            self.n_errors += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            "family": self.name,
+            "current_rate": round(self.rate, 3),
+            "success": self.n_success,
+            "throttled": self.n_throttled,
+            "server_errors": self.n_errors,
+            "achieved_rps": round(self.n_success / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+
+
+########################################
+# 계열별 공유 limiter
+########################################
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(family):
+    with _limiters_lock:
+        if family not in _limiters:
+            rate, min_rate, max_rate = FAMILY_DEFAULTS.get(family, FAMILY_DEFAULTS["default"])
+            _limiters[family] = AdaptiveRateLimiter(family, rate, min_rate, max_rate)
+        return _limiters[family]
+
+def limited_request(session, method, url, max_retries=5, family=None, **kwargs):
+    """
+    limiter를 거쳐 요청. 429면 Retry-After/AIMD 반영 후 최대 max_retries번 재시도.
+    마지막까지 429면 그 응답을 그대로 반환 (호출자가 처리).
+    2xx/3xx만 성공으로 rate를 올리고, 5xx는 rate를 줄인 뒤 그대로 반환 (재시도는 호출자가).
+    """
+    session = session or requests
+    limiter = get_limiter(family or family_for_url(url))
+    resp = None
+    for _ in range(max_retries + 1):
+        limiter.acquire()
+        resp = session.request(method, url, **kwargs)
+        if resp.status_code == 429:
+            limiter.on_throttle(parse_retry_after(resp.headers.get("Retry-After")))
+            continue
+        if resp.status_code < 400:
+            limiter.on_success()
+        elif resp.status_code >= 500:
+            limiter.on_server_error()
+        return resp
+    return resp
+
+def limited_get(session, url, **kwargs):
+    return limited_request(session, "GET", url, **kwargs)
+
+def limited_post(session, url, **kwargs):
+    return limited_request(session, "POST", url, **kwargs)
+
+def get_rate_stats():
+    with _limiters_lock:
+        return {name: lim.stats() for name, lim in _limiters.items()}
+
+def print_rate_stats():
+    for s in get_rate_stats().values():
+        print(f"[RATE] {s['family']}: 달성 {s['achieved_rps']} req/s (현재 rate {s['current_rate']}/s, "
+              f"성공 {s['success']}, 429 {s['throttled']}, 5xx {s['server_errors']})")
@@ -0,0 +1,237 @@
+# scd_merge.py (스냅샷 단위 SCD Type 2 머지 - 집합 연산)
+#
+# 기존 upsert_titlelist_scd_version / upsert_scd_version:
+#   app 하나마다 커넥션 -> 활성 행 SELECT -> 5개 필드 파이썬 비교 -> UPDATE end_date -> INSERT -> commit
+#   => 전체 카탈로그(수만 app)면 왕복 수만~십만 번
+# 변경: 크롤 스냅샷 전체를 한 트랜잭션에서
+#   1) 임시 스테이징 테이블(대상 테이블과 같은 컬럼 타입)에 executemany로 적재
+#   2) 정규화한 row hash(SHA1)를 스테이징/활성 행 양쪽에 같은 식으로 계산해서 JOIN 한 번으로 분류
+#        I = 새 app / U = 값 변경 / S = 변경 없음
+#   3) UPDATE ... JOIN 한 번으로 U 행 만료, INSERT ... SELECT 한 번으로 I+U 새 버전 추가
+#   3-1) app_tag_table을 주면 새 버전이 생긴 app의 APP_TAG 행도 같은 트랜잭션에서 교체
+#        current_table을 주면 TITLELIST_CURRENT(활성 버전만)도 같은 트랜잭션에서 교체
+#   hash_column을 주면 user_tags를 정규화("[1,2]")해서 저장하고 content_hash(64bit)도 같이 기록,
+#   분류는 저장된 content_hash끼리 비교 (해시가 아직 없는 예전 행만 SHA1 식으로 비교)
+#   4) commit (중간에 실패하면 커넥션 반납 시 rollback => 반쯤 반영된 상태 없음)
+#   스테이징은 TEMPORARY TABLE이라 커넥션(세션) 단위 => 여러 머지가 동시에 돌아도 충돌 없음
+#
+# 사용 예:
+#   merger = ScdMerger()                                    # TITLELIST (start_date / end_date='9999-12-31')
+#   merger.merge([{"app_id": 570, "name": "Dota 2", ...}])  # {"staged": 1, "insert": 0, "update": 1, "same": 0, ...}
+
+import time
+from datetime import datetime, timedelta
+
+from common.db import get_connection
+from common.app_tag import refresh_app_tags_from_stage, drop_closed_app_tags
+from common.titlelist_current import refresh_current_from_stage, drop_closed_current
+from common.content_hash import canonical_tags, content_hash
+
+OPEN_END = "9999-12-31"
+TITLELIST_COLUMNS = ("name", "user_tags", "price_us", "releaseYear", "userScore")
+FLOAT_COLUMNS = ("price_us", "userScore")
+
+
+def normalize_value(column, value, float_columns=FLOAT_COLUMNS):
+    """비교 기준과 같은 규칙으로 값 정규화 (None -> '' / 0.0)"""
+    if column in float_columns:
+        return float(value or 0.0)
+    return "" if value is None else str(value)
+
+
+class ScdMerger:
+    def __init__(self, table="TITLELIST", columns=TITLELIST_COLUMNS, float_columns=FLOAT_COLUMNS,
+                 key="app_id", start_col="start_date", end_col="end_date", open_end=OPEN_END,
+                 end_gap_seconds=0, chunk_size=5000, conn_factory=get_connection, app_tag_table=None,
+                 current_table=None, hash_column=None):
+        """
+        open_end: 활성 행의 end 값. None이면 'end_col IS NULL'이 활성 (scd_titlelist.py의 valid_to)
+        end_gap_seconds: 만료 시 end = 새 start - N초 (scd_upsert.py는 1초 전으로 닫음)
+        app_tag_table: 태그 브리지 테이블 이름 (user_tags 컬럼이 있을 때만 의미 있음)
+        current_table: 활성 버전 테이블 이름 (TITLELIST 컬럼 구성일 때만)
+        hash_column: content_hash 컬럼 이름 (TITLELIST 컬럼 구성일 때만, common.content_hash 참고)
+        """
+        self.table = table
+        self.columns = tuple(columns)
+        self.float_columns = tuple(c for c in float_columns if c in self.columns)
+        self.key = key
+        self.start_col = start_col
+        self.end_col = end_col
+        self.open_end = open_end
+        self.end_gap_seconds = end_gap_seconds
+        self.chunk_size = chunk_size
+        self.conn_factory = conn_factory
+        self.app_tag_table = app_tag_table if "user_tags" in self.columns else None
+        self.current_table = current_table if self.columns == TITLELIST_COLUMNS else None
+        self.hash_column = hash_column if self.columns == TITLELIST_COLUMNS else None
+        # 스테이징 / INSERT에 쓰는 컬럼 (해시 컬럼 포함)
+        self.stage_columns = self.columns + ((self.hash_column,) if self.hash_column else ())
+        self.stage = f"TMP_SCD_{table}"
+
+    ########################################
+    # SQL 조각
+    ########################################
+    def _is_open(self, alias):
+        if self.open_end is None:
+            return f"{alias}.{self.end_col} IS NULL"
+        return f"{alias}.{self.end_col} = '{self.open_end}'"
+
+    def _open_value(self):
+        return "NULL" if self.open_end is None else f"'{self.open_end}'"
+
+    def _hash_expr(self, alias):
+        """정규화한 컬럼들을 구분자로 이어 붙인 SHA1 (FLOAT는 소수 4자리로 반올림해서 비교)"""
+        parts = []
+        for c in self.columns:
+            if c in self.float_columns:
+                parts.append(f"CAST(ROUND(IFNULL({alias}.{c}, 0), 4) AS CHAR)")
+            else:
+                parts.append(f"IFNULL({alias}.{c}, '')")
+        return f"UNHEX(SHA1(CONCAT_WS(CHAR(31), {', '.join(parts)})))"
+
+    ########################################
+    # 단계
+    ########################################
+    def _prepare_rows(self, rows):
+        """dict 또는 (key, *columns) 튜플 -> 정규화 튜플. 같은 key는 마지막 값만"""
+        latest = {}
+        for row in rows:
+            if isinstance(row, dict):
+                values = [row.get(c) for c in self.columns]
+                key_value = row[self.key]
+            else:
+                key_value, values = row[0], row[1:]
+            values = tuple(normalize_value(c, v, self.float_columns) for c, v in zip(self.columns, values))
+            if self.hash_column:
+                values = tuple(canonical_tags(v) if c == "user_tags" else v for c, v in zip(self.columns, values))
+                values += (content_hash(*values),)
+            latest[int(key_value)] = values
+        return [(k,) + v for k, v in latest.items()]
+
+    def _load_stage(self, cur, staged):
+        cols = ", ".join(self.stage_columns)
+        cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {self.stage}")
+        # 대상 테이블과 같은 컬럼 타입으로 복사 => FLOAT 반올림 등이 양쪽에서 똑같이 일어남
+        cur.execute(f"""
+        CREATE TEMPORARY TABLE {self.stage} AS
+        SELECT {self.key}, {cols} FROM {self.table} WHERE 1=0
+        """)
+        cur.execute(f"""
+        ALTER TABLE {self.stage}
+          ADD COLUMN row_hash BINARY(20),
+          ADD COLUMN action   CHAR(1),
+          ADD PRIMARY KEY ({self.key})
+        """)
+        placeholders = ", ".join(["%s"] * (len(self.stage_columns) + 1))
+        for i in range(0, len(staged), self.chunk_size):
+            cur.executemany(f"INSERT INTO {self.stage} ({self.key}, {cols}) VALUES ({placeholders})",
+                            staged[i:i + self.chunk_size])
+
+    def _classify(self, cur):
+        cur.execute(f"UPDATE {self.stage} s SET s.row_hash = {self._hash_expr('s')}")
+        same = f"{self._hash_expr('t')} = s.row_hash"
+        if self.hash_column:
+            h = self.hash_column
+            same = f"IF(t.{h} IS NULL, {same}, t.{h} = s.{h})"
+        cur.execute(f"""
+        UPDATE {self.stage} s
+          LEFT JOIN {self.table} t
+            ON t.{self.key} = s.{self.key}
+           AND {self._is_open('t')}
+           SET s.action = CASE
+                 WHEN t.{self.key} IS NULL THEN 'I'
+                 WHEN {same} THEN 'S'
+                 ELSE 'U'
+               END
+        """)
+        cur.execute(f"SELECT action, COUNT(*) FROM {self.stage} GROUP BY action")
+        return {action: n for action, n in cur.fetchall()}
+
+    def _expire_changed(self, cur, end_value):
+        cur.execute(f"""
+        UPDATE {self.table} t
+          JOIN {self.stage} s
+            ON s.{self.key} = t.{self.key}
+           AND s.action = 'U'
+           SET t.{self.end_col} = %s
+         WHERE {self._is_open('t')}
+        """, (end_value,))
+        return cur.rowcount
+
+    def _expire_missing(self, cur, end_value):
+        """스냅샷에 없는 app의 활성 행 만료 (전체 카탈로그 스냅샷일 때만)"""
+        cur.execute(f"""
+        UPDATE {self.table} t
+          LEFT JOIN {self.stage} s
+            ON s.{self.key} = t.{self.key}
+           SET t.{self.end_col} = %s
+         WHERE {self._is_open('t')}
+           AND s.{self.key} IS NULL
+        """, (end_value,))
+        return cur.rowcount
+
+    def _insert_versions(self, cur, start_date):
+        cols = ", ".join(self.stage_columns)
+        cur.execute(f"""
+        INSERT INTO {self.table}
+         ({self.key}, {cols}, {self.start_col}, {self.end_col})
+        SELECT {self.key}, {cols}, %s, {self._open_value()}
+          FROM {self.stage}
+         WHERE action IN ('I', 'U')
+        """, (start_date,))
+        return cur.rowcount
+
+    ########################################
+    # 실행
+    ########################################
+    def merge(self, rows, start_date=None, close_missing=False):
+        """
+        rows: dict({key, columns...}) 또는 (key, *columns) 튜플의 iterable
+        close_missing: True면 스냅샷에 없는 app의 활성 행도 만료 (부분 배치에서는 쓰지 말 것)
+        반환: {"staged", "insert", "update", "same", "closed", "sec"}
+        """
+        t0 = time.perf_counter()
+        staged = self._prepare_rows(rows)
+        stats = {"staged": len(staged), "insert": 0, "update": 0, "same": 0, "closed": 0, "sec": 0.0}
+        if not staged:
+            return stats
+        if not start_date:
+            start_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        end_value = start_date
+        if self.end_gap_seconds:
+            end_value = (datetime.strptime(str(start_date), "%Y-%m-%d %H:%M:%S")
+                         - timedelta(seconds=self.end_gap_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+
+        conn = self.conn_factory()
+        try:
+            with conn.cursor() as cur:
+                self._load_stage(cur, staged)
+                counts = self._classify(cur)
+                self._expire_changed(cur, end_value)
+                if close_missing:
+                    stats["closed"] = self._expire_missing(cur, end_value)
+                self._insert_versions(cur, start_date)
+                if self.app_tag_table:
+                    refresh_app_tags_from_stage(cur, self.stage, self.app_tag_table)
+                    if close_missing:
+                        drop_closed_app_tags(cur, self.table, self.app_tag_table, self.open_end)
+                if self.current_table:
+                    refresh_current_from_stage(cur, self.stage, start_date, self.current_table,
+                                               self.stage_columns)
+                    if close_missing:
+                        drop_closed_current(cur, self.table, self.current_table, self.open_end)
+                cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {self.stage}")
+            conn.commit()
+        finally:
+            conn.close()
+
+        stats["insert"] = counts.get("I", 0)
+        stats["update"] = counts.get("U", 0)
+        stats["same"] = counts.get("S", 0)
+        stats["sec"] = time.perf_counter() - t0
+        return stats
+
+
+def print_merge_stats(stats, label="TITLELIST"):
+    print(f"[SCD] {label}: 스테이징 {stats['staged']} => insert {stats['insert']} / update {stats['update']} "
+          f"/ 변경없음 {stats['same']} / 스냅샷에 없어 만료 {stats['closed']} ({stats['sec']:.2f}초)")
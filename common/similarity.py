@@ -0,0 +1,540 @@
+# similarity.py (태그 코사인 유사도: app당 벡터 1개 + 희소 행렬 + top-k 이웃 long 테이블)
+#
+# 기존 J/cosine_similarity.py:
+#   SIMILAR_GAMES 전체 행(같은 추천 app이 base game 수만큼 반복)을 그대로 MultiLabelBinarizer로 dense 벡터화
+#   -> N x N dense cosine_similarity -> 제목 하나당 컬럼 하나로 to_sql('similarity_matrix', replace)
+#   => 메모리 N^2, 게임 수천 개부터 MySQL 컬럼 수 제한(4096)에 걸림
+# 변경:
+#   - recommended_app_id 기준으로 중복 제거 => app_id당 태그 벡터 1개
+#   - 태그 벡터는 CSR 희소 행렬(float32, 행 L2 정규화) => 내적이 곧 코사인
+#   - 행 블록 단위로 X[block] · X^T (희소 곱)만 계산하고, 각 행에서 top-k만 남김
+#     동점은 neighbor app_id 오름차순 (점수는 소수 6자리로 반올림해서 비교 => 실행마다 같은 결과)
+#   - 전체 카탈로그(all-pairs)는 (행 블록 x 열 블록) 단위로 나눠서 스레드 / 프로세스 풀에서 계산
+#     태그 수가 적으면 X^T를 dense로 한 번 만들어 BLAS 행렬곱, 아니면 희소 곱
+#     블록 크기는 메모리 상한(SIM_MAX_RAM_MB)을 워커 수로 나눈 예산에서 역산, 진행률은 rows/sec로 출력
+#     열 블록마다 나온 후보는 행마다 k개만 남기며 병합 (행별 크기 k인 힙과 같은 역할)
+#   - 결과는 long 테이블 SIMILARITY_TOPK (app_id, neighbor_id, rank, score)
+#     + 대시보드용 MATRIX: base game(SIMILAR_GAMES.game_app_id)당 1행, 그 game의 크롤된 추천 app들과의 코사인
+#       (recommended_app_id_1~9 / recommended_title_1~9 / similarity_1~9, 점수 내림차순)
+#       => Y/addsteam.py가 선택한 게임의 game_app_id로 찾아서 추천 목록과 recommended_app_id로 merge
+#       base game 벡터: 추천 app 벡터에 있으면 그 행, 없으면 TITLELIST_CURRENT 태그를 같은 가중치로 벡터화
+#     {table}_NEW에 채운 뒤 RENAME TABLE로 한 번에 교체 (titlelist_current.py와 같은 방식)
+#
+# 사용 예:
+#   app_ids, titles, tag_lists = load_app_tags()
+#   matrix, vocab = build_tag_matrix(tag_lists)
+#   topk = compute_topk(matrix, k=9, workers=8, max_ram_mb=2048)    # (이웃 행 위치, 점수) 배열
+#   write_neighbors(neighbor_rows(app_ids, topk))
+#   recos = load_recommendations()
+#   base_ids, base_matrix, names = base_vectors(recos, app_ids, matrix, lambda tl: build_tag_matrix(tl, vocab)[0])
+#   write_matrix(recommendation_matrix_rows(recos, base_ids, base_matrix, names, app_ids, matrix, titles))
+
+import os
+import ast
+import json
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+import numpy as np
+from scipy import sparse
+
+from common.db import get_connection
+
+NEIGHBOR_TABLE = "SIMILARITY_TOPK"
+MATRIX_TABLE = "MATRIX"
+TOP_K = 9                # MATRIX 테이블의 recommended_app_id_1 ~ _9
+SCORE_DECIMALS = 6
+SIM_WORKERS = int(os.getenv("SIM_WORKERS", os.cpu_count() or 1))
+SIM_MAX_RAM_MB = float(os.getenv("SIM_MAX_RAM_MB", 2048))
+SIM_EXECUTOR = os.getenv("SIM_EXECUTOR", "thread")      # "thread" 또는 "process"
+DENSE_MAX_FEATURES = 2048   # 태그 수가 이 이하면 dense BLAS 행렬곱 (Steam 태그는 수백 개)
+MIN_BLOCK_ROWS = 64
+MAX_BLOCK_ROWS = 4096
+
+
+def parse_tags(tag_field):
+    """user_tags(JSON 배열 / 파이썬 리스트 문자열 / 리스트) -> 리스트. 파싱 실패면 []"""
+    if isinstance(tag_field, list):
+        return tag_field
+    if isinstance(tag_field, bytes):
+        tag_field = tag_field.decode("utf-8")
+    if not isinstance(tag_field, str) or not tag_field:
+        return []
+    try:
+        tags = json.loads(tag_field)
+    except ValueError:
+        try:
+            tags = ast.literal_eval(tag_field)
+        except (ValueError, SyntaxError):
+            return []
+    return tags if isinstance(tags, list) else []
+
+
+########################################
+# 1) 조회 (app_id당 1행)
+########################################
+def load_app_tags(table="SIMILAR_GAMES", app_ids=None, chunk_size=5000):
+    """
+    SIMILAR_GAMES -> (app_ids 오름차순, {app_id: 제목}, 태그 리스트들)
+    같은 추천 app이 여러 base game에 걸쳐 있으면 game_app_id가 가장 작은 행의 (비어 있지 않은) 태그 사용
+    app_ids를 주면 그 추천 app들만 조회 (IN 절을 chunk 단위로, SIMILAR_GAMES에 없는 app은 결과에서 빠짐)
+    """
+    query = f"""
+    SELECT recommended_app_id, recommended_title, user_tags
+      FROM {table}
+     WHERE recommended_app_id IS NOT NULL
+    """
+    rows = []
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            if app_ids is None:
+                cur.execute(query + " ORDER BY recommended_app_id, game_app_id")
+                rows = cur.fetchall()
+            else:
+                wanted = sorted({int(a) for a in app_ids})
+                for i in range(0, len(wanted), chunk_size):
+                    chunk = wanted[i:i + chunk_size]
+                    cur.execute(query + f" AND recommended_app_id IN ({', '.join(['%s'] * len(chunk))})"
+                                        " ORDER BY recommended_app_id, game_app_id", chunk)
+                    rows.extend(cur.fetchall())
+    finally:
+        conn.close()
+
+    titles, tags_by_app = {}, {}
+    for app_id, title, user_tags in rows:
+        app_id = int(app_id)
+        titles.setdefault(app_id, title)
+        if not tags_by_app.get(app_id):
+            tags_by_app[app_id] = parse_tags(user_tags)
+    app_ids = sorted(tags_by_app)
+    return np.asarray(app_ids, dtype=np.int64), titles, [tags_by_app[a] for a in app_ids]
+
+
+def load_current_tags(table="TITLELIST_CURRENT", app_ids=None, chunk_size=5000):
+    """카탈로그 전체(현재 버전) -> (app_ids 오름차순, {app_id: 이름}, 태그 리스트들). app_ids를 주면 그 app들만"""
+    query = f"SELECT app_id, name, user_tags FROM {table}"
+    rows = []
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            if app_ids is None:
+                cur.execute(query + " ORDER BY app_id")
+                rows = cur.fetchall()
+            else:
+                wanted = sorted({int(a) for a in app_ids})
+                for i in range(0, len(wanted), chunk_size):
+                    chunk = wanted[i:i + chunk_size]
+                    cur.execute(query + f" WHERE app_id IN ({', '.join(['%s'] * len(chunk))}) ORDER BY app_id",
+                                chunk)
+                    rows.extend(cur.fetchall())
+    finally:
+        conn.close()
+    app_ids = np.asarray([int(r[0]) for r in rows], dtype=np.int64)
+    return app_ids, {int(r[0]): r[1] for r in rows}, [parse_tags(r[2]) for r in rows]
+
+
+########################################
+# 2) 희소 태그 행렬
+########################################
+def build_vocab(tag_lists):
+    """태그 -> 열 번호 (정렬 순서 고정: 실행마다 같은 열 배치)"""
+    tags = {t for tags in tag_lists for t in tags}
+    return {t: j for j, t in enumerate(sorted(tags, key=str))}
+
+
+def l2_normalize_rows(matrix):
+    """CSR 행을 L2 정규화 (태그 없는 행은 0벡터 그대로)"""
+    matrix = matrix.tocsr().astype(np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags((1.0 / norms).astype(np.float32)).dot(matrix).tocsr()
+
+
+def build_tag_matrix(tag_lists, vocab=None):
+    """태그 리스트들 -> (행 L2 정규화된 float32 CSR (n_apps x n_tags), vocab). 한 app 안의 중복 태그는 1번만"""
+    vocab = vocab or build_vocab(tag_lists)
+    indptr, indices = [0], []
+    for tags in tag_lists:
+        cols = sorted({vocab[t] for t in tags if t in vocab})
+        indices.extend(cols)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sparse.csr_matrix((data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+                               shape=(len(tag_lists), len(vocab)))
+    return l2_normalize_rows(matrix), vocab
+
+
+########################################
+# 3) top-k (행 블록 x 열 블록, 병렬, 메모리 상한)
+########################################
+def segment_topk(rows, cols, scores, k):
+    """(행, 열, 점수) 후보 -> 행마다 점수 내림차순 / 동점은 열(app_id) 오름차순 k개만 남긴 후보"""
+    order = np.lexsort((cols, -scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    first = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+    rank = np.arange(len(rows)) - np.repeat(first, np.diff(np.r_[first, len(rows)]))
+    keep = rank < k
+    return rows[keep], cols[keep], scores[keep]
+
+
+def pack_topk(rows, cols, scores, n_rows, k):
+    """후보(이미 행별 k개 이하, 정렬됨) -> (n_rows x k) 이웃 행 위치(빈 칸 -1) / 점수(빈 칸 0)"""
+    neighbors = np.full((n_rows, k), -1, dtype=np.int64)
+    top_scores = np.zeros((n_rows, k), dtype=np.float32)
+    if len(rows):
+        first = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        rank = np.arange(len(rows)) - np.repeat(first, np.diff(np.r_[first, len(rows)]))
+        neighbors[rows, rank] = cols
+        top_scores[rows, rank] = scores
+    return neighbors, top_scores
+
+
+def _block_candidates(matrix, rows, col_start, col_stop, k, dense_t=None):
+    """
+    X[rows] · X[col_start:col_stop]^T 블록의 top-k 후보 (로컬 행, 전역 열, 점수)
+    dense_t가 있으면 (n_tags x n_apps float64) BLAS 행렬곱 + 행별 k번째 값 이상만, 없으면 희소 곱의 0 아닌 칸 전부
+    점수는 float64로 계산해서 소수 SCORE_DECIMALS자리 반올림 (블록 모양이 달라도 같은 점수 => 같은 순서)
+    """
+    left = matrix[rows].astype(np.float64)
+    if dense_t is not None:
+        block = left.toarray() @ dense_t[:, col_start:col_stop]
+        self_local = np.flatnonzero((rows >= col_start) & (rows < col_stop))
+        block[self_local, rows[self_local] - col_start] = 0.0
+        # 반올림 전 값으로 k번째 값을 구하고, 반올림하면 같아질 수 있는 값까지 여유를 두고 후보로
+        # (블록 전체를 반올림하지 않고 후보만 반올림)
+        width = col_stop - col_start
+        threshold = np.full(len(rows), 0.5 * 10.0 ** -SCORE_DECIMALS)
+        if width > k:
+            kth = np.partition(block, width - k, axis=1)[:, width - k]
+            threshold = np.maximum(kth - 10.0 ** -SCORE_DECIMALS, threshold)
+        local, cols = np.nonzero(block >= threshold[:, None])
+        scores = np.round(block[local, cols], SCORE_DECIMALS)
+        keep = scores > 0
+        return local[keep], cols[keep] + col_start, scores[keep]
+    product = (left @ matrix[col_start:col_stop].astype(np.float64).T).tocsr()
+    local = np.repeat(np.arange(len(rows)), np.diff(product.indptr))
+    cols = product.indices.astype(np.int64) + col_start
+    scores = np.round(product.data, SCORE_DECIMALS)
+    keep = (cols != rows[local]) & (scores > 0)
+    return local[keep], cols[keep], scores[keep]
+
+
+def topk_for_rows(matrix, rows, k=TOP_K, col_block=None, dense_t=None):
+    """
+    rows(행 위치 배열)의 top-k 이웃 => (len(rows) x k) 이웃 행 위치(-1 = 없음), 점수
+    열 블록마다 후보를 뽑아 지금까지의 후보와 합친 뒤 행마다 k개만 유지 (행별 크기 k로 제한된 병합)
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    n = matrix.shape[0]
+    col_block = col_block or n
+    best = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+    for col_start in range(0, n, col_block):
+        part = _block_candidates(matrix, rows, col_start, min(col_start + col_block, n), k, dense_t)
+        best = segment_topk(*(np.concatenate((a, b)) for a, b in zip(best, part)), k)
+    return pack_topk(*best, len(rows), k)
+
+
+def dense_transpose(matrix, max_ram_mb=SIM_MAX_RAM_MB):
+    """태그 수가 적고 메모리 상한의 절반 안에 들어가면 X^T를 dense float64로 (BLAS 행렬곱용), 아니면 None"""
+    n, n_tags = matrix.shape
+    if n_tags > DENSE_MAX_FEATURES or n * n_tags * 8 > max_ram_mb * 1024 ** 2 / 2:
+        return None
+    return np.ascontiguousarray(matrix.T.toarray(), dtype=np.float64)
+
+
+def plan_blocks(matrix, k=TOP_K, workers=SIM_WORKERS, max_ram_mb=SIM_MAX_RAM_MB, dense_t=None):
+    """
+    메모리 상한(MB)을 워커 수로 나눈 예산 안에 블록 하나(행 x 열 칸)가 들어가도록 (block_rows, col_block) 결정
+    - dense: 칸당 float64 점수 + partition 사본 + 마스크
+    - sparse: 앞쪽 최대 256행 샘플의 곱 결과 밀도로 칸 수 추정 (인덱스 / 정렬용 배열 포함)
+    """
+    n = matrix.shape[0]
+    budget = max_ram_mb * 1024 ** 2
+    if dense_t is not None:
+        budget -= dense_t.nbytes
+        density, cell_bytes = 1.0, 24
+    else:
+        sample = matrix[:min(n, 256)]
+        density = max((sample @ matrix.T).nnz / max(sample.shape[0] * n, 1), 1.0 / max(n, 1))
+        cell_bytes = 64
+    budget = max(budget, 0) / max(workers, 1) / 2           # 블록 모양 편차 대비 여유 2배
+    row_cost = n * density * cell_bytes
+    if budget >= MIN_BLOCK_ROWS * row_cost:
+        col_block = n
+        block_rows = int(budget // row_cost)
+    else:
+        block_rows = MIN_BLOCK_ROWS
+        col_block = max(k + 1, int(budget // (MIN_BLOCK_ROWS * density * cell_bytes)))
+    # 워커마다 여러 블록이 돌아가도록 (진행률 / 부하 분산)
+    block_rows = max(1, min(block_rows, MAX_BLOCK_ROWS, -(-n // max(workers * 4, 1))))
+    return block_rows, min(col_block, n)
+
+
+_shared_ref = [None]   # 워커(스레드 / fork된 프로세스)가 같이 보는 (matrix, dense_t)
+
+
+def _init_worker(matrix, dense_t):
+    _shared_ref[0] = (matrix, dense_t)
+
+
+def _topk_block(start, stop, k, col_block):
+    matrix, dense_t = _shared_ref[0]
+    return (start,) + topk_for_rows(matrix, np.arange(start, stop), k, col_block, dense_t)
+
+
+def compute_topk(matrix, k=TOP_K, workers=SIM_WORKERS, max_ram_mb=SIM_MAX_RAM_MB, executor=SIM_EXECUTOR,
+                 progress_sec=10.0, verbose=True):
+    """
+    전체 행의 top-k => (n x k) 이웃 행 위치(-1 = 없음), 점수
+    - 행 블록을 스레드 풀(executor="thread", BLAS / 희소 곱은 GIL 밖에서 돎) 또는
+      프로세스 풀(executor="process", fork로 행렬 공유)에 나눠서 계산
+    - max_ram_mb: 블록 곱 결과 + dense X^T가 쓰는 메모리 상한
+    - progress_sec마다 진행률 / rows/sec 출력
+    """
+    t0 = time.perf_counter()
+    n = matrix.shape[0]
+    matrix = matrix.tocsr()
+    dense_t = dense_transpose(matrix, max_ram_mb)
+    block_rows, col_block = plan_blocks(matrix, k, workers, max_ram_mb, dense_t)
+    if verbose:
+        print(f"[SIM] top-{k}: {n}개 app, {'dense BLAS' if dense_t is not None else 'sparse'} 곱, "
+              f"블록 {block_rows}행 x {col_block}열, 워커 {workers}개({executor}), 메모리 상한 {max_ram_mb:.0f}MB")
+
+    neighbors = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    tasks = [(start, min(start + block_rows, n), k, col_block) for start in range(0, n, block_rows)]
+    done, last_report = 0, time.perf_counter()
+
+    def collect(result):
+        nonlocal done, last_report
+        start, block_neighbors, block_scores = result
+        neighbors[start:start + len(block_neighbors)] = block_neighbors
+        scores[start:start + len(block_scores)] = block_scores
+        done += len(block_neighbors)
+        now = time.perf_counter()
+        if verbose and now - last_report >= progress_sec:
+            rate = done / (now - t0)
+            print(f"[SIM] {done}/{n} rows ({rate:.0f} rows/sec, 남은 시간 약 {(n - done) / rate:.0f}초)")
+            last_report = now
+
+    if workers <= 1:
+        _init_worker(matrix, dense_t)
+        for task in tasks:
+            collect(_topk_block(*task))
+    else:
+        if executor == "process":
+            context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods()
+                                                  else None)
+            pool = ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                       initargs=(matrix, dense_t))
+        else:
+            _init_worker(matrix, dense_t)
+            pool = ThreadPoolExecutor(workers)
+        with pool:
+            futures = [pool.submit(_topk_block, *task) for task in tasks]
+            for future in as_completed(futures):
+                collect(future.result())
+    _shared_ref[0] = None
+
+    if verbose:
+        elapsed = time.perf_counter() - t0
+        print(f"[SIM] top-{k} 완료: {n}개 app, {elapsed:.1f}초 ({n / elapsed if elapsed else 0:.0f} rows/sec)")
+    return neighbors, scores
+
+
+def neighbor_rows(app_ids, topk):
+    """(이웃 행 위치, 점수) -> (app_id, neighbor_id, rank(1부터), score) 튜플"""
+    neighbors, scores = topk
+    for i in range(len(neighbors)):
+        app_id = int(app_ids[i])
+        for rank, (j, score) in enumerate(zip(neighbors[i], scores[i]), start=1):
+            if j < 0:
+                break
+            yield app_id, int(app_ids[j]), rank, float(score)
+
+
+########################################
+# 3-1) 대시보드 MATRIX (base game x 크롤된 추천 목록)
+########################################
+def load_recommendations(table="SIMILAR_GAMES", game_app_ids=None, chunk_size=5000):
+    """SIMILAR_GAMES -> {game_app_id: [recommended_app_id 오름차순]}. game_app_ids를 주면 그 base game들만"""
+    query = f"""
+    SELECT game_app_id, recommended_app_id
+      FROM {table}
+     WHERE recommended_app_id IS NOT NULL
+    """
+    rows = []
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            if game_app_ids is None:
+                cur.execute(query + " ORDER BY game_app_id, recommended_app_id")
+                rows = cur.fetchall()
+            else:
+                wanted = sorted({int(a) for a in game_app_ids})
+                for i in range(0, len(wanted), chunk_size):
+                    chunk = wanted[i:i + chunk_size]
+                    cur.execute(query + f" AND game_app_id IN ({', '.join(['%s'] * len(chunk))})"
+                                        " ORDER BY game_app_id, recommended_app_id", chunk)
+                    rows.extend(cur.fetchall())
+    finally:
+        conn.close()
+    recos = {}
+    for game_app_id, recommended_app_id in rows:
+        recos.setdefault(int(game_app_id), []).append(int(recommended_app_id))
+    return recos
+
+
+def games_recommending(app_ids, table="SIMILAR_GAMES", chunk_size=5000):
+    """app_ids 중 하나라도 추천 목록에 가진 base game_app_id 집합 (증분 갱신 때 다시 채울 MATRIX 행)"""
+    wanted = sorted({int(a) for a in app_ids})
+    games = set()
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            for i in range(0, len(wanted), chunk_size):
+                chunk = wanted[i:i + chunk_size]
+                cur.execute(f"SELECT DISTINCT game_app_id FROM {table} "
+                            f"WHERE recommended_app_id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+                games.update(int(r[0]) for r in cur.fetchall())
+    finally:
+        conn.close()
+    return games
+
+
+def _positions(sorted_ids, wanted):
+    """오름차순 sorted_ids에서 wanted 각각의 위치 (없으면 -1)"""
+    sorted_ids = np.asarray(sorted_ids, dtype=np.int64)
+    wanted = np.atleast_1d(np.asarray(wanted, dtype=np.int64))
+    if not len(sorted_ids):
+        return np.full(len(wanted), -1, dtype=np.int64)
+    pos = np.minimum(np.searchsorted(sorted_ids, wanted), len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == wanted, pos, -1)
+
+
+def base_vectors(game_app_ids, app_ids, matrix, vectorize, table="TITLELIST_CURRENT"):
+    """
+    base game 벡터 => (base_ids 오름차순, base 행렬, {game_app_id: 이름})
+    추천 app 벡터(app_ids / matrix)에 이미 있는 game은 그 행을 쓰고, 없으면 {table}의 태그를
+    vectorize(태그 리스트들) -> 같은 열 공간의 행 L2 정규화 CSR 로 만듦 (어디에도 없으면 0벡터)
+    """
+    base_ids = np.asarray(sorted({int(g) for g in game_app_ids}), dtype=np.int64)
+    current_ids, names, current_tags = load_current_tags(table, app_ids=base_ids)
+    pos = _positions(app_ids, base_ids)
+    missing = np.flatnonzero(pos < 0)
+    current_pos = _positions(current_ids, base_ids[missing])
+    extra = vectorize([current_tags[j] if j >= 0 else [] for j in current_pos]).tocsr().astype(np.float32)
+
+    # 있는 행 + 새로 만든 행을 base_ids 순서로
+    stacked = sparse.vstack((matrix[pos[pos >= 0]], extra), format="csr")
+    order = np.empty(len(base_ids), dtype=np.int64)
+    order[np.flatnonzero(pos >= 0)] = np.arange(int((pos >= 0).sum()))
+    order[missing] = np.arange(len(missing)) + int((pos >= 0).sum())
+    return base_ids, stacked[order], names
+
+
+def recommendation_matrix_rows(recos, base_ids, base_matrix, names, app_ids, matrix, titles, k=TOP_K):
+    """
+    {game_app_id: [recommended_app_id ...]} -> MATRIX 행 (name, game_app_id, recommended_app_id_i, recommended_title_i, similarity_i ...)
+    similarity_i = cosine(base game 벡터, 추천 app 벡터), 점수 내림차순 / 동점은 app_id 오름차순 k개
+    벡터가 없는 추천 app은 0점, 남는 칸은 None
+    """
+    base_pos = _positions(base_ids, list(recos))
+    for game_app_id, b in zip(recos, base_pos):
+        reco_ids = np.asarray(recos[game_app_id], dtype=np.int64)
+        pos = _positions(app_ids, reco_ids)
+        scores = np.zeros(len(reco_ids), dtype=np.float32)
+        valid = np.flatnonzero(pos >= 0)
+        if b >= 0 and len(valid):
+            scores[valid] = (matrix[pos[valid]] @ base_matrix[b].T).toarray().ravel()
+        scores = np.round(scores, SCORE_DECIMALS)
+        row = [names.get(int(game_app_id)) or titles.get(int(game_app_id)), int(game_app_id)]
+        for j in np.lexsort((reco_ids, -scores))[:k]:
+            reco_id = int(reco_ids[j])
+            row += [reco_id, titles.get(reco_id), float(scores[j])]
+        row += [None] * (2 + 3 * k - len(row))
+        yield tuple(row)
+
+
+########################################
+# 4) 적재 (long 테이블)
+########################################
+def neighbor_table_sql(table=NEIGHBOR_TABLE):
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+      app_id      BIGINT   NOT NULL,
+      neighbor_id BIGINT   NOT NULL,
+      `rank`      SMALLINT NOT NULL,
+      score       FLOAT    NOT NULL,
+      PRIMARY KEY (app_id, `rank`),
+      KEY idx_neighbor (neighbor_id, app_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """
+
+
+def matrix_table_sql(table=MATRIX_TABLE, k=TOP_K):
+    """대시보드(Y/addsteam.py)가 읽는 MATRIX 모양: base game당 1행, 추천 app k개를 _1 ~ _k 컬럼으로"""
+    slots = ",\n".join(f"      recommended_app_id_{i} BIGINT,\n"
+                        f"      recommended_title_{i}  VARCHAR(255),\n"
+                        f"      similarity_{i}         FLOAT" for i in range(1, k + 1))
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+      name        VARCHAR(255),
+      game_app_id BIGINT NOT NULL,
+{slots},
+      PRIMARY KEY (game_app_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """
+
+
+def _replace_table(table, create_sql, columns, rows, chunk_size=5000):
+    """rows를 {table}_NEW에 chunk 단위로 채운 뒤 RENAME TABLE 한 번으로 교체 => 적재 행 수"""
+    new_table, old_table = f"{table}_NEW", f"{table}_OLD"
+    insert_sql = (f"INSERT INTO {new_table} ({', '.join(columns)}) "
+                  f"VALUES ({', '.join(['%s'] * len(columns))})")
+    n = 0
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(create_sql)
+            cur.execute(f"DROP TABLE IF EXISTS {new_table}")
+            cur.execute(f"DROP TABLE IF EXISTS {old_table}")
+            cur.execute(f"CREATE TABLE {new_table} LIKE {table}")
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    cur.executemany(insert_sql, chunk)
+                    n += len(chunk)
+                    chunk = []
+            if chunk:
+                cur.executemany(insert_sql, chunk)
+                n += len(chunk)
+            conn.commit()
+            cur.execute(f"RENAME TABLE {table} TO {old_table}, {new_table} TO {table}")
+            cur.execute(f"DROP TABLE {old_table}")
+    finally:
+        conn.close()
+    print(f"[SIM] {table} 교체: {n}행")
+    return n
+
+
+def write_neighbors(rows, table=NEIGHBOR_TABLE, chunk_size=5000):
+    """top-k long 행 전체로 {table} 교체"""
+    return _replace_table(table, neighbor_table_sql(table), ("app_id", "neighbor_id", "`rank`", "score"),
+                          rows, chunk_size)
+
+
+def matrix_columns(k=TOP_K):
+    """recommendation_matrix_rows() 튜플 순서와 같은 MATRIX 컬럼 이름들"""
+    columns = ["name", "game_app_id"]
+    for i in range(1, k + 1):
+        columns += [f"recommended_app_id_{i}", f"recommended_title_{i}", f"similarity_{i}"]
+    return columns
+
+
+def write_matrix(rows, table=MATRIX_TABLE, k=TOP_K, chunk_size=5000):
+    """recommendation_matrix_rows() 결과로 MATRIX 교체 (recommended_app_id_i / recommended_title_i / similarity_i)"""
+    return _replace_table(table, matrix_table_sql(table, k), matrix_columns(k), rows, chunk_size)
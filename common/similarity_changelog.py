@@ -0,0 +1,79 @@
+# similarity_changelog.py (태그 벡터가 바뀐 app 기록 => 증분 유사도 갱신의 입력)
+#
+# 기존: SIMILAR_GAMES.user_tags가 한 행만 바뀌어도 J/cosine_similarity.py로 전체 재계산 + 테이블 교체
+# 변경: 태그를 쓰는 쪽이 같은 트랜잭션에서 바뀐 app_id를 SIMILARITY_CHANGELOG에 한 줄씩 남기고,
+#       J/incremental_similarity.py가 쌓인 app만 읽어서 이웃 목록을 고친 뒤 처리한 id까지 지움
+#   - id AUTO_INCREMENT: 읽기 시작할 때의 MAX(id)까지만 처리 => 처리 중에 새로 쌓인 행은 다음 실행으로
+#   - 같은 app이 여러 번 기록돼도 됨 (읽을 때 DISTINCT), 태그가 실제로는 같아도 됨 (벡터 비교로 걸러짐)
+#   - 테이블 생성(DDL)은 암묵적 commit이라 트랜잭션 밖에서 create_changelog_table()로 먼저
+#
+# 사용 예:
+#   create_changelog_table()
+#   with conn.cursor() as cur:
+#       cur.execute("UPDATE SIMILAR_GAMES ...")
+#       log_app_changes(cur, [570, 730], source="SIMILAR_GAMES")
+#   conn.commit()
+#   max_id, app_ids = read_changelog()   ...   clear_changelog(max_id)
+
+from common.db import get_connection
+
+CHANGELOG_TABLE = "SIMILARITY_CHANGELOG"
+
+
+def changelog_table_sql(table=CHANGELOG_TABLE):
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+      id         BIGINT      NOT NULL AUTO_INCREMENT,
+      app_id     BIGINT      NOT NULL,
+      source     VARCHAR(64) NOT NULL,
+      created_at DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      PRIMARY KEY (id),
+      KEY idx_app (app_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """
+
+
+def create_changelog_table(table=CHANGELOG_TABLE):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(changelog_table_sql(table))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def log_app_changes(cur, app_ids, source, table=CHANGELOG_TABLE, chunk_size=5000):
+    """호출한 쪽 트랜잭션 안에서 app_id들을 기록 (commit은 호출한 쪽) => 기록 행 수"""
+    rows = [(int(a), source) for a in sorted({int(a) for a in app_ids})]
+    for i in range(0, len(rows), chunk_size):
+        cur.executemany(f"INSERT INTO {table} (app_id, source) VALUES (%s, %s)", rows[i:i + chunk_size])
+    return len(rows)
+
+
+def read_changelog(table=CHANGELOG_TABLE):
+    """지금까지 쌓인 기록 => (처리 기준 MAX(id), 고유 app_id 오름차순 리스트). 비어 있으면 (0, [])"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT MAX(id) FROM {table}")
+            max_id = cur.fetchone()[0] or 0
+            if not max_id:
+                return 0, []
+            cur.execute(f"SELECT DISTINCT app_id FROM {table} WHERE id <= %s ORDER BY app_id", (max_id,))
+            return int(max_id), [int(r[0]) for r in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def clear_changelog(max_id, table=CHANGELOG_TABLE):
+    """max_id까지 처리 완료 => 그 이하 기록 삭제"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DELETE FROM {table} WHERE id <= %s", (max_id,))
+            deleted = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return deleted
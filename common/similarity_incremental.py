@@ -0,0 +1,353 @@
+# similarity_incremental.py (태그가 바뀐 app만 다시 계산하는 top-k 유사도 증분 갱신)
+#
+# 기존: SIMILAR_GAMES 태그가 하나만 바뀌어도 J/cosine_similarity.py로 전체 all-pairs 재계산 + 테이블 교체
+# 변경: 마지막 계산 결과(태그 벡터 + top-k 이웃/점수)를 SIM_STATE_DIR에 .npy로 두고 (common.tag_vectors.TagVectors)
+#       태그 벡터가 바뀐 app 집합 C(common.similarity_changelog)만 보고 영향받는 행만 고침
+#   1) C의 각 행 c: X[c] · X^T 한 번 (태그 수가 적으면 dense BLAS, 아니면 희소 곱) => c 자신의 top-k (정확)
+#   2) 같은 곱의 열 방향 = 다른 모든 app a와 c의 새 점수 (코사인은 대칭)
+#      a의 목록에 c가 없었으면: 나머지 이웃 점수는 그대로이므로
+#        새 점수가 a의 k번째(점수 내림차순 / 동점은 열 오름차순)보다 앞서는 c만 기존 목록과 합쳐서 다시 k개
+#   3) a의 목록에 c가 있었으면: c 점수가 내려갔을 때 k+1번째를 모르므로 a 행 전체를 다시 계산
+#      (삭제된 app을 목록에 갖고 있던 행도 같은 처리)
+#   => 비용 ~ (|C| + C를 이웃으로 둔 app 수) x (행 하나 곱), 나머지는 O(N k) 배열 연산뿐
+#   - IDF는 마지막 전체 계산(cosine_similarity.py) 때 값으로 고정
+#     (df가 바뀌면 모든 벡터가 조금씩 바뀌어서 증분이 불가능) => 주기적으로 전체 계산해서 IDF 갱신
+#     처음 보는 태그도 다음 전체 계산 전까지는 무시됨
+#   - verify_topk(): 갱신된 벡터로 처음부터 다시 계산한 결과(전체 또는 샘플 행)와 비교
+#   - patch_tables(): 바뀐 행만 SIMILARITY_TOPK에서 DELETE + INSERT (한 트랜잭션)
+#   - patch_matrix(): 대시보드 MATRIX는 base game x 크롤된 추천 목록이라 top-k와 별개
+#     => 바뀐 app을 추천 목록에 가진 base game(+ 바뀐 app 자신이 base game인 경우) 행만 다시 채움
+#
+# 사용 예:
+#   state = load_state()
+#   change = apply_tag_changes(state, changed_ids, *load_app_tags(app_ids=changed_ids)[::2])
+#   neighbors, scores, touched, stats = incremental_topk(change["matrix"], change["neighbors"],
+#                                                        change["scores"], change["changed"], change["stale"])
+#   verify_topk(change["matrix"], (neighbors, scores), sample=500)
+
+import os
+import time
+
+import numpy as np
+from scipy import sparse
+
+from common.db import get_connection
+from common.similarity import (TOP_K, NEIGHBOR_TABLE, MATRIX_TABLE, SCORE_DECIMALS, SIM_WORKERS, SIM_MAX_RAM_MB,
+                               segment_topk, pack_topk, topk_for_rows, compute_topk, dense_transpose, neighbor_rows,
+                               neighbor_table_sql, matrix_table_sql, matrix_columns)
+from common.tag_vectors import TagVectors, weighted_matrix
+
+SIM_STATE_DIR = os.getenv("SIM_STATE_DIR", os.path.join(os.path.expanduser("~"), ".steam_similarity_state"))
+INCR_BLOCK_ROWS = int(os.getenv("INCR_BLOCK_ROWS", 128))   # 곱 한 번에 넣는 행 수 (행당 N칸 결과)
+VERIFY_TOL = 10.0 ** -SCORE_DECIMALS
+
+
+########################################
+# 1) 상태 (마지막 계산의 벡터 + top-k)
+########################################
+def save_state(app_ids, matrix, tag_ids, idf, topk, source="SIMILAR_GAMES", path=SIM_STATE_DIR):
+    """전체 계산 / 증분 갱신 결과 저장 (TagVectors 저장소 + extra_neighbors / extra_scores)"""
+    neighbors, scores = topk
+    state = TagVectors(np.asarray(app_ids, dtype=np.int64), matrix, tag_ids, idf,
+                       meta={"source": source, "k": int(neighbors.shape[1])},
+                       extras={"neighbors": np.asarray(neighbors, dtype=np.int64),
+                               "scores": np.asarray(scores, dtype=np.float32)})
+    state.save(path)
+    return state
+
+
+def load_state(path=SIM_STATE_DIR):
+    """저장된 상태 (메모리 매핑). 없거나 top-k가 없으면 None => 전체 계산부터"""
+    state = TagVectors.load(path)
+    if state is None or "neighbors" not in state.extras:
+        return None
+    return state
+
+
+def _same_row(a, i, b, j):
+    """CSR a의 i행과 b의 j행이 같은 벡터인지"""
+    a_start, a_stop = a.indptr[i], a.indptr[i + 1]
+    b_start, b_stop = b.indptr[j], b.indptr[j + 1]
+    return (np.array_equal(a.indices[a_start:a_stop], b.indices[b_start:b_stop])
+            and np.array_equal(a.data[a_start:a_stop], b.data[b_start:b_stop]))
+
+
+def apply_tag_changes(state, changed_ids, found_ids, tag_lists):
+    """
+    changed_ids: 바뀌었다고 기록된 app_id들
+    found_ids / tag_lists: 그중 원본 테이블에 아직 있는 app과 새 태그 (load_app_tags(app_ids=...)의 0번 / 2번)
+    => 새 행 순서(app_id 오름차순)의 {"app_ids", "matrix", "neighbors", "scores",
+                                     "changed": 벡터가 실제로 바뀐/새로 생긴 행 위치,
+                                     "stale": 삭제된 app을 이웃으로 갖고 있던 행 위치,
+                                     "removed": 원본에서 사라진 app_id}
+    벡터는 상태에 저장된 tag_ids / idf로 만듦 (IDF 고정)
+    """
+    old_ids = np.asarray(state.app_ids, dtype=np.int64)
+    found_ids = np.asarray(found_ids, dtype=np.int64)
+    changed_ids = np.unique(np.asarray(list(changed_ids), dtype=np.int64))
+    new_rows = weighted_matrix(tag_lists, state.tag_ids, state.idf)
+
+    # 벡터가 실제로 달라진 app만 (태그 기록은 됐지만 결과가 같은 경우 제외)
+    old_pos = np.searchsorted(old_ids, found_ids)
+    differs = np.ones(len(found_ids), dtype=bool)
+    for i, pos in enumerate(old_pos):
+        if pos < len(old_ids) and old_ids[pos] == found_ids[i]:
+            differs[i] = not _same_row(state.matrix, pos, new_rows, i)
+    removed = np.setdiff1d(np.intersect1d(changed_ids, old_ids), found_ids)
+    found_ids, new_rows = found_ids[differs], new_rows[np.flatnonzero(differs)]
+
+    # 행 재배치: 남는 예전 행 + 바뀐 행을 app_id 오름차순으로 (동점 순서 = app_id 순서 유지)
+    keep = ~np.isin(old_ids, removed) & ~np.isin(old_ids, found_ids)
+    ids = np.concatenate((old_ids[keep], found_ids))
+    order = np.argsort(ids, kind="stable")
+    app_ids = ids[order]
+    matrix = sparse.vstack((state.matrix[np.flatnonzero(keep)], new_rows), format="csr")[order]
+    matrix = matrix.astype(np.float32)
+
+    # 예전 이웃 목록(예전 행 위치)을 새 행 위치로 변환, 삭제된 이웃은 -1
+    old_neighbors = np.asarray(state.extras["neighbors"])
+    old_scores = np.asarray(state.extras["scores"])
+    k = old_neighbors.shape[1]
+    survives = ~np.isin(old_ids, removed)
+    new_pos = np.where(survives, np.searchsorted(app_ids, old_ids), -1)
+    listed = old_neighbors >= 0
+    mapped = np.where(listed, new_pos[np.maximum(old_neighbors, 0)], -1)
+
+    neighbors = np.full((len(app_ids), k), -1, dtype=np.int64)
+    scores = np.zeros((len(app_ids), k), dtype=np.float32)
+    neighbors[new_pos[survives]] = mapped[survives]
+    scores[new_pos[survives]] = old_scores[survives]
+    lost = (listed & (mapped < 0)).any(axis=1) & survives
+    return {"app_ids": app_ids, "matrix": matrix, "neighbors": neighbors, "scores": scores,
+            "changed": np.searchsorted(app_ids, found_ids), "stale": new_pos[lost], "removed": removed}
+
+
+########################################
+# 2) 증분 top-k
+########################################
+def _row_candidates(left, matrix_t, rows, dense_t=None):
+    """
+    X[rows] · X^T 블록 (float64, 점수 SCORE_DECIMALS자리 반올림)
+    dense_t가 있으면 BLAS 행렬곱으로 (len(rows) x N) dense 배열 (자기 자신은 0), 없으면 희소 곱 CSR
+    """
+    if dense_t is not None:
+        block = left[rows].toarray() @ dense_t
+        block[np.arange(len(rows)), rows] = 0.0
+        return np.round(block, SCORE_DECIMALS)
+    product = (left[rows] @ matrix_t).tocsr()
+    product.data = np.round(product.data, SCORE_DECIMALS)
+    return product
+
+
+def _changed_block(block, rows, k, kth_score, kth_col, exact):
+    """
+    바뀐 행 블록의 곱 => (자기 top-k 후보, 다른 행에 새로 들어갈 후보) 둘 다 (행 위치, 열, 점수)
+    새 후보: score(a, c) = score(c, a)이므로 열 a 입장에서 a의 k번째보다 앞서는 c만 (exact 행 제외)
+    """
+    if sparse.issparse(block):
+        local = np.repeat(np.arange(len(rows)), np.diff(block.indptr))
+        cols = block.indices.astype(np.int64)
+        scores = block.data
+        keep = (cols != rows[local]) & (scores > 0)
+        local, cols, scores = local[keep], cols[keep], scores[keep]
+    else:
+        # 행마다 k번째 값 이상만 자기 후보로 (동점 포함), 나머지는 새 후보 조건만 검사
+        n = block.shape[1]
+        kth = np.partition(block, n - k, axis=1)[:, n - k] if n > k else np.zeros(len(rows))
+        local, cols = np.nonzero((block >= kth[:, None]) & (block > 0))
+        own = segment_topk(rows[local], cols.astype(np.int64), block[local, cols], k)
+        c = rows[:, None]
+        beats = (block > kth_score) | ((block == kth_score) & (c < kth_col))
+        local, a = np.nonzero(beats & (block > 0) & ~exact)
+        return own, (a.astype(np.int64), rows[local], block[local, a])
+    own = segment_topk(rows[local], cols, scores, k)
+    a, c = cols, rows[local]
+    beats = (scores > kth_score[a]) | ((scores == kth_score[a]) & (c < kth_col[a]))
+    keep = beats & ~exact[a]
+    return own, (a[keep], c[keep], scores[keep])
+
+
+def _place(neighbors, scores, rows, candidates, k):
+    """segment_topk 결과(행 위치 기준)를 rows 행에 덮어쓰기 (rows는 정렬된 고유 행 위치)"""
+    r, c, s = candidates
+    block_neighbors, block_scores = pack_topk(np.searchsorted(rows, r), c, s, len(rows), k)
+    neighbors[rows] = block_neighbors
+    scores[rows] = block_scores
+
+
+def incremental_topk(matrix, neighbors, scores, changed, stale=(), k=TOP_K, block_rows=INCR_BLOCK_ROWS,
+                     max_ram_mb=SIM_MAX_RAM_MB, verbose=True):
+    """
+    matrix: 바뀐 행이 반영된 태그 행렬, neighbors / scores: 같은 행 위치 기준의 예전 top-k
+    changed: 벡터가 바뀐 행 위치, stale: 이웃 목록이 깨진 행 위치 (삭제된 이웃 등, 전체 재계산)
+    태그 수가 적으면 compute_topk처럼 dense X^T 한 번 + BLAS 행렬곱 (max_ram_mb 안에서), 아니면 희소 곱
+    => (neighbors, scores, 목록이 바뀐 행 위치, 통계 dict)
+    """
+    t0 = time.perf_counter()
+    n = matrix.shape[0]
+    matrix = matrix.tocsr()
+    neighbors = np.array(neighbors, dtype=np.int64)
+    scores = np.array(scores, dtype=np.float32)
+    # 저장된 float32 점수 -> 계산할 때와 같은 소수 6자리 float64 값 (병합 때 새 점수와 같은 기준으로 비교)
+    exact_scores = np.round(scores.astype(np.float64), SCORE_DECIMALS)
+    changed = np.unique(np.asarray(changed, dtype=np.int64))
+    stats = {"changed": len(changed), "dirty": 0, "merged": 0, "sec": 0.0}
+    if n == 0 or (not len(changed) and not len(stale)):
+        return neighbors, scores, np.zeros(0, dtype=np.int64), stats
+
+    is_changed = np.zeros(n, dtype=bool)
+    is_changed[changed] = True
+    listed = neighbors >= 0
+    # 3) 바뀐 app을 이웃으로 갖고 있던 행 + 깨진 행 => 전체 재계산
+    lists_changed = (listed & is_changed[np.maximum(neighbors, 0)]).any(axis=1)
+    dirty = np.union1d(np.flatnonzero(lists_changed), np.asarray(stale, dtype=np.int64))
+    dirty = np.setdiff1d(dirty, changed)
+    exact = is_changed.copy()
+    exact[dirty] = True
+
+    # 2)의 기준: 각 행의 k번째 (칸이 덜 찼으면 양수 점수는 전부 들어감)
+    full = listed[:, k - 1]
+    kth_score = np.where(full, exact_scores[:, k - 1], -np.inf)
+    kth_col = np.where(full, neighbors[:, k - 1], n)
+
+    left = matrix.astype(np.float64)
+    dense_t = dense_transpose(matrix, max_ram_mb)
+    matrix_t = left.T.tocsr() if dense_t is None else None
+    own = []
+    inserts = []
+    for start in range(0, len(changed), block_rows):
+        rows = changed[start:start + block_rows]
+        # 1) 바뀐 행 자신의 top-k + 2) 다른 행에 새로 들어갈 후보
+        block_own, block_inserts = _changed_block(_row_candidates(left, matrix_t, rows, dense_t), rows, k,
+                                                  kth_score, kth_col, exact)
+        own.append(block_own)
+        inserts.append(block_inserts)
+    if len(changed):
+        _place(neighbors, scores, changed, tuple(np.concatenate(parts) for parts in zip(*own)), k)
+
+    for start in range(0, len(dirty), block_rows):
+        rows = dirty[start:start + block_rows]
+        neighbors[rows], scores[rows] = topk_for_rows(matrix, rows, k, dense_t=dense_t)
+
+    merged = np.zeros(0, dtype=np.int64)
+    if inserts:
+        a, c, s = (np.concatenate(parts) for parts in zip(*inserts))
+        merged = np.unique(a)
+        if len(merged):
+            # 기존 목록(바뀐 app 없음 => 점수 그대로) + 새 후보 => 다시 k개
+            old = neighbors[merged]
+            valid = old >= 0
+            rows = np.concatenate((np.repeat(merged, valid.sum(axis=1)), a))
+            cols = np.concatenate((old[valid], c))
+            both = np.concatenate((exact_scores[merged][valid], s))
+            _place(neighbors, scores, merged, segment_topk(rows, cols, both, k), k)
+
+    touched = np.union1d(np.union1d(changed, dirty), merged)
+    stats.update(dirty=len(dirty), merged=len(merged), sec=time.perf_counter() - t0)
+    if verbose:
+        print(f"[SIM] 증분 top-{k}: 바뀐 app {stats['changed']} / 전체 재계산 {stats['dirty']} "
+              f"/ 후보 병합 {stats['merged']}행 ({stats['sec']:.2f}초, 전체 {n}개 중 {len(touched)}행 변경)")
+    return neighbors, scores, touched, stats
+
+
+########################################
+# 3) 검증 (처음부터 다시 계산한 결과와 비교)
+########################################
+def verify_topk(matrix, topk, k=TOP_K, sample=0, seed=0, workers=SIM_WORKERS, max_ram_mb=SIM_MAX_RAM_MB,
+                tol=VERIFY_TOL):
+    """
+    sample=0: compute_topk로 전체 재계산해서 비교, sample>0: 임의의 sample개 행만 topk_for_rows로
+    불일치 = 같은 순위의 점수가 tol 넘게 다르거나, 이웃이 다른데 앞/뒤 순위와 동점도 아닌 경우
+    => 불일치 행 위치 배열
+    """
+    neighbors, scores = topk
+    n = len(neighbors)
+    if sample and sample < n:
+        rows = np.sort(np.random.default_rng(seed).choice(n, sample, replace=False))
+        expected_neighbors, expected_scores = topk_for_rows(matrix, rows, k)
+        label = f"샘플 {len(rows)}행"
+    else:
+        rows = np.arange(n)
+        expected_neighbors, expected_scores = compute_topk(matrix, k, workers, max_ram_mb, verbose=False)
+        label = "전체 재계산"
+    got_neighbors = np.asarray(neighbors)[rows]
+    expected_scores = expected_scores.astype(np.float64)
+    got_scores = np.asarray(scores, dtype=np.float64)[rows]
+
+    score_diff = np.abs(expected_scores - got_scores) > tol
+    tie = np.zeros_like(score_diff)
+    tie[:, 1:] |= np.abs(expected_scores[:, 1:] - expected_scores[:, :-1]) <= tol
+    tie[:, :-1] |= np.abs(expected_scores[:, :-1] - expected_scores[:, 1:]) <= tol
+    bad = (score_diff | ((expected_neighbors != got_neighbors) & ~tie)).any(axis=1)
+    mismatched = rows[bad]
+    print(f"[SIM] 검증({label}): 불일치 {len(mismatched)}행"
+          + (f" (예: 행 {mismatched[:5].tolist()})" if len(mismatched) else ""))
+    return mismatched
+
+
+########################################
+# 4) 적재 (바뀐 행만)
+########################################
+def _subset(app_ids, topk, rows):
+    """rows 행만 뽑은 (app_ids, topk) => neighbor_rows에 그대로 사용
+    (앞쪽 len(rows)개 = rows의 app_id, 뒤쪽 = 전체 app_ids => 이웃 위치는 len(rows)만큼 밀어서 가리킴)"""
+    neighbors, scores = topk
+    rows = np.asarray(rows, dtype=np.int64)
+    ids = np.concatenate((np.asarray(app_ids)[rows], app_ids))
+    sub = neighbors[rows]
+    return ids, (np.where(sub >= 0, sub + len(rows), -1), scores[rows])
+
+
+def patch_tables(app_ids, topk, rows, removed_ids=(), neighbor_table=NEIGHBOR_TABLE, chunk_size=5000):
+    """
+    rows(행 위치)의 이웃 목록만 DELETE + INSERT로 교체, removed_ids는 삭제만 (한 트랜잭션)
+    => 이웃 행 수
+    """
+    ids, sub = _subset(app_ids, topk, rows)
+    long_rows = list(neighbor_rows(ids, sub))
+    delete_ids = sorted({int(a) for a in np.asarray(app_ids)[np.asarray(rows, dtype=np.int64)]}
+                        | {int(a) for a in removed_ids})
+    long_sql = f"INSERT INTO {neighbor_table} (app_id, neighbor_id, `rank`, score) VALUES (%s, %s, %s, %s)"
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(neighbor_table_sql(neighbor_table))
+            for i in range(0, len(delete_ids), chunk_size):
+                chunk = delete_ids[i:i + chunk_size]
+                cur.execute(f"DELETE FROM {neighbor_table} WHERE app_id IN ({', '.join(['%s'] * len(chunk))})",
+                            chunk)
+            for i in range(0, len(long_rows), chunk_size):
+                cur.executemany(long_sql, long_rows[i:i + chunk_size])
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"[SIM] {neighbor_table} 부분 갱신: app {len(delete_ids)}개 삭제 후 이웃 {len(long_rows)}행 적재")
+    return len(long_rows)
+
+
+def patch_matrix(game_app_ids, wide_rows, matrix_table=MATRIX_TABLE, k=TOP_K, chunk_size=5000):
+    """
+    MATRIX에서 game_app_ids 행을 지우고 wide_rows(recommendation_matrix_rows 결과)로 다시 채움 (한 트랜잭션)
+    => MATRIX 행 수
+    """
+    wide_rows = list(wide_rows)
+    delete_ids = sorted({int(g) for g in game_app_ids} | {int(r[1]) for r in wide_rows})
+    columns = matrix_columns(k)
+    wide_sql = f"INSERT INTO {matrix_table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(matrix_table_sql(matrix_table, k))
+            for i in range(0, len(delete_ids), chunk_size):
+                chunk = delete_ids[i:i + chunk_size]
+                cur.execute(f"DELETE FROM {matrix_table} WHERE game_app_id IN ({', '.join(['%s'] * len(chunk))})",
+                            chunk)
+            for i in range(0, len(wide_rows), chunk_size):
+                cur.executemany(wide_sql, wide_rows[i:i + chunk_size])
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"[SIM] {matrix_table} 부분 갱신: base game {len(delete_ids)}개 삭제 후 {len(wide_rows)}행 적재")
+    return len(wide_rows)
@@ -0,0 +1,230 @@
+# tag_bitmap_index.py (대시보드용 메모리 태그 비트맵 인덱스)
+#
+# 기존 대시보드: 태그 selectbox 조합이 바뀔 때마다 RDS에 SQL (TAGS 조회 + TITLELIST 필터)
+# 변경: 현재 버전 스냅샷(TITLELIST_CURRENT)을 한 번 읽어서
+#   - tag_id -> 비트맵(해당 태그를 가진 행 위치 집합)
+#   - 행 위치에 맞춘 NumPy 컬럼 (app_id / userScore / price_us / releaseYear)
+#   을 메모리에 올려 두고, AND / OR / NOT 태그 조합은 비트 연산으로 바로 계산 (수 마이크로초)
+#   - 남은 행 기준 태그별 개수(facet count)도 비트맵 교집합 개수로 계산
+#   - pyroaring이 설치돼 있으면 Roaring 비트맵(압축) 사용, 없으면 파이썬 int 비트셋(행 수/8 바이트)
+#
+# 사용 예:
+#   index = TagBitmapIndex.from_connection(conn)          # pymysql / mysql.connector 둘 다 가능
+#   bm = index.query(all_of=[3, 17], none_of=[42])
+#   index.count(bm), index.facet_counts(bm, top=20)
+#   rows = index.records(index.select(bm, min_score=80))
+#   tag_ids, tag_names, rows = match_titles(["Indie", "MOBA"], index)   # 대시보드 fetch_titles_by_tags
+
+import json
+
+import numpy as np
+
+try:
+    from pyroaring import BitMap
+except ImportError:  # 선택 의존성
+    BitMap = None
+
+OPEN_END = "9999-12-31"
+TITLE_COLUMNS = ("app_id", "name", "user_tags", "userScore")
+
+
+def _parse_tags(user_tags):
+    if isinstance(user_tags, list):
+        return user_tags
+    if not user_tags:
+        return []
+    try:
+        tags = json.loads(user_tags)
+    except (TypeError, ValueError):
+        return []
+    return tags if isinstance(tags, list) else []
+
+
+def _parse_year(value):
+    try:
+        return int(str(value)[:4])
+    except (TypeError, ValueError):
+        return 0
+
+
+class TagBitmapIndex:
+    def __init__(self, app_ids, names, tag_lists, user_scores, prices, years, tag_names=None):
+        self.n = len(app_ids)
+        self.app_ids = np.asarray(app_ids, dtype=np.int64)
+        self.names = list(names)
+        self.tag_lists = [[int(t) for t in tags] for tags in tag_lists]
+        self.user_scores = np.asarray([float(s or 0.0) for s in user_scores], dtype=np.float32)
+        self.prices = np.asarray([float(p or 0.0) for p in prices], dtype=np.float32)
+        self.years = np.asarray([_parse_year(y) for y in years], dtype=np.int16)
+        self.tag_names = dict(tag_names or {})                       # tag_id -> 이름
+        self.tag_ids = {name: tag_id for tag_id, name in self.tag_names.items()}
+        self.all = self._from_mask(np.ones(self.n, dtype=bool))
+        self.empty = self._from_mask(np.zeros(self.n, dtype=bool))
+        self.bitmaps = self._build_bitmaps()
+
+    ########################################
+    # 생성
+    ########################################
+    @classmethod
+    def from_rows(cls, rows, tag_names=None):
+        """rows: [(app_id, name, user_tags, userScore, price_us, releaseYear), ...]"""
+        rows = list(rows)
+        return cls([r[0] for r in rows], [r[1] for r in rows], [_parse_tags(r[2]) for r in rows],
+                   [r[3] for r in rows], [r[4] for r in rows], [r[5] for r in rows], tag_names)
+
+    @classmethod
+    def from_connection(cls, conn, table="TITLELIST_CURRENT"):
+        """
+        TAGS + 현재 버전 스냅샷을 한 번씩 읽어서 인덱스 생성 (커넥션은 호출한 쪽에서 닫음)
+        table="TITLELIST"이면 SCD 이력에서 활성 행만 골라 읽음
+        """
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT tag_id, tag_name FROM TAGS")
+            tag_names = {int(tag_id): tag_name for tag_id, tag_name in cur.fetchall()}
+            where = f"WHERE end_date = '{OPEN_END}'" if table == "TITLELIST" else ""
+            cur.execute(f"""
+            SELECT app_id, name, user_tags, userScore, price_us, releaseYear
+              FROM {table}
+             {where}
+            """)
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        return cls.from_rows(rows, tag_names)
+
+    ########################################
+    # 비트맵 표현 (Roaring 또는 int 비트셋)
+    ########################################
+    def _from_mask(self, mask):
+        if BitMap is not None:
+            return BitMap(np.flatnonzero(mask).tolist())
+        return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+    def _build_bitmaps(self):
+        lengths = [len(tags) for tags in self.tag_lists]
+        flat_tags = np.fromiter((t for tags in self.tag_lists for t in tags), dtype=np.int64,
+                                count=sum(lengths))
+        flat_rows = np.repeat(np.arange(self.n), lengths)
+        order = np.argsort(flat_tags, kind="stable")
+        flat_tags, flat_rows = flat_tags[order], flat_rows[order]
+        starts = np.flatnonzero(np.r_[True, np.diff(flat_tags) != 0]) if len(flat_tags) else []
+        ends = list(starts[1:]) + [len(flat_tags)]
+        bitmaps = {}
+        for start, end in zip(starts, ends):
+            mask = np.zeros(self.n, dtype=bool)
+            mask[flat_rows[start:end]] = True
+            bitmaps[int(flat_tags[start])] = self._from_mask(mask)
+        return bitmaps
+
+    def count(self, bm):
+        return len(bm) if BitMap is not None else bm.bit_count()
+
+    def positions(self, bm):
+        """비트맵 -> 행 위치 배열 (오름차순)"""
+        if BitMap is not None:
+            return np.asarray(bm.to_array(), dtype=np.int64)
+        raw = np.frombuffer(bm.to_bytes((self.n + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder="little")[:self.n])
+
+    ########################################
+    # 조회
+    ########################################
+    def bitmap_of(self, tag):
+        """tag_id 또는 태그 이름 -> 비트맵 (없는 태그는 빈 비트맵)"""
+        tag_id = self.tag_ids.get(tag) if isinstance(tag, str) else int(tag)
+        return self.bitmaps.get(tag_id, self.empty)
+
+    def query(self, all_of=(), any_of=(), none_of=()):
+        """
+        all_of: 모두 가진 (AND) / any_of: 하나라도 가진 (OR) / none_of: 하나도 없는 (NOT)
+        태그는 tag_id 또는 태그 이름
+        """
+        # 작은 비트맵부터 AND 해야 중간 결과가 빨리 줄어듦
+        bm = self.all
+        for tag_bm in sorted((self.bitmap_of(t) for t in all_of), key=self.count):
+            bm = bm & tag_bm
+        if any_of:
+            union = self.empty
+            for t in any_of:
+                union = union | self.bitmap_of(t)
+            bm = bm & union
+        for t in none_of:
+            if BitMap is not None:
+                bm = bm - self.bitmap_of(t)
+            else:
+                bm = bm & ~self.bitmap_of(t)
+        return bm
+
+    def facet_counts(self, bm, top=None, exclude=()):
+        """bm에 남은 행 기준 태그별 개수 [(tag_id, 개수), ...] 많은 순 (0개 태그 제외)"""
+        excluded = {self.tag_ids.get(t) if isinstance(t, str) else int(t) for t in exclude}
+        if BitMap is not None:
+            counts = [(t, bm.intersection_cardinality(b)) for t, b in self.bitmaps.items() if t not in excluded]
+        else:
+            counts = [(t, (bm & b).bit_count()) for t, b in self.bitmaps.items() if t not in excluded]
+        counts = sorted((c for c in counts if c[1] > 0), key=lambda c: c[1], reverse=True)
+        return counts[:top] if top else counts
+
+    def select(self, bm, min_score=None, max_price=None, years=None):
+        """비트맵 결과에 점수 / 가격 / 출시연도 조건을 NumPy 컬럼으로 추가 적용 => 행 위치 배열"""
+        pos = self.positions(bm)
+        keep = np.ones(len(pos), dtype=bool)
+        if min_score is not None:
+            keep &= self.user_scores[pos] >= min_score
+        if max_price is not None:
+            keep &= self.prices[pos] <= max_price
+        if years is not None:
+            low, high = years
+            keep &= (self.years[pos] >= low) & (self.years[pos] <= high)
+        return pos[keep]
+
+    def records(self, bm_or_positions, columns=None):
+        """fetch_titles_by_tags의 SQL 결과와 같은 모양의 dict 리스트 (columns로 컬럼 제한)"""
+        pos = bm_or_positions
+        if not isinstance(pos, np.ndarray):
+            pos = self.positions(pos)
+        rows = [{
+            "app_id": int(self.app_ids[i]),
+            "name": self.names[i],
+            "user_tags": self.tag_lists[i],
+            "userScore": float(self.user_scores[i]),
+            "price_us": float(self.prices[i]),
+            "releaseYear": int(self.years[i]) or None,
+        } for i in pos]
+        if columns:
+            rows = [{c: r[c] for c in columns} for r in rows]
+        return rows
+
+
+def match_titles(tag_names, index=None, conn=None, columns=TITLE_COLUMNS, table="TITLELIST_CURRENT"):
+    """
+    태그 이름들 -> (tag_id 리스트, {tag_id: 태그 이름}, 태그를 모두 가진 타이틀 dict 리스트)
+    index가 있으면 이름 <-> ID 변환과 교집합을 전부 메모리에서 (SQL 없음, conn 불필요)
+    index가 없을 때만 conn으로 TAGS 한 번 + APP_TAG 교집합(common.app_tag.tag_filter_sql) JOIN {table}
+    선택한 태그가 하나도 사전에 없으면 tag_id 리스트와 타이틀이 빈 리스트
+    """
+    if index is not None:
+        tag_ids = list(dict.fromkeys(index.tag_ids[t] for t in tag_names if t in index.tag_ids))
+        rows = index.records(index.query(all_of=tag_ids), columns=columns) if tag_ids else []
+        return tag_ids, index.tag_names, rows
+
+    from common.app_tag import tag_filter_sql
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT tag_id, tag_name FROM TAGS")
+        tag_names_by_id = {int(tag_id): tag_name for tag_id, tag_name in cur.fetchall()}
+        ids_by_name = {tag_name: tag_id for tag_id, tag_name in tag_names_by_id.items()}
+        tag_ids = list(dict.fromkeys(ids_by_name[t] for t in tag_names if t in ids_by_name))
+        rows = []
+        if tag_ids:
+            tag_match, params = tag_filter_sql(tag_ids)
+            cur.execute(f"""
+            SELECT {", ".join(f"t.{c}" for c in columns)}
+              FROM {table} t
+              JOIN ({tag_match}) m ON m.app_id = t.app_id
+            """, params)
+            rows = [dict(zip(columns, r)) for r in cur.fetchall()]
+    finally:
+        cur.close()
+    return tag_ids, tag_names_by_id, rows
@@ -0,0 +1,253 @@
+# tag_http_extractor.py (브라우저 없이 스토어 페이지 HTML에서 '+' 버튼 태그 목록 추출)
+#
+# 기존 fetch_tags_via_plus_button:
+#   Chrome 페이지 로드 -> sleep(2) -> div.app_tag.add_button 클릭 -> sleep(1)
+#   -> #app_tagging_modal a.app_tag 읽기  => app 하나당 최소 3초
+#
+# 스토어 페이지 원본 HTML에는 팝업(#app_tagging_modal)에 뿌릴 태그 전체가
+#   InitAppTagModal( <appid>, [{"tagid":..,"name":"..","count":..}, ...], ... )
+# 형태로 이미 들어 있음. 그래서 requests로 HTML만 받아서 정규식 + JSON 파싱으로 꺼낸다.
+#   1순위: InitAppTagModal JSON (팝업과 동일한 목록, 순서 그대로)
+#   2순위: .glance_tags 안의 a.app_tag 텍스트
+#   실패(성인인증 페이지 등) 시에만 Selenium fallback 호출
+#
+# 사용 예:
+#   python -m common.tag_http_extractor --fixtures             (오프라인 파서 체크)
+#   python -m common.tag_http_extractor --compare 570 730 ...  (Selenium 경로와 시간 비교)
+
+import os
+import re
+import json
+import html
+import time
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.rate_limiter import limited_get
+
+STORE_APP_URL = "https://store.steampowered.com/app/{app_id}/?l=english"
+
+# 성인인증(agecheck) 페이지를 피하기 위한 쿠키
+STORE_COOKIES = {
+    "birthtime": "0",
+    "lastagecheckage": "1-0-1970",
+    "wants_mature_content": "1",
+    "Steam_Language": "english",
+}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_tag_modal_re = re.compile(r"InitAppTagModal\(\s*\d+\s*,\s*")
+_app_name_re = re.compile(r'<div[^>]*id="appHubAppName"[^>]*>(.*?)</div>', re.S)
+_glance_block_re = re.compile(r'<div class="glance_tags popular_tags"[^>]*>(.*?)<div class="app_tag add_button"', re.S)
+_glance_tag_re = re.compile(r'<a[^>]*class="app_tag"[^>]*>(.*?)</a>', re.S)
+_json_decoder = json.JSONDecoder()
+
+
+########################################
+# 1) HTML 파싱
+########################################
+def parse_tags_from_html(page_html):
+    """
+    스토어 페이지 HTML -> {"name": str|None, "user_tags": [...]}
+    태그를 하나도 못 찾으면 None (=> Selenium fallback 대상)
+    """
+    name = None
+    m = _app_name_re.search(page_html)
+    if m:
+        name = html.unescape(m.group(1)).strip() or None
+
+    # (A) InitAppTagModal( appid, [ ...json... ], ...)
+    m = _tag_modal_re.search(page_html)
+    if m:
+        try:
+            tag_objs, _ = _json_decoder.raw_decode(page_html, m.end())
+            tags = [t["name"].strip() for t in tag_objs if t.get("name", "").strip()]
+            if tags:
+                return {"name": name, "user_tags": tags}
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    # (B) .glance_tags a.app_tag
+    m = _glance_block_re.search(page_html)
+    if m:
+        tags = [html.unescape(t).strip() for t in _glance_tag_re.findall(m.group(1))]
+        tags = [t for t in tags if t]
+        if tags:
+            return {"name": name, "user_tags": tags}
+
+    return None
+
+
+########################################
+# 2) HTTP 세션 풀 (스레드별 keep-alive 세션)
+########################################
+_local = threading.local()
+
+def get_session(pool_size=16):
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(HEADERS)
+        session.cookies.update(STORE_COOKIES)
+        _local.session = session
+    return session
+
+def fetch_tags_via_http(app_id, session=None, url_template=STORE_APP_URL):
+    """
+    스토어 페이지를 HTTP로 받아 태그 추출.
+    반환: {"app_id", "name", "user_tags"} 또는 None (파싱 실패/성인인증/HTTP 오류)
+    """
+    session = session or get_session()
+    try:
+        resp = limited_get(session, url_template.format(app_id=app_id), timeout=15)
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        print(f"[WARN] HTTP 태그 요청 실패 app_id={app_id} => {e}")
+        return None
+
+    if "/agecheck/" in resp.url:
+        return None
+
+    parsed = parse_tags_from_html(resp.text)
+    if not parsed:
+        return None
+    return {"app_id": app_id, "name": parsed["name"], "user_tags": parsed["user_tags"]}
+
+
+########################################
+# 3) 동시 수집 + Selenium fallback
+########################################
+def fetch_tags_bulk(app_ids, max_workers=8, selenium_fallback=None, selenium_bulk_fallback=None):
+    """
+    app_ids 전체를 스레드 풀로 동시에 HTTP 수집.
+    HTTP로 실패한 app만 selenium_fallback(app_id) -> list[str] 로 순서대로 재시도.
+    selenium_bulk_fallback(failed_ids) -> {app_id: list[str] | None} 를 주면 실패분을 한 번에 넘긴다.
+    (예: common.webdriver_pool.run_driver_pool로 드라이버 여러 개 병렬 처리)
+    반환: {app_id: {"app_id", "name", "user_tags", "source": "http"|"selenium"|"fail"}}
+    fallback에서도 태그를 못 얻으면(None / 빈 리스트 / 결과 없음) source="fail", user_tags=[]
+    => 호출자는 "fail"을 "태그 없음"으로 덮어쓰지 말고 건너뛸 것
+    """
+    results = {}
+    failed = []
+    unique_ids = list(dict.fromkeys(app_ids))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = {ex.submit(fetch_tags_via_http, app_id): app_id for app_id in unique_ids}
+        for fut in as_completed(futures):
+            app_id = futures[fut]
+            data = fut.result()
+            if data:
+                data["source"] = "http"
+                results[app_id] = data
+            else:
+                failed.append(app_id)
+
+    print(f"[INFO] HTTP 태그 수집: 성공 {len(results)} / 실패 {len(failed)}")
+
+    if failed and selenium_bulk_fallback:
+        bulk = selenium_bulk_fallback(failed) or {}
+        for app_id in failed:
+            tags = bulk.get(app_id)
+            results[app_id] = {"app_id": app_id, "name": None, "user_tags": tags or [],
+                               "source": "selenium" if tags else "fail"}
+    else:
+        for app_id in failed:
+            tags = selenium_fallback(app_id) if selenium_fallback else None
+            results[app_id] = {"app_id": app_id, "name": None, "user_tags": tags or [],
+                               "source": "selenium" if tags else "fail"}
+
+    n_fail = sum(1 for r in results.values() if r["source"] == "fail")
+    if failed and (selenium_fallback or selenium_bulk_fallback):
+        print(f"[INFO] Selenium fallback: 성공 {len(failed) - n_fail} / 실패 {n_fail}")
+
+    return results
+
+
+########################################
+# 4) 오프라인 fixture 체크 / Selenium 시간 비교
+########################################
+FIXTURE_EXPECTED = {
+    "store_app_570.html": ("Dota 2", [
+        "Free to Play", "MOBA", "Multiplayer", "Strategy", "Competitive",
+        "Action", "RTS", "Turn-Based", "Online Co-Op", "Singleplayer & Solo"
+    ]),
+    "store_app_1172470_glance_only.html": ("Apex Legends™", [
+        "Free to Play", "Battle Royale", "FPS", "Hero Shooter"
+    ]),
+    "store_agecheck.html": None,
+}
+
+def check_fixtures():
+    ok = True
+    for filename, expected in FIXTURE_EXPECTED.items():
+        with open(os.path.join(FIXTURE_DIR, filename), "r", encoding="utf-8") as f:
+            page_html = f.read()
+        t0 = time.perf_counter()
+        parsed = parse_tags_from_html(page_html)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        got = (parsed["name"], parsed["user_tags"]) if parsed else None
+        status = "OK" if got == expected else "FAIL"
+        ok = ok and status == "OK"
+        print(f"[{status}] {filename} ({elapsed_ms:.2f}ms) => {got}")
+    return ok
+
+def compare_with_selenium(app_ids):
+    """같은 app_ids에 대해 HTTP 추출 vs Selenium '+버튼' 경로 소요 시간/결과 비교."""
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    t0 = time.perf_counter()
+    http_results = fetch_tags_bulk(app_ids)
+    http_elapsed = time.perf_counter() - t0
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    sel_results = {}
+    t0 = time.perf_counter()
+    try:
+        for app_id in app_ids:
+            driver.get(STORE_APP_URL.format(app_id=app_id))
+            time.sleep(2)
+            try:
+                driver.find_element(By.CSS_SELECTOR, "div.app_tag.add_button").click()
+                time.sleep(1)
+                elems = driver.find_elements(By.CSS_SELECTOR, "#app_tagging_modal a.app_tag")
+                sel_results[app_id] = [el.text.strip() for el in elems if el.text.strip()]
+            except Exception:
+                sel_results[app_id] = []
+    finally:
+        driver.quit()
+    sel_elapsed = time.perf_counter() - t0
+
+    same = sum(1 for a in app_ids if http_results[a]["user_tags"] == sel_results[a])
+    print(f"[HTTP]     {len(app_ids)}개 {http_elapsed:.2f}s ({http_elapsed / len(app_ids):.3f}s/app)")
+    print(f"[SELENIUM] {len(app_ids)}개 {sel_elapsed:.2f}s ({sel_elapsed / len(app_ids):.3f}s/app)")
+    print(f"[MATCH]    태그 목록 동일 {same}/{len(app_ids)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", action="store_true", help="저장된 HTML fixture로 파서 체크")
+    parser.add_argument("--compare", nargs="+", type=int, help="Selenium 경로와 시간 비교할 app_id들")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_with_selenium(args.compare)
+    else:
+        raise SystemExit(0 if check_fixtures() else 1)
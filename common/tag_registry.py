@@ -0,0 +1,162 @@
+# tag_registry.py (태그 이름 <-> tag_id 일괄 변환, TAGS 테이블 연동)
+#
+# 기존:
+#   - get_or_create_tag_id_in_db: 처음 보는 태그마다 새 커넥션 + SELECT (+ INSERT)
+#   - update_titlelist.py get_tag_id: 새 태그가 나올 때마다 tag_dict.json 전체 재작성
+#   - scd_upsert.py: 행마다 tag_mapping.json load/save, 새 태그마다 max(mapping.values()) 스캔
+# 변경: TagRegistry 하나가 시작할 때 TAGS를 한 번 읽어 메모리(이름->ID, ID->이름)에 올려 두고,
+#   처음 보는 태그들은 배치 단위로
+#     INSERT IGNORE INTO TAGS (tag_name) VALUES ... (1번)
+#     SELECT tag_id, tag_name FROM TAGS WHERE tag_name IN (...) (1번)
+#   으로 ID를 받아옴. 새로 받은 ID는 append-only 로그(tag_registry.log, JSONL)에 한 줄씩 추가.
+#   conn_factory 없이 만들면 DB 없이 로그만으로 ID를 관리 (오프라인 테스트용)
+#
+# 사용 예:
+#   registry = TagRegistry(get_connection)
+#   registry.resolve_many(["FPS", "MOBA"])     # {"FPS": 3, "MOBA": 17}
+#   registry.to_ids(["FPS", "MOBA"])           # [3, 17]
+
+import os
+import json
+import threading
+
+TAG_LOG_PATH = os.getenv("TAG_LOG_PATH", "tag_registry.log")
+
+
+def _name_key(tag_name):
+    """TAGS.tag_name 콜레이션(대소문자/뒤 공백 무시)과 같게 비교하기 위한 키"""
+    return tag_name.strip().casefold()
+
+
+class TagRegistry:
+    def __init__(self, conn_factory=None, log_path=TAG_LOG_PATH, chunk_size=500):
+        self.conn_factory = conn_factory
+        self.log_path = log_path
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.name_to_id = {}
+        self.id_to_name = {}
+        self.stats = {"hits": 0, "new": 0, "db_round_trips": 0}
+        self.load()
+
+    ########################################
+    # 로드
+    ########################################
+    def ensure_table(self):
+        conn = self.conn_factory()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                CREATE TABLE IF NOT EXISTS TAGS (
+                    tag_id INT AUTO_INCREMENT PRIMARY KEY,
+                    tag_name VARCHAR(255) NOT NULL UNIQUE
+                )
+                """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _replay_log(self):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # 쓰다 끊긴 마지막 줄
+                self._remember(rec["tag_name"], int(rec["tag_id"]))
+
+    def load(self):
+        """DB 모드: TAGS 전체를 한 번 읽음 / 오프라인 모드: 로그 재생"""
+        if self.conn_factory is None:
+            self._replay_log()
+            print(f"[TAGS] 로그에서 태그 {len(self.name_to_id)}개 로드 ({self.log_path})")
+            return
+        self.ensure_table()
+        conn = self.conn_factory()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT tag_id, tag_name FROM TAGS")
+                for tag_id, tag_name in cur.fetchall():
+                    self._remember(tag_name, int(tag_id))
+        finally:
+            conn.close()
+        self.stats["db_round_trips"] += 1
+        print(f"[TAGS] TAGS 테이블에서 태그 {len(self.name_to_id)}개 로드")
+
+    def _remember(self, tag_name, tag_id):
+        # name_to_id는 _name_key로 저장: "fps", "FPS " 처럼 DB가 같은 행으로 보는 이름이
+        # 저장된 표기("FPS")와 글자가 달라도 같은 ID로 찾아지고, 배치마다 다시 조회되지 않음
+        self.name_to_id[_name_key(tag_name)] = tag_id
+        self.id_to_name[tag_id] = tag_name
+
+    ########################################
+    # 새 태그 등록
+    ########################################
+    def _append_log(self, new_pairs):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            for tag_name, tag_id in new_pairs:
+                f.write(json.dumps({"tag_id": tag_id, "tag_name": tag_name}, ensure_ascii=False) + "\n")
+
+    def _create_in_db(self, names):
+        found = []
+        conn = self.conn_factory()
+        try:
+            with conn.cursor() as cur:
+                for i in range(0, len(names), self.chunk_size):
+                    chunk = names[i:i + self.chunk_size]
+                    cur.executemany("INSERT IGNORE INTO TAGS (tag_name) VALUES (%s)", [(n,) for n in chunk])
+                    placeholders = ",".join(["%s"] * len(chunk))
+                    cur.execute(f"SELECT tag_id, tag_name FROM TAGS WHERE tag_name IN ({placeholders})", chunk)
+                    found.extend((tag_name, int(tag_id)) for tag_id, tag_name in cur.fetchall())
+                    self.stats["db_round_trips"] += 2
+            conn.commit()
+        finally:
+            conn.close()
+        return found
+
+    def _create_locally(self, names):
+        next_id = max(self.id_to_name, default=0) + 1
+        return [(name, next_id + i) for i, name in enumerate(names)]
+
+    ########################################
+    # 조회
+    ########################################
+    def resolve_many(self, tag_names):
+        """태그 이름 여러 개 -> {이름: tag_id}. 없는 태그는 한 번에 생성"""
+        wanted = [t for t in dict.fromkeys(tag_names) if t and _name_key(t)]
+        with self.lock:
+            missing = {}
+            for t in wanted:
+                key = _name_key(t)
+                if key not in self.name_to_id:
+                    missing.setdefault(key, t)  # 콜레이션상 같은 이름은 처음 표기로 한 번만 생성
+            missing = list(missing.values())
+            self.stats["hits"] += len(wanted) - len(missing)
+            if missing:
+                if self.conn_factory is None:
+                    new_pairs = self._create_locally(missing)
+                else:
+                    new_pairs = self._create_in_db(missing)
+                for tag_name, tag_id in new_pairs:
+                    self._remember(tag_name, tag_id)
+                self._append_log(new_pairs)
+                self.stats["new"] += len(new_pairs)
+            return {t: self.name_to_id[_name_key(t)] for t in wanted if _name_key(t) in self.name_to_id}
+
+    def to_ids(self, tag_names):
+        """태그 이름 리스트 -> tag_id 리스트 (입력 순서 유지)"""
+        mapping = self.resolve_many(tag_names)
+        return [mapping[t] for t in tag_names if t in mapping]
+
+    def name_of(self, tag_id):
+        return self.id_to_name.get(int(tag_id))
+
+    def print_stats(self):
+        s = self.stats
+        print(f"[TAGS] 메모리 hit {s['hits']} / 신규 {s['new']} / DB 왕복 {s['db_round_trips']}회 "
+              f"/ 전체 {len(self.name_to_id)}개")
@@ -0,0 +1,184 @@
+# tag_vectors.py (IDF x 순위 가중 태그 벡터 + 메모리 매핑 .npy 저장소)
+#
+# 기존 유사도(common.similarity.build_tag_matrix): 태그가 있으면 1, 없으면 0
+#   => 거의 모든 게임에 붙는 "Indie"와 드문 "MOBA"가 같은 무게, '+' 팝업의 태그 순서(투표 순위)도 버려짐
+# 변경: (app, tag) 가중치 = IDF(tag) x 순위 감쇠(rank)
+#   - IDF = ln((1 + N) / (1 + df)) + 1      (N = app 수, df = 그 태그가 붙은 app 수)
+#   - 순위 감쇠 = 1 / log2(rank + 2)        (팝업 첫 번째 태그 1.0, 두 번째 0.63, 열 번째 0.29 ...)
+#     user_tags는 fetch_tags_via_plus_button / tag_http_extractor가 돌려준 순서 그대로 저장돼 있음
+#   - 행 L2 정규화 float32 CSR => 내적이 곧 코사인 (common.similarity의 top-k 함수에 그대로 사용)
+# 저장소: 디렉터리 하나에 CSR 배열들을 .npy로 (data / indices / indptr / app_ids / tag_ids / idf + meta.json)
+#   extras={이름: 배열}을 주면 extra_{이름}.npy로 같이 저장 (증분 유사도가 top-k 이웃 / 점수를 여기에 둠)
+#   - TagVectors.load()는 np.load(mmap_mode="r") => JSON 파싱이나 파이프라인 재실행 없이 수 밀리초
+#     (페이지는 실제로 읽는 행만 OS가 올림, 여러 프로세스가 같은 페이지 캐시 공유)
+#   - save()는 임시 디렉터리에 다 쓴 뒤 이름 교체 => 읽는 쪽은 교체 전/후 중 하나만 봄
+#
+# 사용 예:
+#   vectors = build_tag_vectors(app_ids, tag_lists); vectors.save()
+#   vectors = TagVectors.load()                       # Streamlit 등 다른 프로세스
+#   vectors.similarity(570, [730, 440])               # 코사인 배열
+#   vectors.topk(570, k=9)                            # [(neighbor_app_id, score), ...]
+
+import os
+import json
+import math
+import time
+import shutil
+
+import numpy as np
+from scipy import sparse
+
+from common.similarity import TOP_K, topk_for_rows
+
+TAG_VECTORS_DIR = os.getenv("TAG_VECTORS_DIR", os.path.join(os.path.expanduser("~"), ".steam_tag_vectors"))
+ARRAYS = ("data", "indices", "indptr", "app_ids", "tag_ids", "idf")
+
+
+def rank_weight(rank):
+    """팝업 순위(0부터) -> 감쇠 가중치 1 / log2(rank + 2)"""
+    return 1.0 / math.log2(rank + 2)
+
+
+def _int_tags(tags):
+    """순서를 유지하며 중복 제거한 정수 태그 id (정수로 못 바꾸는 값은 버림)"""
+    seen, result = set(), []
+    for t in tags:
+        try:
+            t = int(t)
+        except (TypeError, ValueError):
+            continue
+        if t not in seen:
+            seen.add(t)
+            result.append(t)
+    return result
+
+
+def compute_idf(tag_lists):
+    """태그 리스트들 -> (tag_ids 오름차순, idf 배열)"""
+    df = {}
+    for tags in tag_lists:
+        for t in set(_int_tags(tags)):
+            df[t] = df.get(t, 0) + 1
+    tag_ids = np.asarray(sorted(df), dtype=np.int64)
+    n = len(tag_lists)
+    idf = np.asarray([math.log((1 + n) / (1 + df[t])) + 1.0 for t in tag_ids], dtype=np.float32)
+    return tag_ids, idf
+
+
+def weighted_matrix(tag_lists, tag_ids, idf):
+    """태그 리스트들 -> 행 L2 정규화된 float32 CSR (가중치 = IDF x 순위 감쇠, 사전에 없는 태그는 무시)"""
+    col_of = {int(t): j for j, t in enumerate(tag_ids)}
+    indptr, indices, data = [0], [], []
+    for tags in tag_lists:
+        row = sorted((col_of[t], idf[col_of[t]] * rank_weight(rank))
+                     for rank, t in enumerate(_int_tags(tags)) if t in col_of)
+        indices.extend(j for j, _ in row)
+        data.extend(w for _, w in row)
+        indptr.append(len(indices))
+    data = np.asarray(data, dtype=np.float32)
+    indptr = np.asarray(indptr, dtype=np.int64)
+    # 행 L2 정규화 (태그 없는 행은 0벡터 그대로)
+    norms = np.sqrt(np.add.reduceat(data * data, indptr[:-1])) if len(data) else np.zeros(0)
+    lengths = np.diff(indptr)
+    if len(data):
+        norms = np.where(lengths > 0, norms, 1.0)
+        data /= np.repeat(norms, lengths).astype(np.float32)
+    index_dtype = np.int32 if len(indices) < 2 ** 31 else np.int64
+    return sparse.csr_matrix((data, np.asarray(indices, dtype=index_dtype), indptr.astype(index_dtype)),
+                             shape=(len(tag_lists), len(tag_ids)))
+
+
+def build_weighted_matrix(tag_lists):
+    """common.similarity.build_tag_matrix와 같은 모양: (행렬, {tag_id: 열})"""
+    tag_ids, idf = compute_idf(tag_lists)
+    return weighted_matrix(tag_lists, tag_ids, idf), {int(t): j for j, t in enumerate(tag_ids)}
+
+
+class TagVectors:
+    def __init__(self, app_ids, matrix, tag_ids, idf, meta=None, extras=None):
+        self.app_ids = app_ids          # 오름차순 (searchsorted로 행 찾기)
+        self.matrix = matrix
+        self.tag_ids = tag_ids
+        self.idf = idf
+        self.meta = meta or {}
+        self.extras = extras or {}      # 같이 저장할 추가 배열 {이름: ndarray} (예: top-k 이웃 / 점수)
+
+    ########################################
+    # 저장 / 로드
+    ########################################
+    def save(self, path=TAG_VECTORS_DIR):
+        """{path}.tmp에 전부 쓴 뒤 기존 디렉터리와 이름 교체 (이미 mmap으로 열린 예전 파일은 그대로 유효)"""
+        tmp, old = f"{path}.tmp", f"{path}.old"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        arrays = {"data": self.matrix.data, "indices": self.matrix.indices, "indptr": self.matrix.indptr,
+                  "app_ids": self.app_ids, "tag_ids": self.tag_ids, "idf": self.idf}
+        arrays.update({f"extra_{name}": value for name, value in self.extras.items()})
+        for name in arrays:
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+        meta = dict(self.meta, shape=list(self.matrix.shape), nnz=int(self.matrix.nnz), extras=sorted(self.extras),
+                    rank_weight="1/log2(rank+2)", idf="ln((1+N)/(1+df))+1",
+                    built_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        print(f"[VEC] {path}: {self.matrix.shape[0]} app x {self.matrix.shape[1]} 태그 (nnz {self.matrix.nnz}) 저장")
+
+    @classmethod
+    def load(cls, path=TAG_VECTORS_DIR, mmap=True):
+        """.npy를 메모리 매핑으로 열어서 CSR 구성 (복사 없음). 저장된 벡터가 없으면 None"""
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return None
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in ARRAYS}
+        extras = {name: np.load(os.path.join(path, f"extra_{name}.npy"), mmap_mode=mode)
+                  for name in meta.get("extras", [])}
+        matrix = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                                   shape=tuple(meta["shape"]), copy=False)
+        return cls(arrays["app_ids"], matrix, arrays["tag_ids"], arrays["idf"], meta, extras)
+
+    ########################################
+    # 조회
+    ########################################
+    def positions(self, app_ids):
+        """app_id 배열 -> 행 위치 배열 (없는 app은 -1)"""
+        app_ids = np.atleast_1d(np.asarray(app_ids, dtype=np.int64))
+        pos = np.searchsorted(self.app_ids, app_ids)
+        pos = np.minimum(pos, max(len(self.app_ids) - 1, 0))
+        found = (len(self.app_ids) > 0) & (np.asarray(self.app_ids)[pos] == app_ids)
+        return np.where(found, pos, -1)
+
+    def similarity(self, app_id, other_ids):
+        """app_id와 other_ids 각각의 코사인 (벡터가 없는 app은 0)"""
+        i = self.positions([app_id])[0]
+        others = self.positions(other_ids)
+        scores = np.zeros(len(others), dtype=np.float32)
+        if i < 0:
+            return scores
+        valid = np.flatnonzero(others >= 0)
+        if len(valid):
+            scores[valid] = (self.matrix[others[valid]] @ self.matrix[i].T).toarray().ravel()
+        return scores
+
+    def topk(self, app_id, k=TOP_K):
+        """app 하나의 top-k 이웃 [(neighbor_app_id, score), ...] (전체 행과 희소 곱 1번)"""
+        i = self.positions([app_id])[0]
+        if i < 0:
+            return []
+        neighbors, scores = topk_for_rows(self.matrix, [i], k)
+        return [(int(self.app_ids[j]), float(s)) for j, s in zip(neighbors[0], scores[0]) if j >= 0]
+
+
+def build_tag_vectors(app_ids, tag_lists, meta=None):
+    """app_ids(정렬 안 돼 있어도 됨) + 순서 있는 태그 리스트들 -> TagVectors"""
+    order = np.argsort(np.asarray(app_ids, dtype=np.int64), kind="stable")
+    app_ids = np.asarray(app_ids, dtype=np.int64)[order]
+    tag_lists = [tag_lists[i] for i in order]
+    tag_ids, idf = compute_idf(tag_lists)
+    return TagVectors(app_ids, weighted_matrix(tag_lists, tag_ids, idf), tag_ids, idf, meta)
@@ -0,0 +1,158 @@
+# title_resolver.py (추천 게임 app_id -> 제목을 페이지 이동 없이 한 번에 조회)
+#
+# 기존 More Like This 크롤러는 추천 게임마다 driver.get(game_url)로 #appHubAppName을 읽고
+# 다시 driver.get(url)로 추천 페이지에 돌아갔음 => 기본 app 하나당 페이지 로드 약 19번.
+# 여기서는 크롤러가 data-ds-appid만 모으고, 크롤이 끝난 뒤 전체 app_id를 중복 제거해서
+#   1) DB (TITLELIST 현재 버전 -> SIMILAR_GAMES.recommended_title)
+#   2) 로컬 영구 캐시 (app_title_cache.json)
+#   3) Steam HTTP 일괄 조회 (IStoreBrowseService/GetItems, 100개씩)
+# 순서로 제목을 채운다. 3)에서 얻은 제목은 캐시에 저장해 다음 실행부터는 HTTP도 생략.
+
+import os
+import json
+
+import requests
+
+from common.rate_limiter import limited_get
+
+TITLE_CACHE_PATH = os.getenv("TITLE_CACHE_PATH", "app_title_cache.json")
+GET_ITEMS_URL = "https://api.steampowered.com/IStoreBrowseService/GetItems/v1/"
+APPDETAILS_URL = "https://store.steampowered.com/api/appdetails"
+HTTP_BATCH_SIZE = 100
+
+
+########################################
+# 1) 로컬 캐시
+########################################
+def load_title_cache(path=TITLE_CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {int(k): v for k, v in data.items()}
+
+def save_title_cache(cache, path=TITLE_CACHE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({str(k): v for k, v in cache.items()}, f, ensure_ascii=False)
+
+
+########################################
+# 2) DB 조회 (TITLELIST -> SIMILAR_GAMES)
+########################################
+def fetch_titles_from_db(conn, app_ids, chunk_size=1000):
+    """
+    TITLELIST(현재 버전)에서 먼저 찾고, 없으면 SIMILAR_GAMES.recommended_title에서 찾는다.
+    """
+    found = {}
+    app_ids = list(app_ids)
+    with conn.cursor() as cur:
+        for i in range(0, len(app_ids), chunk_size):
+            chunk = app_ids[i:i + chunk_size]
+            placeholders = ",".join(["%s"] * len(chunk))
+            cur.execute(f"""
+                SELECT app_id, name
+                  FROM TITLELIST
+                 WHERE app_id IN ({placeholders})
+                   AND end_date = '9999-12-31'
+            """, chunk)
+            for app_id, name in cur.fetchall():
+                if name:
+                    found[int(app_id)] = name
+
+            rest = [a for a in chunk if a not in found]
+            if not rest:
+                continue
+            placeholders = ",".join(["%s"] * len(rest))
+            cur.execute(f"""
+                SELECT recommended_app_id, MAX(recommended_title)
+                  FROM SIMILAR_GAMES
+                 WHERE recommended_app_id IN ({placeholders})
+                   AND recommended_title IS NOT NULL
+                   AND recommended_title <> 'Unknown Title'
+                 GROUP BY recommended_app_id
+            """, rest)
+            for app_id, title in cur.fetchall():
+                if title:
+                    found[int(app_id)] = title
+    return found
+
+
+########################################
+# 3) HTTP 일괄 조회
+########################################
+def fetch_titles_via_http(app_ids, session=None):
+    """
+    IStoreBrowseService/GetItems로 100개씩 이름 조회.
+    배치 응답에 없는 app은 appdetails(filters=basic)로 개별 조회.
+    """
+    session = session or requests.Session()
+    found = {}
+    app_ids = list(app_ids)
+
+    for i in range(0, len(app_ids), HTTP_BATCH_SIZE):
+        chunk = app_ids[i:i + HTTP_BATCH_SIZE]
+        input_json = {
+            "ids": [{"appid": int(a)} for a in chunk],
+            "context": {"language": "english", "country_code": "US"},
+            "data_request": {}
+        }
+        try:
+            resp = limited_get(session, GET_ITEMS_URL, params={"input_json": json.dumps(input_json)}, timeout=15)
+            resp.raise_for_status()
+            for item in resp.json().get("response", {}).get("store_items", []):
+                if item.get("success") == 1 and item.get("name"):
+                    found[int(item["appid"])] = item["name"]
+        except (requests.RequestException, ValueError) as e:
+            print(f"[WARN] GetItems 일괄 조회 실패 ({len(chunk)}개) => {e}")
+
+    for app_id in app_ids:
+        if int(app_id) in found:
+            continue
+        try:
+            resp = limited_get(session, APPDETAILS_URL, params={"appids": app_id, "filters": "basic"}, timeout=15)
+            resp.raise_for_status()
+            data = resp.json().get(str(app_id), {})
+            if data.get("success"):
+                found[int(app_id)] = data["data"]["name"]
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"[WARN] appdetails 제목 조회 실패 app_id={app_id} => {e}")
+    return found
+
+
+########################################
+# 4) 통합: DB -> 캐시 -> HTTP
+########################################
+def resolve_titles(app_ids, conn=None, cache_path=TITLE_CACHE_PATH):
+    """
+    app_ids(중복 허용) -> {app_id(int): title}
+    못 찾은 app_id는 결과에 없음.
+    """
+    wanted = {int(a) for a in app_ids}
+    titles = {}
+
+    if conn is not None and wanted:
+        try:
+            titles.update(fetch_titles_from_db(conn, wanted))
+        except Exception as e:
+            print(f"[WARN] DB 제목 조회 실패 => {e}")
+    from_db = len(titles)
+
+    cache = load_title_cache(cache_path)
+    for a in wanted - titles.keys():
+        if a in cache:
+            titles[a] = cache[a]
+    from_cache = len(titles) - from_db
+
+    missing = sorted(wanted - titles.keys())
+    from_http = {}
+    if missing:
+        from_http = fetch_titles_via_http(missing)
+        titles.update(from_http)
+
+    # DB/HTTP에서 얻은 제목도 캐시에 반영 (다음 실행 시 재사용)
+    cache.update(titles)
+    save_title_cache(cache, cache_path)
+
+    print(f"[TITLES] 요청 {len(wanted)}개 => DB {from_db} / 캐시 {from_cache} / HTTP {len(from_http)} "
+          f"/ 실패 {len(wanted) - len(titles)}")
+    return titles
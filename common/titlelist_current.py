@@ -0,0 +1,126 @@
+# titlelist_current.py (TITLELIST_CURRENT: app별 현재 버전 1행만 들고 있는 테이블)
+#
+# 기존 대시보드: TITLELIST(SCD 이력 전체)를 end_date 조건 없이 읽고 pandas drop_duplicates(app_id)
+#   => 가격/점수가 바뀔 때마다 버전이 쌓여서 읽는 비용이 계속 커짐
+# 변경: 활성 버전만 TITLELIST_CURRENT에 따로 유지
+#   - PK app_id (InnoDB 클러스터드 인덱스 => app_id로 JOIN하는 대시보드 조회는 PK만으로 끝남)
+#   - idx_score (userScore, app_id, name)         : 점수순 목록
+#   - idx_year_price (releaseYear, price_us, app_id): 연도/가격 필터
+#   - content_hash: 버전 내용 해시 (common.content_hash, 크롤러가 {app_id: hash}를 한 번에 받아감)
+#   유지 경로:
+#     - ScdMerger(current_table="TITLELIST_CURRENT"): 새 버전이 생긴 app만 같은 트랜잭션에서 REPLACE
+#       => TITLELIST와 TITLELIST_CURRENT가 항상 같이 commit 됨
+#     - rebuild_titlelist_current(): 새 테이블에 전체를 채운 뒤 RENAME TABLE로 한 번에 교체 (backfill 후)
+
+from common.db import get_connection
+
+OPEN_END = "9999-12-31"
+CURRENT_COLUMNS = ("name", "user_tags", "price_us", "releaseYear", "userScore", "content_hash")
+
+
+def current_table_sql(table="TITLELIST_CURRENT"):
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+      app_id      BIGINT      NOT NULL,
+      name        VARCHAR(255),
+      user_tags   TEXT,
+      price_us    FLOAT,
+      releaseYear VARCHAR(10),
+      userScore   FLOAT,
+      start_date  DATETIME    NOT NULL,
+      content_hash BIGINT,
+      PRIMARY KEY (app_id),
+      KEY idx_score (userScore, app_id, name),
+      KEY idx_year_price (releaseYear, price_us, app_id),
+      KEY idx_content_hash (content_hash)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """
+
+
+def create_titlelist_current_table(table="TITLELIST_CURRENT"):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(current_table_sql(table))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_current_user_tags(app_ids, table="TITLELIST_CURRENT", chunk_size=5000):
+    """{app_id: 현재 버전 user_tags} (app_ids만, IN 절을 chunk 단위로). 현재 버전이 없는 app은 빠짐"""
+    app_ids = sorted({int(a) for a in app_ids})
+    result = {}
+    if not app_ids:
+        return result
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            for i in range(0, len(app_ids), chunk_size):
+                chunk = app_ids[i:i + chunk_size]
+                cur.execute(f"SELECT app_id, user_tags FROM {table} "
+                            f"WHERE app_id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+                result.update((int(app_id), user_tags) for app_id, user_tags in cur.fetchall())
+    finally:
+        conn.close()
+    return result
+
+
+def refresh_current_from_stage(cur, stage, start_date, table="TITLELIST_CURRENT", columns=CURRENT_COLUMNS):
+    """ScdMerger 트랜잭션 안에서 호출: 새 버전이 생긴 app(action I/U)만 현재 행 교체"""
+    cols = ", ".join(columns)
+    cur.execute(f"""
+    REPLACE INTO {table} (app_id, {cols}, start_date)
+    SELECT app_id, {cols}, %s
+      FROM {stage}
+     WHERE action IN ('I', 'U')
+    """, (start_date,))
+    return cur.rowcount
+
+
+def drop_closed_current(cur, titlelist="TITLELIST", table="TITLELIST_CURRENT", open_end=OPEN_END):
+    """활성 버전이 없어진 app(스냅샷에서 빠져 만료된 app) 삭제"""
+    cur.execute(f"""
+    DELETE c FROM {table} c
+      LEFT JOIN {titlelist} t
+        ON t.app_id = c.app_id
+       AND t.end_date = '{open_end}'
+     WHERE t.app_id IS NULL
+    """)
+    return cur.rowcount
+
+
+def rebuild_titlelist_current(titlelist="TITLELIST", table="TITLELIST_CURRENT", open_end=OPEN_END):
+    """
+    TITLELIST 활성 행으로 {table}_NEW를 채운 뒤 RENAME TABLE 한 번으로 교체
+    (RENAME은 원자적 => 대시보드는 교체 전/후 중 하나만 봄)
+    """
+    cols = ", ".join(CURRENT_COLUMNS)
+    new_table, old_table = f"{table}_NEW", f"{table}_OLD"
+    create_titlelist_current_table(table)
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {new_table}")
+            cur.execute(f"DROP TABLE IF EXISTS {old_table}")
+            cur.execute(f"CREATE TABLE {new_table} LIKE {table}")
+            # 같은 app에 활성 행이 여러 개 남아 있으면 start_date가 가장 늦은 것
+            cur.execute(f"""
+            INSERT INTO {new_table} (app_id, {cols}, start_date)
+            SELECT app_id, {cols}, start_date
+              FROM {titlelist}
+             WHERE end_date = '{open_end}'
+             ORDER BY app_id, start_date
+                ON DUPLICATE KEY UPDATE
+                   {", ".join(f"{c} = VALUES({c})" for c in CURRENT_COLUMNS)},
+                   start_date = VALUES(start_date)
+            """)
+            cur.execute(f"SELECT COUNT(*) FROM {new_table}")
+            n = cur.fetchone()[0]
+            conn.commit()
+            cur.execute(f"RENAME TABLE {table} TO {old_table}, {new_table} TO {table}")
+            cur.execute(f"DROP TABLE {old_table}")
+    finally:
+        conn.close()
+    print(f"[CURRENT] {table} 재생성 (RENAME 교체): {n}개 app")
+    return n
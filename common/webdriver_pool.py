@@ -0,0 +1,201 @@
+# webdriver_pool.py (로그인 쿠키를 공유하는 headless Chrome N개로 app_id 병렬 처리)
+#
+# 기존: 창 1개(headful) + steam_manual_login -> 수천 개 app_id를 순서대로, time.sleep(2)/(1) 고정 대기
+# 변경:
+#   1) 보이는 Chrome 1개로 수동 로그인 -> 세션 쿠키만 추출 후 닫음
+#   2) headless Chrome N개에 같은 쿠키 주입 (모두 로그인 상태)
+#   3) 공유 작업 큐(queue.Queue)에서 app_id를 하나씩 꺼내 처리
+#   4) 고정 sleep 대신 WebDriverWait(명시적 대기)
+#   5) 전체 드라이버 합산 페이지 로드 속도는 PolitenessLimiter로 제한 (스팀 서버 예의)
+#
+# 사용 예:
+#   cookies = capture_login_cookies()
+#   results = run_driver_pool(app_ids, fetch_tags_with_waits, cookies, n_workers=4, max_per_sec=2.0)
+
+import time
+import queue
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import TimeoutException
+from webdriver_manager.chrome import ChromeDriverManager
+
+STORE_HOME = "https://store.steampowered.com/"
+LOGIN_URL = "https://store.steampowered.com/login/"
+
+
+########################################
+# 1) 전역 예의(politeness) 제한: 모든 드라이버 합산 초당 페이지 로드 수
+########################################
+class PolitenessLimiter:
+    def __init__(self, max_per_sec=2.0):
+        self.min_interval = 1.0 / max_per_sec if max_per_sec else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        """다음 요청 슬롯까지 대기 (스레드 간 공유)"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+########################################
+# 2) 드라이버 생성 / 로그인 쿠키 공유
+########################################
+_driver_path_lock = threading.Lock()
+_driver_path = [None]
+
+def _chrome_service():
+    # ChromeDriverManager().install()은 스레드마다 부르지 않고 한 번만
+    with _driver_path_lock:
+        if _driver_path[0] is None:
+            _driver_path[0] = ChromeDriverManager().install()
+    return Service(_driver_path[0])
+
+def capture_login_cookies():
+    """
+    보이는 Chrome으로 수동 로그인(2차 인증, 성인인증 등) -> 쿠키 리스트 반환 후 브라우저 종료
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument("--disable-gpu")
+    driver = webdriver.Chrome(service=_chrome_service(), options=options)
+    try:
+        driver.get(LOGIN_URL)
+        print("\n[안내] Steam 로그인 페이지가 열렸습니다.")
+        print("브라우저에서 직접 로그인(2차 인증, 성인인증 등) 후 콘솔에 Enter를 눌러주세요.")
+        input("로그인 완료 후 Enter...")
+        driver.get(STORE_HOME)
+        cookies = driver.get_cookies()
+    finally:
+        driver.quit()
+    print(f"[INFO] 로그인 쿠키 {len(cookies)}개 확보")
+    return cookies
+
+def make_headless_driver(cookies=None):
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    # 이미지 로딩 생략 -> 페이지 로드 시간 단축
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    driver = webdriver.Chrome(service=_chrome_service(), options=options)
+
+    if cookies:
+        # 쿠키는 같은 도메인 페이지를 연 상태에서만 추가 가능
+        driver.get(STORE_HOME)
+        for c in cookies:
+            c = {k: v for k, v in c.items() if k in ("name", "value", "domain", "path", "secure", "httpOnly", "expiry")}
+            try:
+                driver.add_cookie(c)
+            except Exception as e:
+                print(f"[WARN] 쿠키 주입 실패 {c.get('name')} => {e}")
+    return driver
+
+
+########################################
+# 3) 명시적 대기를 쓰는 '+버튼' 태그 수집 (pool 작업 함수 예시)
+########################################
+def fetch_tags_with_waits(driver, app_id, limiter=None, timeout=10):
+    """
+    time.sleep(2)/(1) 대신:
+      - +버튼이 클릭 가능해질 때까지 대기 후 클릭
+      - #app_tagging_modal a.app_tag 가 나타날 때까지 대기
+    """
+    if limiter:
+        limiter.wait()
+    driver.get(f"https://store.steampowered.com/app/{app_id}")
+
+    try:
+        plus_btn = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "div.app_tag.add_button"))
+        )
+        plus_btn.click()
+    except TimeoutException:
+        print(f"[WARN] +버튼 없음 app_id={app_id}")
+        return []
+
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, "#app_tagging_modal a.app_tag"))
+        )
+        tag_elems = driver.find_elements(By.CSS_SELECTOR, "#app_tagging_modal a.app_tag")
+        return [el.text.strip() for el in tag_elems if el.text.strip()]
+    except TimeoutException:
+        print(f"[WARN] 태그 팝업 수집 실패 app_id={app_id}")
+        return []
+
+
+########################################
+# 4) 드라이버 풀 실행
+########################################
+def run_driver_pool(app_ids, task_fn, cookies=None, n_workers=4, max_per_sec=2.0):
+    """
+    app_ids를 공유 큐에 넣고 headless 드라이버 n_workers개가 나눠서 처리.
+    task_fn(driver, app_id, limiter) -> 결과
+    반환: {app_id: 결과}  (예외 발생 / 드라이버를 못 띄워 처리 못 한 app은 None)
+    """
+    work_q = queue.Queue()
+    for app_id in dict.fromkeys(app_ids):
+        work_q.put(app_id)
+    total = work_q.qsize()
+
+    limiter = PolitenessLimiter(max_per_sec)
+    results = {}
+    results_lock = threading.Lock()
+    done_count = [0]
+    t0 = time.perf_counter()
+
+    def worker(worker_id):
+        try:
+            driver = make_headless_driver(cookies)
+        except Exception as e:
+            print(f"[WARN] worker{worker_id} 드라이버 시작 실패 => {e}")
+            return
+        try:
+            while True:
+                try:
+                    app_id = work_q.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    res = task_fn(driver, app_id, limiter)
+                except Exception as e:
+                    print(f"[WARN] worker{worker_id} app_id={app_id} 실패 => {e}")
+                    res = None
+                with results_lock:
+                    results[app_id] = res
+                    done_count[0] += 1
+                    done = done_count[0]
+                if done % 50 == 0 or done == total:
+                    elapsed = time.perf_counter() - t0
+                    print(f"[POOL] {done}/{total} 완료, {done / elapsed:.2f} apps/sec (workers={n_workers})")
+        finally:
+            driver.quit()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(n_workers)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    # 모든 드라이버가 시작에 실패하면 큐가 남음 => 처리 못 한 app도 None으로 (실패 표시)
+    unprocessed = [app_id for app_id in dict.fromkeys(app_ids) if app_id not in results]
+    if unprocessed:
+        print(f"[WARN] 처리 못 한 app {len(unprocessed)}개 => None")
+        for app_id in unprocessed:
+            results[app_id] = None
+
+    elapsed = time.perf_counter() - t0
+    print(f"[POOL DONE] {len(results)}개, {elapsed:.1f}s, {len(results) / elapsed if elapsed else 0:.2f} apps/sec")
+    return results